@@ -0,0 +1,24 @@
+import argparse
+
+from src.analysis import analyze_file, BLUNDER_THRESHOLD
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch analysis of Quoridor games in notation format.")
+    parser.add_argument("input", help="Notation file (one game per line)")
+    parser.add_argument("output", help="JSON-lines report, appended to when resuming")
+    parser.add_argument("--depth", type=int, default=2, help="Search depth per position")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--blunder", type=int, default=BLUNDER_THRESHOLD, help="Eval loss that flags a blunder")
+    parser.add_argument("--board-size", type=int, default=9, help="Board size the games were played on")
+    parser.add_argument("--shared-cache", type=int, default=0, metavar="MB",
+                        help="Size of a cache shared by all workers (default: off)")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming")
+    args = parser.parse_args()
+
+    count = analyze_file(args.input, args.output, depth=args.depth, workers=args.workers,
+                         blunder_threshold=args.blunder, resume=not args.restart,
+                         board_size=args.board_size, shared_cache_mb=args.shared_cache)
+    print(f"Analyzed {count} games -> {args.output}")
+
+if __name__ == "__main__":
+    main()
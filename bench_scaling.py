@@ -0,0 +1,83 @@
+import argparse
+import random
+import time
+
+from src.ai import QuoridorAI
+from src.legal_walls import free_threaded, legal_walls
+from src.models import QuoridorGame
+from src.pathfinding import bfs
+
+# Scaling benchmark: how move generation, wall validation, pathfinding and
+# search cost grow with the board size. Positions are random mid-games with
+# walls spread over the board so larger boards aren't just empty space.
+
+def random_position(board_size, plies, rng):
+    game = QuoridorGame(board_size=board_size)
+    n = board_size - 1
+    for _ in range(plies):
+        if game.current_player().walls_remaining > 0 and rng.random() < 0.4:
+            for _ in range(20):
+                if game.place_wall(rng.randrange(n), rng.randrange(n), rng.choice('HV')):
+                    break
+            else:
+                game.move_pawn(*rng.choice(game.get_valid_pawn_moves()))
+        else:
+            game.move_pawn(*rng.choice(game.get_valid_pawn_moves()))
+        if any(p.has_won() for p in game.players):
+            break
+    return game
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def bench_size(board_size, positions, depth, rng):
+    games = [random_position(board_size, board_size * 2, rng) for _ in range(positions)]
+
+    t_pawn = t_walls = t_threaded = t_path = t_search = 0.0
+    nodes = 0
+    for game in games:
+        t_pawn += timed(game.get_valid_pawn_moves, 200)
+        t_walls += timed(lambda: legal_walls(game, threads=False), 1)
+        t_threaded += timed(lambda: legal_walls(game, threads=True), 1)
+        p = game.players[0]
+        t_path += timed(lambda: bfs(game, (p.r, p.c), game.goals(0)), 50)
+
+        ai = QuoridorAI(game, game.turn, depth=depth, collect_stats=True)
+        start = time.perf_counter()
+        _, _, stats = ai.search(game)
+        t_search += time.perf_counter() - start
+        nodes += stats.nodes
+
+    k = len(games)
+    return {
+        "size": board_size,
+        "pawn_moves_us": t_pawn / k * 1e6,
+        "legal_walls_ms": t_walls / k * 1e3,
+        "threaded_ms": t_threaded / k * 1e3,
+        "astar_us": t_path / k * 1e6,
+        "search_ms": t_search / k * 1e3,
+        "nodes": nodes / k,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Board size scaling benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 7, 9, 11, 13])
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    threading = "free-threaded" if free_threaded() else "GIL"
+    print(f"{'size':>4} {'pawn moves (us)':>16} {'legal walls (ms)':>17} {f'threaded, {threading} (ms)':>24} "
+          f"{'A* (us)':>9} {'search (ms)':>12} {'nodes':>8}")
+    for size in args.sizes:
+        r = bench_size(size, args.positions, args.depth, rng)
+        print(f"{r['size']:>4} {r['pawn_moves_us']:>16.1f} {r['legal_walls_ms']:>17.2f} {r['threaded_ms']:>24.2f} "
+              f"{r['astar_us']:>9.1f} {r['search_ms']:>12.1f} {r['nodes']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import argparse
+import time
+
+from src.models import QuoridorGame
+from src.position import from_position_string
+from src.tablebase import build_tablebase
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every position on one wall layout by retrograde analysis.")
+    parser.add_argument("output", help="Tablebase file to write")
+    parser.add_argument("--notation", default="", help="Take the wall layout from this game")
+    parser.add_argument("--position", default="", help="Take the wall layout from a position string")
+    parser.add_argument("--max-walls", type=int, default=0, help="Walls left per side to cover (cost grows fast)")
+    parser.add_argument("--board-size", type=int, default=9)
+    args = parser.parse_args()
+
+    if args.position:
+        game = from_position_string(args.position)
+    else:
+        game = QuoridorGame(board_size=args.board_size)
+        if args.notation and not game.load_from_notation(args.notation):
+            raise SystemExit(1)
+
+    start = time.perf_counter()
+    count = build_tablebase(args.output, game.walls, args.max_walls, game.board_size)
+    print(f"Solved {count} positions in {time.perf_counter() - start:.1f}s -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+
+from src.ai import QuoridorAI, snapshot_fingerprint
+from src.difficulty import PROFILES, get_profile
+from src.models import QuoridorGame
+from src.position import from_position_string, to_position_string
+from src.snapshot import load_snapshot
+from src.tablebase import Tablebase
+
+# Headless driver for the engine: pick a move for a position, or let the AI
+# play both sides. --slice-nodes runs the same cooperative, resumable search
+# the web build uses, with node-count slices so runs are reproducible.
+
+def best_move(ai, game, slice_nodes=None):
+    """
+    Returns (move_data, move_type, slices). slices counts how many times a
+    cooperative search handed control back.
+    """
+    if slice_nodes is None:
+        move_data, move_type = ai.get_best_move(game)
+        return move_data, move_type, 0
+
+    steps = ai.search_steps(game, slice_nodes=slice_nodes)
+    slices = 0
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            move_data, move_type, _ = e.value
+            return move_data, move_type, slices
+        slices += 1
+
+def play(game, ais, slice_nodes=None, max_plies=200):
+    while game.winner() is None and len(game.move_history) < max_plies:
+        ai = ais[game.turn]
+        move_data, move_type, slices = best_move(ai, game, slice_nodes)
+        if move_data is None:
+            break
+        if move_type == 'MOVE':
+            played = game.move_pawn(*move_data)
+        else:
+            played = game.place_wall(*move_data)
+        assert played, f"AI chose an illegal move: {game.coords_to_notation(*move_data)}"
+        print(f"{game.move_history[-1]} ({slices} slices)")
+    return game
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Quoridor AI without a display.")
+    parser.add_argument("--notation", default="", help="Start from this game (standard notation)")
+    parser.add_argument("--position", default="", help="Start from a position string (see src/position.py)")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--difficulty", default=None, choices=list(PROFILES),
+                        help="Search by a difficulty profile's node budget instead of --depth (see src/difficulty.py)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the difficulty profile's move noise")
+    parser.add_argument("--board-size", type=int, default=9)
+    parser.add_argument("--play", action="store_true", help="Play the game out, AI vs AI")
+    parser.add_argument("--tablebase", default=None, help="Endgame tablebase file (see build_tablebase.py)")
+    parser.add_argument("--proof-nodes", type=int, default=0,
+                        help="Try to prove a forced win first, within N nodes (see src/pns.py)")
+    parser.add_argument("--engine-cache", default=None, metavar="PATH",
+                        help="Load the AI's tables from PATH and save them back when done (2 players)")
+    parser.add_argument("--slice-nodes", type=int, default=None,
+                        help="Cooperative search: yield every N nodes (deterministic)")
+    args = parser.parse_args()
+
+    if args.position:
+        game = from_position_string(args.position)
+    else:
+        game = QuoridorGame(board_size=args.board_size)
+        if args.notation and not game.load_from_notation(args.notation):
+            raise SystemExit(1)
+
+    tablebase = Tablebase(args.tablebase) if args.tablebase else None
+    cache_path = args.engine_cache if game.num_players == 2 else None
+    snapshot = load_snapshot(cache_path, game.board_size, snapshot_fingerprint())
+    difficulty = get_profile(args.difficulty, args.seed) if args.difficulty else None
+    ais = [QuoridorAI(game, i, depth=args.depth, tablebase=tablebase, proof_nodes=args.proof_nodes,
+                      snapshot=snapshot, difficulty=difficulty)
+           for i in range(game.num_players)]
+    if cache_path:
+        ais[1].share_tables(ais[0])
+    if args.play:
+        play(game, ais, args.slice_nodes)
+        print(game.get_game_notation())
+        print(to_position_string(game))
+    elif game.winner() is not None:
+        print(f"Game over: player {game.winner() + 1} has won")
+    else:
+        move_data, move_type, slices = best_move(ais[game.turn], game, args.slice_nodes)
+        if move_data is None:
+            print(f"No move for player {game.turn + 1}")
+        else:
+            print(f"{game.coords_to_notation(*move_data)} ({slices} slices)")
+    if cache_path:
+        print(f"Saved {ais[0].save_snapshot(cache_path)} engine cache entries to {cache_path}")
+    if snapshot is not None:
+        snapshot.close()
+
+if __name__ == "__main__":
+    main()
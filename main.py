@@ -2,10 +2,94 @@ import pygame
 import sys
 from src.constants import *
 from src.ui import QuoridorUI
+from src.difficulty import PROFILES, get_profile
 
+import argparse
 import asyncio
+import copy
+import os
+import time
+
+# Milliseconds of AI search per frame. The search is cooperative (no threads
+# in the web build), so this bounds how long a frame can take while it thinks.
+AI_SLICE_MS = 12
+# Node budget of the AI's proof-number search for forced wins (src/pns.py)
+PROOF_NODES = 5000
+# The AI's tables are saved here on exit and reloaded on the next start
+# (src/snapshot.py), so the opening moves don't start from cold caches
+ENGINE_CACHE = os.path.join(os.path.expanduser("~"), ".quoridor", "engine.snap")
+
+# The screen is only redrawn after input, a state change or an AI move, at
+# most FPS times a second. With nothing to do the loop sleeps until the next
+# event instead of spinning (the browser can't block, so it naps there).
+FPS = 60
+
+IDLE_WAIT_MS = 500  # Longest block, so the stats line keeps updating
+WEB = sys.platform == 'emscripten'
+
+# Hint mode (H key): the human's best HINT_PV moves, analysed in the
+# background up to HINT_DEPTH plies while they think. One ply deeper than
+# the AI, so once the human plays a hinted move the AI's reply is already
+# in the shared table.
+HINT_DEPTH = 5
+HINT_PV = 3
+
+class LoopStats:
+    """
+    Frames drawn, loop iterations and CPU time, printed every interval seconds.
+    """
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.loops = 0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def tick(self, drew):
+        self.loops += 1
+        self.frames += drew
+        elapsed = time.perf_counter() - self.wall_start
+        if elapsed >= self.interval:
+            cpu = time.process_time() - self.cpu_start
+            print(f"FPS {self.frames / elapsed:.1f} | loops {self.loops / elapsed:.1f}/s | CPU {cpu / elapsed:.0%}")
+            self.reset()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Quoridor")
+    parser.add_argument("--fps", type=int, default=FPS, help="Maximum redraws per second")
+    parser.add_argument("--always-redraw", action="store_true",
+                        help="Redraw every frame, even when nothing changed")
+    parser.add_argument("--stats", action="store_true", help="Print FPS and CPU use every 2 seconds")
+    parser.add_argument("--players", type=int, default=2, choices=(2, 4),
+                        help="Number of players; the AI plays every seat but the first")
+    parser.add_argument("--board-size", type=int, default=BOARD_SIZE, help="Board size (default: 9)")
+    parser.add_argument("--difficulty", default=None, choices=list(PROFILES),
+                        help="AI strength profile (default: fixed depth 4)")
+    parser.add_argument("--engine-cache", default=ENGINE_CACHE, metavar="PATH",
+                        help="Where to keep the AI's tables between runs ('' to disable)")
+    args, _ = parser.parse_known_args()
+    return args
+
+async def next_events(idle, fps):
+    """
+    Pending events; when idle, first waits for one (or IDLE_WAIT_MS).
+    """
+    if not idle:
+        return pygame.event.get()
+    if WEB:
+        await asyncio.sleep(1 / fps)
+        return pygame.event.get()
+    event = pygame.event.wait(IDLE_WAIT_MS)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
 
 async def main():
+    args = parse_args()
     # pygame.init() # Avoid initializing mixer by default for web build compatibility
     pygame.display.init()
     pygame.font.init()
@@ -13,55 +97,130 @@ async def main():
     pygame.display.set_caption("Quoridor - AI Agent Remake")
     
     clock = pygame.time.Clock()
-    ui = QuoridorUI(screen)
+    ui = QuoridorUI(screen, num_players=args.players, board_size=args.board_size)
     
-    # Initialize AI for Player 2 (Blue)
-    from src.ai import QuoridorAI
+    # Initialize AI for every player but Player 1 (Red)
+    from src.ai import QuoridorAI, snapshot_fingerprint
+    from src.snapshot import load_snapshot
     # Try Depth 3 now with A* optimization
-    ai = QuoridorAI(ui.game, player_idx=1, depth=4)
+    cache_path = None if WEB else args.engine_cache
+    snapshot = load_snapshot(cache_path, ui.game.board_size, snapshot_fingerprint())
+    difficulty = get_profile(args.difficulty) if args.difficulty else None
+    # Only the first AI keeps the snapshot; in a 4-player game the others
+    # start with empty tables (Best-Reply tables can't be shared)
+    ais = {idx: QuoridorAI(ui.game, player_idx=idx, depth=4, proof_nodes=PROOF_NODES,
+                           snapshot=snapshot if idx == 1 else None, difficulty=difficulty)
+           for idx in range(1, ui.game.num_players)}
+    ai_search = None      # Suspended search (generator), advanced one slice per frame
+    ai_search_history = None
+    
+    # Hint engine for the human. In a 2-player game it shares the AI's
+    # tables, so the AI's own search starts from what the hints explored;
+    # not under a difficulty profile, whose moves mustn't depend on how long
+    # the hints ran (see src/difficulty.py).
+    hint_ai = QuoridorAI(ui.game, player_idx=0, depth=HINT_DEPTH,
+                         snapshot=snapshot if ui.game.num_players == 2 else None)
+    if ui.game.num_players == 2 and difficulty is None:
+        hint_ai.share_tables(ais[1])
+    hint_search = None
+    hint_position = None  # (game, move history) the current hints are for
+    stats = LoopStats() if args.stats else None
+    redraw = True
     
     running = True
     while running:
-        # Event Handling
-        for event in pygame.event.get():
+        # Event Handling (blocks while there's nothing to draw or search)
+        searching = (ai_search is not None or hint_search is not None) and ui.state == 'GAME'
+        idle = not (redraw or searching or args.always_redraw)
+        for event in await next_events(idle, args.fps):
             if event.type == pygame.QUIT:
                 running = False
             
             # Delegate all input to UI
             ui.handle_input(event)
+            redraw = True
             
         # Logic
         if ui.state == 'GAME':
             # Update AI reference to current game (in case of Load/Reset)
-            if ai.game != ui.game:
-                ai.game = ui.game
+            for ai in ais.values():
+                if ai.game != ui.game:
+                    ai.game = ui.game
+
+            # Drop a search whose position changed under it (game loaded from the menu)
+            if ai_search is not None and ui.game.move_history != ai_search_history:
+                ai_search = None
+                ui.ai_thinking = False
+
+            # Hints: analyse the human's position one slice per frame
+            position = (ui.game, list(ui.game.move_history))
+            hint_wanted = ui.hint_mode and ui.game.turn == 0 and ui.game.winner() is None
+            stale = hint_position is None or position[0] is not hint_position[0] or position[1] != hint_position[1]
+            if stale or not hint_wanted:
+                hint_search = None
+                hint_position = None
+                if ui.hints or ui.hint_depth:
+                    ui.hints, ui.hint_depth = [], 0
+                    redraw = True
+            if hint_wanted and hint_position is None:
+                hint_ai.game = ui.game
+                hint_search = hint_ai.analyze_steps(copy.deepcopy(ui.game), num_pv=HINT_PV, slice_ms=AI_SLICE_MS)
+                hint_position = position
+            if hint_search is not None:
+                try:
+                    next(hint_search)
+                except StopIteration:
+                    hint_search = None
+                if hint_ai.analysis_depth != ui.hint_depth:
+                    ui.hints, ui.hint_depth = hint_ai.analysis, hint_ai.analysis_depth
+                    redraw = True
 
             # AI Turn
-            if ui.game.turn == 1 and not ui.game.players[1].has_won() and not ui.game.players[0].has_won():
-                # Process AI move
-                pygame.display.set_caption("Quoridor - AI Thinking...")
-                # Pump events to keep UI responsive during AI think time (though in async web it might still freeze slightly without threading/workers, but this is a start)
-                pygame.event.pump() 
+            if ui.game.turn in ais and ui.game.winner() is None:
+                if ai_search is None:
+                    pygame.display.set_caption("Quoridor - AI Thinking...")
+                    # Search a copy; the UI keeps drawing the live game meanwhile
+                    ai_search = ais[ui.game.turn].search_steps(copy.deepcopy(ui.game), slice_ms=AI_SLICE_MS)
+                    ai_search_history = list(ui.game.move_history)
+                    ui.ai_thinking = True
                 
-                # Get move
-                # In a web context, heavy computation might block. Ideally AI would yield, but for now we keep synchronous AI calls.
-                move_data, move_type = ai.get_best_move(ui.game)
-                
-                if move_type == 'MOVE':
-                    ui.game.move_pawn(*move_data)
-                elif move_type == 'WALL':
-                    ui.game.place_wall(*move_data)
-                
-                ui.check_win()
-                pygame.display.set_caption("Quoridor - AI Agent Remake")
+                # Process one slice of the AI move, then let the frame render
+                try:
+                    next(ai_search)
+                except StopIteration as e:
+                    move_data, move_type, _ = e.value
+                    ai_search = None
+                    ui.ai_thinking = False
+                    
+                    if move_type == 'MOVE':
+                        ui.game.move_pawn(*move_data)
+                    elif move_type == 'WALL':
+                        ui.game.place_wall(*move_data)
+                    
+                    ui.check_win()
+                    pygame.display.set_caption("Quoridor - AI Agent Remake")
+                    redraw = True
         
         # Draw (delegates to draw_menu or draw_game internally)
-        ui.draw()
-        
-        pygame.display.flip()
-        clock.tick(60)
+        drew = redraw or args.always_redraw
+        if drew:
+            ui.draw()
+            pygame.display.flip()
+            redraw = False
+            clock.tick(args.fps)
+        if stats is not None:
+            stats.tick(drew)
         await asyncio.sleep(0)
 
+    if cache_path:
+        try:
+            count = ais[1].save_snapshot(cache_path)
+            print(f"Saved {count} engine cache entries to {cache_path}")
+        except OSError as e:
+            print(f"Could not save engine cache: {e}")
+    if snapshot is not None:
+        snapshot.close()
+
     pygame.font.quit()
     pygame.display.quit()
     # pygame.quit()
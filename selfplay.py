@@ -0,0 +1,25 @@
+import argparse
+
+from src.selfplay import generate
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate self-play training data as sharded .npy columns.")
+    parser.add_argument("output", help="Output directory (re-running resumes)")
+    parser.add_argument("--games", type=int, default=256)
+    parser.add_argument("--games-per-shard", type=int, default=64)
+    parser.add_argument("--depth", type=int, default=2, help="Search depth per move")
+    parser.add_argument("--random-plies", type=int, default=4, help="Random opening moves per game")
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--players", type=int, default=2, choices=(2, 4))
+    parser.add_argument("--board-size", type=int, default=9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    total = generate(args.output, args.games, games_per_shard=args.games_per_shard, workers=args.workers,
+                     depth=args.depth, random_plies=args.random_plies, max_plies=args.max_plies,
+                     seed=args.seed, num_players=args.players, board_size=args.board_size)
+    print(f"Wrote {total} positions -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,576 @@
+import asyncio
 import copy
 import random
-from .pathfinding import bfs, get_shortest_path
+import time
+import zlib
+
+import numpy as np
+
+from . import pathfinding
+from .pathfinding import bfs, goal_axis, shortest_path_dag
+from .legal_walls import legal_walls
+from .pns import WIN, ProofSearch, worth_proving
+from .shared_cache import decode_dist, decode_tt, dist_key, encode_dist, encode_tt, tt_key
+from .snapshot import write_snapshot
+from .stats import SearchStats
+from .tablebase import SEARCH_WIN, tablebase_score
+from .symmetry import (MAX_WALLS, ZOBRIST_SEED, canonical_key, canonical_wall_key, orient_move,
+                       player_is_symmetric, position_key)
+
+# Transposition table entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Bump whenever scores or table entries change meaning, so engine caches
+# saved by older versions (snapshot.py) are ignored instead of trusted
+SEARCH_VERSION = 1
+
+def snapshot_fingerprint():
+    return zlib.crc32(repr((SEARCH_VERSION, ZOBRIST_SEED, MAX_WALLS)).encode())
+
+def run_steps(steps):
+    """
+    Drives a search generator (minimax_steps / search_steps) to completion
+    and returns its result.
+    """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as e:
+            return e.value
+
+class SearchSlicer:
+    """
+    Decides when a cooperative search hands control back to its driver:
+    after slice_nodes nodes (deterministic) or slice_ms milliseconds.
+    """
+    def __init__(self, slice_ms=None, slice_nodes=None):
+        self.slice_s = (slice_ms or 0) / 1000
+        self.slice_nodes = slice_nodes
+        self.begin()
+
+    def begin(self):
+        self.start = time.perf_counter()
+        self.count = 0
+
+    def tick(self):
+        self.count += 1
+        if self.slice_nodes is not None:
+            return self.count >= self.slice_nodes
+        return time.perf_counter() - self.start >= self.slice_s
+
+class SearchAborted(Exception):
+    """
+    Raised inside a search whose SearchBudget has run out.
+    """
+
+class SearchBudget:
+    """
+    Node and time limits of one search (see difficulty.py). The node limit
+    cuts the search at the same point on every machine; the time cap, if
+    hit, doesn't.
+    """
+    def __init__(self, max_nodes=None, time_ms=None):
+        self.max_nodes = max_nodes
+        self.deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000
+        self.nodes = 0
+        self.timed_out = False
+
+    def spend(self):
+        """
+        Counts a node. Returns True once either limit is used up.
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            return True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.timed_out = True
+            return True
+        return False
 
 class QuoridorAI:
-    def __init__(self, game, player_idx, depth=2):
+    def __init__(self, game, player_idx, depth=2, collect_stats=False, stats_path=None,
+                 tt_size=200000, dist_cache_size=200000, shared_cache=None, tablebase=None,
+                 proof_nodes=0, snapshot=None, difficulty=None):
         self.game = game
         self.player_idx = player_idx # The AI's index
-        self.opponent_idx = 1 - player_idx
         self.depth = depth
+        
+        # Position-keyed caches. Keys are canonical under left-right mirroring
+        # (see symmetry.py), so a position and its mirror share one entry.
+        # Both are simply cleared when full.
+        self.tt = {}            # key -> (depth, score, flag, move, move_type)
+        self.tt_size = tt_size
+        self.dist_cache = {}    # (wall key, r, c, goal axis, goal) -> path length
+        self.dist_cache_size = dist_cache_size
+        # Optional SharedCache (shared_cache.py) behind both: other processes'
+        # results are picked up on a local miss and every new result is published.
+        self.shared = shared_cache
+        # Whose entries this engine's table holds in shared and saved caches.
+        # 2-player scores are kept for the side to move (tt_perspective), so
+        # both sides' engines can use one set; Best-Reply scores can't.
+        self.table_owner = 0 if game.num_players == 2 else player_idx
+        # Optional read-only Snapshot (snapshot.py) of an earlier run's
+        # caches, consulted on a miss; save_snapshot writes the next one
+        self.snapshot = snapshot
+        # Optional endgame Tablebase (tablebase.py), probed at every node
+        # unless a difficulty profile is set
+        self.tablebase = tablebase
+        # Optional proof-number search (pns.py) tried before every search
+        # once the opponent is low on walls; a proven win is played directly.
+        # proof_nodes is its node budget, 0 = off.
+        self.prover = ProofSearch(player_idx, proof_nodes) if proof_nodes else None
+        # Optional Difficulty profile (difficulty.py): replaces the fixed
+        # depth with iterative deepening under a node budget and time cap.
+        # Under a profile the proof search is skipped and the search table
+        # isn't topped up from the shared cache or snapshot, since either
+        # would make the move depend on more than the game.
+        self.difficulty = difficulty
+        self.last_budget = None
+        
+        # Instrumentation: off unless requested. stats_path appends one JSON
+        # line per search.
+        self.collect_stats = collect_stats or stats_path is not None
+        self.stats_path = stats_path
+        self.stats = None
+        self.last_stats = None
+        self._pv = {}
+        self._lines = {}        # Root move -> line, from analyze_steps
+        
+        # Latest multi-PV result of analyze_steps
+        self.analysis = []
+        self.analysis_depth = 0
+        
+        # Cooperative mode (see search_steps); None means never yield
+        self._slicer = None
+        # Limits of the running search (see root_steps); None = unlimited
+        self._budget = None
 
     def get_best_move(self, game_state):
-        print(f"AI Thinking... (Depth {self.depth})")
-        _, best_move, move_type = self.minimax(game_state, self.depth, float('-inf'), float('inf'), True)
+        best_move, move_type, _ = self.search(game_state)
         return best_move, move_type
 
-    def evaluate(self, game):
-        # Heuristic: Opponent Path Length - AI Path Length
-        ai_p = game.players[self.player_idx]
-        op_p = game.players[self.opponent_idx]
+    async def get_best_move_async(self, game_state, slice_ms=5):
+        """
+        get_best_move for the web build: the search gives the event loop a
+        turn every slice_ms so the page keeps rendering and taking input.
+        """
+        steps = self.search_steps(game_state, slice_ms=slice_ms)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as e:
+                best_move, move_type, _ = e.value
+                return best_move, move_type
+            await asyncio.sleep(0)
+
+    def search(self, game_state):
+        """
+        Same as get_best_move, but also returns the SearchStats of the search
+        (None when stats are disabled): (move_data, move_type, stats).
+        """
+        return run_steps(self.search_steps(game_state))
+
+    def search_steps(self, game_state, slice_ms=None, slice_nodes=None):
+        """
+        Resumable search. Generator that yields (None) whenever a slice of
+        slice_ms milliseconds or slice_nodes nodes has been used up, and
+        returns (move_data, move_type, stats) when done. slice_nodes gives the
+        same yield points on every machine, for headless tests.
+        Don't change game_state while the search is suspended.
+        """
+        if self.difficulty is not None:
+            print(f"AI Thinking... ({self.difficulty.name})")
+        else:
+            print(f"AI Thinking... (Depth {self.depth})")
+        if slice_ms is not None or slice_nodes is not None:
+            self._slicer = SearchSlicer(slice_ms, slice_nodes)
+        try:
+            if not self.collect_stats:
+                proof = yield from self.prove_steps(game_state)
+                if proof is not None:
+                    return proof + (None,)
+                _, best_move, move_type = yield from self.root_steps(game_state)
+                return best_move, move_type, None
+            
+            stats = SearchStats()
+            self.stats = stats
+            self._pv = {}
+            self._lines = {}
+            depth = self.depth
+            previous = pathfinding.set_stats(stats)
+            stats.start()
+            try:
+                proof = yield from self.prove_steps(game_state)
+                if proof is not None:
+                    best_move, move_type = proof
+                    score = SEARCH_WIN
+                    self._pv[0] = [best_move]
+                else:
+                    searched = time.perf_counter()
+                    score, best_move, move_type = yield from self.root_steps(game_state)
+                    if self.difficulty is not None:
+                        # The root isn't a minimax node here: the line is the
+                        # one analyze_steps found for the chosen move at the
+                        # last depth it finished, and it timed each depth
+                        depth = self.analysis_depth
+                        self._pv[0] = self._lines.get(best_move, [best_move] if best_move is not None else [])
+                    else:
+                        stats.depth_times[depth] = time.perf_counter() - searched
+            finally:
+                stats.stop()
+                pathfinding.set_stats(previous)
+                self.stats = None
+        finally:
+            self._slicer = None
         
-        ai_goals = [(ai_p.goal_row, c) for c in range(9)]
-        op_goals = [(op_p.goal_row, c) for c in range(9)]
+        stats.score = score
+        if best_move is not None:
+            stats.best_move = game_state.coords_to_notation(*best_move)
+        stats.pv = [game_state.coords_to_notation(*m) for m in self._pv.get(0, [])]
         
-        # We can use bfs (which delegates to a_star returning int)
-        dist_ai = bfs(game, (ai_p.r, ai_p.c), ai_goals)
-        dist_op = bfs(game, (op_p.r, op_p.c), op_goals)
+        self.last_stats = stats
+        if self.stats_path:
+            stats.write_jsonl(self.stats_path, player=self.player_idx, depth=depth,
+                              position=game_state.get_game_notation())
+        return best_move, move_type, stats
+
+    def root_steps(self, game_state):
+        """
+        The main search of search_steps: alpha-beta to self.depth or, with a
+        difficulty profile, iterative deepening until its budget runs out,
+        then the profile's pick among the best moves. Returns (score,
+        move_data, move_type).
+        """
+        profile = self.difficulty
+        if profile is None:
+            return (yield from self.minimax_steps(game_state, self.depth, float('-inf'), float('inf'), True))
+        budget = self.last_budget = SearchBudget(profile.nodes, profile.time_ms)
+        candidates = yield from self.analyze_steps(game_state, num_pv=profile.candidates,
+                                                   max_depth=profile.max_depth, budget=budget)
+        if not candidates:
+            return self.evaluate(game_state), None, None
+        return profile.choose(candidates, position_key(game_state))
+
+    def prove_steps(self, game_state):
+        """
+        Runs the proof-number search if it's enabled and worth trying here.
+        Yields like minimax_steps (one tick per expanded node) and returns a
+        proven winning (move_data, move_type), or None.
+        """
+        prover = self.prover
+        if prover is None or self.difficulty is not None:
+            # A profile's node budget and time cap cover the whole move
+            return None
+        if game_state.turn != self.player_idx or not worth_proving(game_state, self.player_idx):
+            return None
+        prover.start(game_state)
+        while prover.step():
+            slicer = self._slicer
+            if slicer is not None and slicer.tick():
+                yield
+                slicer.begin()
+        result, move_data, move_type = prover.result()
+        if result != WIN:
+            return None
+        return move_data, move_type
+
+    def analyze_steps(self, game_state, num_pv=3, max_depth=None, slice_ms=None, slice_nodes=None,
+                      budget=None):
+        """
+        Resumable multi-PV analysis of player_idx's moves (player_idx must be
+        the side to move). Deepens one ply at a time up to max_depth (default
+        self.depth) and after every depth publishes self.analysis: the best
+        num_pv moves as (score, move_data, move_type), best first, searched to
+        self.analysis_depth. Yields like search_steps and returns the final list.
+        budget: optional SearchBudget for depths 2 and up (depth 1 always
+        completes); the depth it runs out in is dropped.
+        """
+        max_depth = max_depth or self.depth
+        self.analysis = []
+        self.analysis_depth = 0
+        if slice_ms is not None or slice_nodes is not None:
+            self._slicer = SearchSlicer(slice_ms, slice_nodes)
+        try:
+            moves = self.get_all_possible_moves(game_state, self.player_idx)
+            for depth in range(1, max_depth + 1):
+                self._budget = budget if depth > 1 else None
+                started = time.perf_counter()
+                scored = []
+                lines = {}
+                try:
+                    for move_data, move_type in moves:
+                        # Only the num_pv best need exact scores; the rest just
+                        # have to prove they're no better than the current last
+                        floor = float('-inf')
+                        if len(scored) >= num_pv:
+                            floor = sorted(scored, key=lambda m: -m[0])[num_pv - 1][0]
+                        child = self.make_move(game_state, move_data, move_type, self.player_idx)
+                        score, _, _ = yield from self.minimax_steps(child, depth - 1, floor, float('inf'), False, 1)
+                        scored.append((score, move_data, move_type))
+                        if self.stats is not None:
+                            lines[move_data] = [move_data] + self._pv.get(1, [])
+                except SearchAborted:
+                    break
+                # Stable sort: ties keep the previous depth's order
+                scored.sort(key=lambda m: -m[0])
+                moves = [(m, t) for _, m, t in scored]
+                self.analysis = scored[:num_pv]
+                self.analysis_depth = depth
+                if self.stats is not None:
+                    self.stats.depth_times[depth] = time.perf_counter() - started
+                    self._lines = lines
+        finally:
+            self._slicer = None
+            self._budget = None
+        return self.analysis
+
+    def opponents(self, game):
+        return [i for i in range(game.num_players) if i != self.player_idx]
+
+    def uses_symmetry(self, game):
+        return player_is_symmetric(self.player_idx, game.num_players)
+
+    def position_key(self, game):
+        """
+        Returns (key, mirrored) for the transposition table.
+        """
+        if self.uses_symmetry(game):
+            return canonical_key(game)
+        return position_key(game), False
+
+    def distance(self, game, player_idx, walls_key=None):
+        """
+        Shortest path length of player_idx to its goal, cached by wall layout.
+        walls_key: (key, mirrored) from canonical_wall_key, to share between calls.
+        """
+        if walls_key is None:
+            walls_key = canonical_wall_key(game)
+        wkey, mirrored = walls_key
+        n = game.board_size
+        p = game.players[player_idx]
+        goals = game.goals(player_idx)
+        axis, target = goal_axis(goals)
+        c = p.c
+        if mirrored:
+            c = n - 1 - c
+            if axis == 1:
+                target = n - 1 - target
+        
+        key = (wkey, p.r, c, axis, target)
+        dist = self.dist_cache.get(key)
+        if self.stats is not None:
+            self.stats.cache("dist", dist is not None)
+        if dist is None:
+            shared_key = None
+            if self.shared is not None or self.snapshot is not None:
+                shared_key = dist_key(wkey, p.r, c, axis, target, n)
+            if self.shared is not None:
+                data = self.shared.get(shared_key)
+                if data is not None:
+                    dist = decode_dist(data)
+            if dist is None and self.snapshot is not None:
+                data = self.snapshot.get(shared_key)
+                if data is not None:
+                    dist = decode_dist(data)
+            if dist is None:
+                # We can use bfs (which delegates to a_star returning int)
+                dist = bfs(game, (p.r, p.c), goals)
+                if self.shared is not None:
+                    self.shared.put(shared_key, encode_dist(dist))
+            if len(self.dist_cache) >= self.dist_cache_size:
+                self.dist_cache.clear()
+            self.dist_cache[key] = dist
+        return dist
+
+    def evaluate(self, game):
+        if self.stats is not None:
+            self.stats.leaf_evals += 1
+
+        # Heuristic: Opponent Path Length - AI Path Length
+        # With 4 players the closest opponent is the one that matters.
+        walls_key = canonical_wall_key(game)
+        dist_ai = self.distance(game, self.player_idx, walls_key)
+        dist_op = min(self.distance(game, i, walls_key) for i in self.opponents(game))
         
         if dist_ai == float('inf'): dist_ai = 1000
         if dist_op == float('inf'): dist_op = 1000
         
         return dist_op - dist_ai
 
-    def get_all_possible_moves(self, game, player_idx):
-        moves = []
-        
-        # 1. Pawn Moves
+    def get_all_possible_moves(self, game, player_idx, targets=None):
+        """
+        Candidate moves for player_idx as a list, in generate_moves order.
+        targets: players whose paths the candidate walls should block
+        (default: everyone else). Every wall is needed here, so they're
+        validated in one legal_walls batch (threaded on a free-threaded
+        build) rather than one at a time.
+        """
+        moves = [(m, 'MOVE') for m in self.ordered_pawn_moves(game, player_idx)]
+        if game.players[player_idx].walls_remaining <= 0:
+            return moves
+        if targets is None:
+            targets = [i for i in range(game.num_players) if i != player_idx]
+        walls = [wall for wall, _ in self.wall_candidates(game, player_idx, targets)]
+        moves.extend((wall, 'WALL') for wall in legal_walls(game, walls))
+        return moves
+
+    def ordered_pawn_moves(self, game, player_idx):
+        # Heuristic: Moves closer to goal row (or column) are better.
         pawn_moves = game.get_valid_pawn_moves(player_idx)
+        axis, target = goal_axis(game.goals(player_idx))
+        pawn_moves.sort(key=lambda m: abs(m[axis] - target))
+        return pawn_moves
+
+    def generate_moves(self, game, player_idx, targets=None, tt_move=None):
+        """
+        Staged, lazy move generator. Yields (move_data, move_type) in order:
+        1. The transposition table move (if still legal)
+        2. Pawn moves, closest to the goal first
+        3. Walls that lengthen the targets' shortest paths, best first
+        Paths are only analysed when stage 3 is reached and each wall's Golden
+        Rule check runs right before it's yielded, so a cutoff on an early move
+        skips the rest of the work (which is why search nodes don't batch
+        their walls through legal_walls like get_all_possible_moves).
+        """
+        seen = set()
         
-        # Sort pawn moves?
-        # Heuristic: Moves closer to goal row are better.
-        goal_row = game.players[player_idx].goal_row
-        pawn_moves.sort(key=lambda m: abs(m[0] - goal_row))
+        # 1. Hash move
+        if tt_move is not None:
+            move_data, move_type = tt_move
+            if move_type == 'MOVE':
+                legal = move_data in game.get_valid_pawn_moves(player_idx)
+            else:
+                legal = (game.players[player_idx].walls_remaining > 0
+                         and game.is_valid_wall_placement(*move_data))
+            if legal:
+                seen.add(move_data)
+                yield move_data, move_type
         
-        for m in pawn_moves:
-            moves.append(((m), 'MOVE'))
+        # 2. Pawn Moves, closest to the goal first
+        for m in self.ordered_pawn_moves(game, player_idx):
+            if m not in seen:
+                yield m, 'MOVE'
             
-        # 2. Wall placements
-        if game.players[player_idx].walls_remaining > 0:
-            # OPTIMIZATION:
-            # Instead of checking random neighbors, identifying "Critical Walls".
-            # A critical wall is one that intersects the opponent's currently shortest path.
-            
-            op_p = game.players[1 - player_idx]
-            op_goals = [(op_p.goal_row, c) for c in range(9)]
-            op_path = get_shortest_path(game, (op_p.r, op_p.c), op_goals)
-            
-            candidates = set()
-            
-            # Add walls that block this path
-            # Path is list of nodes [(r,c), (r,c)...]
-            # Between node i and i+1, we can place a wall.
-            if len(op_path) > 1:
-                for i in range(len(op_path) - 1):
-                    r1, c1 = op_path[i]
-                    r2, c2 = op_path[i+1]
-                    
-                    # If moving Vertical (c1==c2), we need Horizontal wall
-                    # Wall at (min(r1,r2), c1, 'H') or (min(r1,r2), c1-1, 'H')
-                    if c1 == c2:
-                        row = min(r1, r2)
-                        candidates.add((row, c1, 'H'))
-                        candidates.add((row, c1 - 1, 'H'))
-                    # If moving Horizontal (r1==r2), we need Vertical wall
-                    elif r1 == r2:
-                        col = min(c1, c2)
-                        candidates.add((r1, col, 'V'))
-                        candidates.add((r1 - 1, col, 'V'))
-                        
-            # Also add some walls near self to defend/deflect?
-            # Or just rely on raw search finding them if we add a few nearby walls.
-            # Adding immediate neighbors of self just in case.
-            my_p = game.players[player_idx]
-            for dr in range(-1, 2):
-                for dc in range(-1, 2):
-                    candidates.add((my_p.r + dr, my_p.c + dc, 'H'))
-                    candidates.add((my_p.r + dr, my_p.c + dc, 'V'))
-            
-            # Filter valid
-            for r, c, orient in candidates:
-                if game.is_valid_wall_placement(r, c, orient):
-                     # Extra check: Don't place wall if it massively increases OUR path?
-                     # Maybe too expensive to check every time.
-                     moves.append(((r, c, orient), 'WALL'))
-                            
-        return moves
+        # Wall placements
+        if game.players[player_idx].walls_remaining <= 0:
+            return
+        
+        # 3. Walls that lengthen a target's shortest path, biggest net gain
+        # first. The shortest-path DAG tells which walls can matter at all
+        # (see pathfinding.PathDAG), so walls that leave some shortest path
+        # open are never generated.
+        if targets is None:
+            targets = [i for i in range(game.num_players) if i != player_idx]
+        
+        for wall, _ in self.wall_candidates(game, player_idx, targets):
+            if wall not in seen:
+                seen.add(wall)
+                if game.is_valid_wall_placement(*wall):
+                    yield wall, 'WALL'
+
+    def path_dag(self, game, player_idx):
+        p = game.players[player_idx]
+        return shortest_path_dag(game, (p.r, p.c), game.goals(player_idx))
+
+    def wall_candidates(self, game, player_idx, targets):
+        """
+        Returns [(wall, gain)] for walls that lengthen some target's shortest
+        path, sorted by gain (total path increase for the targets) minus what
+        the wall costs player_idx's own path. Legality isn't checked.
+        """
+        gains = {}
+        for op_idx in targets:
+            for wall, increase in self.path_dag(game, op_idx).wall_impacts().items():
+                gains[wall] = gains.get(wall, 0) + increase
+        if not gains:
+            return []
+        
+        own = self.path_dag(game, player_idx)
+        scored = []
+        for wall, gain in gains.items():
+            net = gain - own.wall_increase(wall)
+            scored.append((-net, -gain, wall))
+        scored.sort()
+        return [(wall, -neg_gain) for _, neg_gain, wall in scored]
 
     def minimax(self, game, depth, alpha, beta, maximizing_player):
-        if depth == 0 or game.players[0].has_won() or game.players[1].has_won():
+        return run_steps(self.minimax_steps(game, depth, alpha, beta, maximizing_player))
+
+    def minimax_steps(self, game, depth, alpha, beta, maximizing_player, ply=0):
+        """
+        minimax as a generator, so a cooperative search can suspend at any
+        node. Returns (score, move_data, move_type). ply: distance from the
+        root of the whole search, where the node's principal variation is
+        recorded (with stats on).
+        """
+        slicer = self._slicer
+        if slicer is not None and slicer.tick():
+            yield
+            slicer.begin()
+        budget = self._budget
+        if budget is not None and budget.spend():
+            raise SearchAborted()
+        
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            self._pv[ply] = []
+        
+        if depth == 0 or game.winner() is not None:
             return self.evaluate(game), None, None
 
-        current_player_idx = self.player_idx if maximizing_player else self.opponent_idx
-        possible_moves = self.get_all_possible_moves(game, current_player_idx)
+        if self.tablebase is not None and self.difficulty is None:
+            hit = self.tablebase.probe(game)
+            # Draws carry no move; let the search pick one
+            if hit is not None and hit[1] is not None:
+                value, move, move_type = hit
+                score = tablebase_score(value)
+                if game.turn != self.player_idx:
+                    score = -score
+                if stats is not None:
+                    self._cut_pv(ply, [move])
+                return score, move, move_type
+
+        # Transposition table probe
+        key, mirrored = self.position_key(game)
+        entry = self.tt.get(key)
+        external = self.difficulty is None
+        if entry is None and external and self.shared is not None:
+            data = self.shared.get(tt_key(key, self.table_owner))
+            if data is not None:
+                entry = decode_tt(data, game.board_size)
+        if entry is None and external and self.snapshot is not None:
+            data = self.snapshot.get(tt_key(key, self.table_owner))
+            if data is not None:
+                entry = decode_tt(data, game.board_size)
+        if stats is not None:
+            stats.cache("tt", entry is not None)
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        if entry is not None:
+            entry_depth, score, flag, move, move_type = entry
+            score, flag = self.tt_perspective(game, score, flag)
+            move = orient_move(move, mirrored, game.board_size)
+            if move is not None:
+                tt_move = (move, move_type)
+            if entry_depth >= depth:
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                elif flag == UPPER:
+                    beta = min(beta, score)
+                if flag == EXACT or alpha >= beta:
+                    if stats is not None:
+                        # The table keeps only the move; the line ends there
+                        self._cut_pv(ply, [move] if move is not None else [])
+                    return score, move, move_type
+
+        # Best-Reply Search: with more than one opponent, the MIN layer merges
+        # every opponent's moves and only the single strongest reply is played
+        # before it's the AI's turn again. The tree keeps the shape of a
+        # 2-player search (MAX, MIN, MAX, ...), so the same depth fits the same
+        # time budget; with 2 players this is plain alpha-beta.
+        # Moves are generated lazily (see generate_moves).
+        possible_moves = self.node_moves(game, maximizing_player, tt_move)
         
         # Don't shuffle if we want stable sorting, or shuffle only same-priority.
         # random.shuffle(possible_moves) 
@@ -110,42 +580,157 @@ class QuoridorAI:
         
         if maximizing_player:
             max_eval = float('-inf')
-            for move_data, move_type in possible_moves:
-                game_copy = copy.deepcopy(game)
-                if move_type == 'MOVE':
-                    game_copy.move_pawn(*move_data)
-                else:
-                    game_copy.place_wall(*move_data)
+            for i, (move_data, move_type, mover) in enumerate(possible_moves):
+                game_copy = self.make_move(game, move_data, move_type, mover)
                 
-                eval_score, _, _ = self.minimax(game_copy, depth - 1, alpha, beta, False)
+                eval_score, _, _ = yield from self.minimax_steps(game_copy, depth - 1, alpha, beta, False, ply + 1)
                 
                 if eval_score > max_eval:
                     max_eval = eval_score
                     best_move = move_data
                     best_type = move_type
+                    if stats is not None:
+                        self._pv[ply] = [move_data] + self._pv.get(ply + 1, [])
                     
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoff(i)
                     break
+            self.store(key, mirrored, game, depth, max_eval, alpha_orig, beta_orig, best_move, best_type)
             return max_eval, best_move, best_type
         
         else:
             min_eval = float('inf')
-            for move_data, move_type in possible_moves:
-                game_copy = copy.deepcopy(game)
-                if move_type == 'MOVE':
-                    game_copy.move_pawn(*move_data)
-                else:
-                    game_copy.place_wall(*move_data)
+            for i, (move_data, move_type, mover) in enumerate(possible_moves):
+                game_copy = self.make_move(game, move_data, move_type, mover)
                     
-                eval_score, _, _ = self.minimax(game_copy, depth - 1, alpha, beta, True)
+                eval_score, _, _ = yield from self.minimax_steps(game_copy, depth - 1, alpha, beta, True, ply + 1)
                 
                 if eval_score < min_eval:
                     min_eval = eval_score
                     best_move = move_data
                     best_type = move_type
+                    if stats is not None:
+                        self._pv[ply] = [move_data] + self._pv.get(ply + 1, [])
                     
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    if stats is not None:
+                        stats.cutoff(i)
                     break
+            self.store(key, mirrored, game, depth, min_eval, alpha_orig, beta_orig, best_move, best_type)
             return min_eval, best_move, best_type
+
+    def _cut_pv(self, ply, line):
+        # A node answered without searching: its line is all there is, and
+        # whatever earlier siblings left deeper down is stale
+        self._pv[ply] = line
+        for deeper in [p for p in self._pv if p > ply]:
+            del self._pv[deeper]
+
+    def store(self, key, mirrored, game, depth, score, alpha, beta, move, move_type):
+        """
+        Saves a search result; alpha/beta are the window the node was searched with.
+        """
+        if score <= alpha:
+            flag = UPPER
+        elif score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if len(self.tt) >= self.tt_size:
+            self.tt.clear()
+        score, flag = self.tt_perspective(game, score, flag)
+        entry = (depth, score, flag, orient_move(move, mirrored, game.board_size), move_type)
+        self.tt[key] = entry
+        if self.shared is not None:
+            data = encode_tt(entry, game.board_size)
+            if data is not None:
+                self.shared.put(tt_key(key, self.table_owner), data)
+
+    def tt_perspective(self, game, score, flag):
+        """
+        Table scores are kept from the side to move's point of view, so
+        engines for both sides of a 2-player game can share one table (see
+        share_tables). Converts between that and this engine's view, both ways.
+        """
+        if game.turn == self.player_idx:
+            return score, flag
+        if flag != EXACT:
+            flag = LOWER if flag == UPPER else UPPER
+        return -score, flag
+
+    def save_snapshot(self, path):
+        """
+        Writes the transposition table and distance cache to path (see
+        snapshot.py), topped up with the entries of the snapshot this engine
+        was started with, up to tt_size + dist_cache_size entries in all.
+        That snapshot is first read into memory and its file closed (see
+        Snapshot.release), so path may be the file it was loaded from; it
+        stays usable for other engines, and the caller that loaded it still
+        closes it. Returns the number of entries written.
+        """
+        n = self.game.board_size
+        keys, values = [], []
+        for key, entry in self.tt.items():
+            data = encode_tt(entry, n)
+            if data is not None:
+                keys.append(tt_key(key, self.table_owner))
+                values.append(data)
+        for (wkey, r, c, axis, target), dist in self.dist_cache.items():
+            keys.append(dist_key(wkey, r, c, axis, target, n))
+            values.append(encode_dist(dist))
+        keys = np.array(keys, dtype=np.uint64)
+        values = np.array(values, dtype=np.uint64)
+        if self.snapshot is not None:
+            self.snapshot.release()
+            # This run's entries come first, so they win on duplicates
+            keys = np.concatenate([keys, self.snapshot.keys])
+            values = np.concatenate([values, self.snapshot.values])
+        limit = self.tt_size + self.dist_cache_size
+        return write_snapshot(path, keys[:limit], values[:limit], n, snapshot_fingerprint())
+
+    def share_tables(self, other):
+        """
+        Uses other's transposition table and distance cache, so what one
+        engine searched (e.g. hints for the human) speeds up the other's
+        search. 2-player games only: Best-Reply scores depend on whose
+        search it is. The snapshot isn't shared; pass it to each engine that
+        should read it.
+        """
+        self.tt = other.tt
+        self.dist_cache = other.dist_cache
+
+    def node_moves(self, game, maximizing_player, tt_move=None):
+        """
+        Yields (move_data, move_type, mover) for a search node.
+        """
+        if maximizing_player:
+            for m, t in self.generate_moves(game, self.player_idx, tt_move=tt_move):
+                yield m, t, self.player_idx
+            return
+        
+        opponents = self.opponents(game)
+        if len(opponents) > 1:
+            # The table doesn't record which opponent made the move
+            tt_move = None
+        for op_idx in opponents:
+            for m, t in self.generate_moves(game, op_idx, targets=[self.player_idx], tt_move=tt_move):
+                yield m, t, op_idx
+
+    def make_move(self, game, move_data, move_type, mover):
+        """
+        Returns a copy of game with mover's move applied. Under Best-Reply
+        Search the opponent who replies isn't necessarily next in turn order,
+        so the turn is set explicitly (a no-op with 2 players).
+        """
+        game_copy = copy.deepcopy(game)
+        game_copy.turn = mover
+        if move_type == 'MOVE':
+            game_copy.move_pawn(*move_data)
+        else:
+            game_copy.place_wall(*move_data)
+        if mover != self.player_idx:
+            game_copy.turn = self.player_idx
+        return game_copy
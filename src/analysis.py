@@ -0,0 +1,166 @@
+import copy
+import json
+import os
+from multiprocessing import Pool
+
+from .ai import QuoridorAI
+from .constants import BOARD_SIZE
+from .models import QuoridorGame, ReplayError
+from .replay import iter_game_records
+from .shared_cache import SharedCache
+
+# Whole-game analysis
+# -------------------
+# Every position of a game is searched by QuoridorAI at a fixed depth from the
+# point of view of the side to move. The played move is scored by searching
+# the resulting position one ply shallower, so both numbers come from the
+# same horizon and their difference is the eval lost by the move.
+
+BLUNDER_THRESHOLD = 2  # Path-length units lost vs. the engine's best move
+
+# Worker processes' handle on the shared cache (see analyze_file)
+_shared = None
+
+def _init_worker(cache_name):
+    global _shared
+    _shared = SharedCache.attach(cache_name)
+
+def search_position(game, player_idx, depth, shared_cache=None):
+    """
+    Returns (score, best_move, move_type) for the side player_idx at depth.
+    """
+    ai = QuoridorAI(game, player_idx, depth=depth, shared_cache=shared_cache)
+    return ai.minimax(game, depth, float('-inf'), float('inf'), True)
+
+def score_move(game, player_idx, depth, move_data, move_type, shared_cache=None):
+    """
+    Score of playing move_data from player_idx's point of view, searched to the
+    same horizon as search_position.
+    """
+    ai = QuoridorAI(game, player_idx, depth=depth, shared_cache=shared_cache)
+    child = copy.deepcopy(game)
+    if move_type == 'MOVE':
+        child.move_pawn(*move_data)
+    else:
+        child.place_wall(*move_data)
+    score, _, _ = ai.minimax(child, depth - 1, float('-inf'), float('inf'), False)
+    return score
+
+def analyze_game(moves, depth=2, blunder_threshold=BLUNDER_THRESHOLD, board_size=BOARD_SIZE,
+                 shared_cache=None):
+    """
+    Analyzes a list of notation tokens. Returns a list of per-move dicts, and
+    raises ReplayError if a move can't be replayed (load_from_notation rules).
+    """
+    game = QuoridorGame(board_size=board_size)
+    report = []
+    for ply, token in enumerate(moves):
+        # Play the move first, so a bad one is reported before it costs a search
+        child = copy.deepcopy(game)
+        child.replay([token])
+        coords = game.notation_to_coords(token)
+        played_type = 'WALL' if len(coords) == 3 else 'MOVE'
+        mover = game.turn
+
+        best_score, best_move, best_type = search_position(game, mover, depth, shared_cache)
+        if (best_move, best_type) == (coords, played_type):
+            played_score = best_score
+        else:
+            played_score = score_move(game, mover, depth, coords, played_type, shared_cache)
+
+        best_token = None
+        if best_move is not None:
+            best_token = game.coords_to_notation(*best_move)
+
+        loss = best_score - played_score
+        report.append({
+            "ply": ply,
+            "player": mover,
+            "move": token,
+            "eval": played_score,
+            "best": best_token,
+            "best_eval": best_score,
+            "loss": loss,
+            "blunder": loss >= blunder_threshold,
+        })
+
+        game = child
+    return report
+
+def _analyze_record(args):
+    index, line, moves, depth, blunder_threshold, board_size = args
+    result = {"game": index, "line": line}
+    before = _shared.counters() if _shared is not None else None
+    try:
+        result["moves"] = analyze_game(moves, depth, blunder_threshold, board_size, _shared)
+    except ReplayError as e:
+        result["error"] = {"ply": e.ply, "token": e.token, "reason": e.reason}
+    cache = None
+    if _shared is not None:
+        cache = {k: v - before[k] for k, v in _shared.counters().items()}
+    return result, cache
+
+def completed_games(output_path):
+    """
+    Game indices already present in a JSON-lines output file. A partial last
+    line (interrupted write) is ignored and will be redone.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path) as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["game"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+def analyze_file(input_path, output_path, depth=2, workers=None,
+                 blunder_threshold=BLUNDER_THRESHOLD, resume=True, board_size=BOARD_SIZE,
+                 shared_cache_mb=0):
+    """
+    Analyzes every game of a notation file across a process pool, appending
+    one JSON line per game to output_path as soon as it finishes (in
+    completion order). With resume, games already in the output are skipped.
+    shared_cache_mb > 0 gives the workers one shared distance/search cache of
+    that size (see shared_cache.py) and prints its hit rate at the end.
+    Returns the number of games analyzed in this run.
+    """
+    done = completed_games(output_path) if resume else set()
+    mode = 'a' if resume else 'w'
+
+    def tasks(f):
+        for record in iter_game_records(f):
+            if record.index not in done:
+                yield (record.index, record.line, record.moves, depth, blunder_threshold, board_size)
+
+    if resume and os.path.exists(output_path):
+        # Drop a torn trailing line so appended records start on a fresh line
+        # (even when it was the only one and no game counts as done)
+        with open(output_path, 'rb+') as out:
+            data = out.read()
+            out.truncate(data.rfind(b'\n') + 1)
+
+    shared = SharedCache.create(shared_cache_mb) if shared_cache_mb > 0 else None
+    pool_args = (_init_worker, (shared.name,)) if shared is not None else ()
+    count = 0
+    totals = {"hits": 0, "misses": 0, "stores": 0}
+    try:
+        with open(input_path) as f, open(output_path, mode) as out, Pool(workers, *pool_args) as pool:
+            for result, cache in pool.imap_unordered(_analyze_record, tasks(f)):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                count += 1
+                if cache is not None:
+                    for k in totals:
+                        totals[k] += cache[k]
+    finally:
+        if shared is not None:
+            shared.close()
+
+    if shared is not None:
+        lookups = totals["hits"] + totals["misses"]
+        rate = totals["hits"] / lookups if lookups else 0.0
+        print(f"Shared cache: {totals['hits']}/{lookups} hits ({rate:.1%}), {totals['stores']} stores")
+    return count
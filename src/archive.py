@@ -0,0 +1,312 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from .constants import BOARD_SIZE
+from .models import QuoridorGame, split_notation, format_notation
+
+# Binary game records
+# -------------------
+# On the standard 9x9 board every move is stored as a single byte:
+#   0..80    pawn move to square r * 9 + c
+#   81..208  wall at (r, c) with code 81 + ((r * 8 + c) << 1 | is_vertical)
+# Larger boards don't fit in 8 bits (11x11 needs 121 + 200 codes), so they use
+# the same layout with little-endian 16-bit codes. The archive header records
+# the board size and code width.
+# A game record is just its move codes back to back. Record boundaries live
+# in a separate index file of little-endian uint64 end offsets, so game i is
+# data[end[i - 1]:end[i]]. Both files are append-only and memory-mapped for
+# reading.
+
+MAGIC = b'QARC'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBx')  # magic, version, board size, bytes per move
+OFFSET = struct.Struct('<Q')
+
+class MoveCodec:
+    """
+    Move <-> integer code tables for one board size.
+    """
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.num_squares = board_size * board_size
+        self.num_wall_slots = 2 * (board_size - 1) * (board_size - 1)
+        self.width = 1 if self.num_squares + self.num_wall_slots <= 256 else 2
+
+        game = QuoridorGame(board_size=board_size)
+        self.code_to_token = []
+        for r in range(board_size):
+            for c in range(board_size):
+                self.code_to_token.append(game.coords_to_notation(r, c))
+        for r in range(board_size - 1):
+            for c in range(board_size - 1):
+                self.code_to_token.append(game.coords_to_notation(r, c, 'H'))
+                self.code_to_token.append(game.coords_to_notation(r, c, 'V'))
+        self.token_to_code = {t: i for i, t in enumerate(self.code_to_token)}
+
+    def encode_move(self, move):
+        if isinstance(move, str):
+            code = self.token_to_code.get(move.lower().strip())
+            if code is None:
+                raise ValueError(f"Invalid move token: {move}")
+            return code
+
+        n = self.board_size
+        if len(move) == 3:
+            r, c, o = move
+            if not (0 <= r < n - 1 and 0 <= c < n - 1) or o not in ('H', 'V'):
+                raise ValueError(f"Invalid wall: {move}")
+            return self.num_squares + ((r * (n - 1) + c) << 1 | (o == 'V'))
+
+        r, c = move
+        if not (0 <= r < n and 0 <= c < n):
+            raise ValueError(f"Invalid square: {move}")
+        return r * n + c
+
+    def decode_move(self, code):
+        if code < self.num_squares:
+            return divmod(code, self.board_size)
+        slot, vertical = divmod(code - self.num_squares, 2)
+        r, c = divmod(slot, self.board_size - 1)
+        return (r, c, 'V' if vertical else 'H')
+
+    def encode_game(self, moves):
+        if isinstance(moves, str):
+            moves = split_notation(moves)
+        codes = [self.encode_move(m) for m in moves]
+        if self.width == 1:
+            return bytes(codes)
+        codes = array('H', codes)
+        if sys.byteorder != 'little':
+            codes.byteswap()
+        return codes.tobytes()
+
+    def decode_game(self, record):
+        if self.width == 1:
+            codes = record
+        else:
+            codes = array('H', record)
+            if sys.byteorder != 'little':
+                codes.byteswap()
+        try:
+            return [self.code_to_token[b] for b in codes]
+        except IndexError:
+            raise ValueError("Corrupt record: move code out of range") from None
+
+@lru_cache(maxsize=None)
+def get_codec(board_size=BOARD_SIZE):
+    return MoveCodec(board_size)
+
+def encode_move(move, board_size=BOARD_SIZE):
+    """
+    Encodes a move as its integer code. Accepts a notation token ('e2', 'e3h')
+    or coordinates ((r, c) for pawns, (r, c, 'H'/'V') for walls).
+    """
+    return get_codec(board_size).encode_move(move)
+
+def decode_move(code, board_size=BOARD_SIZE):
+    """
+    Inverse of encode_move, returning coordinates.
+    """
+    return get_codec(board_size).decode_move(code)
+
+def encode_game(moves, board_size=BOARD_SIZE):
+    """
+    Encodes a list of moves (tokens or coordinates) or a notation string.
+    """
+    return get_codec(board_size).encode_game(moves)
+
+def decode_game(record, board_size=BOARD_SIZE):
+    """
+    Returns the notation tokens of an encoded record.
+    """
+    return get_codec(board_size).decode_game(record)
+
+class GameArchive:
+    """
+    Append-only archive of encoded games with a memory-mapped offset index.
+
+    archive = GameArchive("games.qarc")
+    archive.append("1. e2 e8 2. e3h")
+    archive[0] -> "1. e2 e8 2. e3h"
+    """
+
+    def __init__(self, path, board_size=BOARD_SIZE):
+        """
+        Opens or creates an archive. board_size only applies to new archives;
+        existing ones use the size stored in their header.
+        """
+        self.path = path
+        self.index_path = path + '.idx'
+
+        if not os.path.exists(path):
+            codec = get_codec(board_size)
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION, board_size, codec.width))
+            open(self.index_path, 'wb').close()
+        elif not os.path.exists(self.index_path):
+            raise ValueError(f"Missing index file: {self.index_path}")
+
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"Not a game archive: {path}")
+        magic, version, board, width = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or width != get_codec(board).width:
+            raise ValueError(f"Unsupported archive format: {path}")
+        self.codec = get_codec(board)
+        self.board_size = board
+
+        self._data_file = open(path, 'ab')
+        self._index_file = open(self.index_path, 'ab')
+        self._data_map = None
+        self._index_map = None
+        self._mapped_count = 0
+
+        # Keep the games both files agree on. A crash between the data write
+        # and the index write leaves a dangling data tail, which is cut off.
+        # A crash mid-way through an index write leaves a partial offset, cut
+        # off too so the next append lands on an entry boundary. And if the
+        # index reached the disk before the data did, entries pointing past
+        # the end of the data are dropped: the files only ever shrink here.
+        data_size = os.path.getsize(path) - HEADER.size
+        self._count = os.path.getsize(self.index_path) // OFFSET.size
+        while self._count and self._offset(self._count - 1) > data_size:
+            self._count -= 1
+        self._end = self._offset(self._count - 1) if self._count else 0
+        self._index_file.truncate(self._count * OFFSET.size)
+        self._data_file.truncate(HEADER.size + self._end)
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        # Maps go the same way as in _unmap: scans still running keep theirs
+        self._unmap()
+        if not self._data_file.closed:
+            self._data_file.close()
+            self._index_file.close()
+
+    def _unmap(self):
+        # Old maps are dropped rather than closed: a scan in progress may
+        # still hold a view into them, and they are released with it.
+        self._data_map = None
+        self._index_map = None
+        self._mapped_count = 0
+
+    def _remap(self):
+        # Appends grow the files past the mapped region, so map again lazily
+        # the next time a reader needs a game we haven't mapped yet.
+        self._unmap()
+        self._data_file.flush()
+        self._index_file.flush()
+        if self._count == 0:
+            return
+        with open(self.path, 'rb') as f:
+            self._data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.index_path, 'rb') as f:
+            self._index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_count = self._count
+
+    def _offset(self, i):
+        if self._index_map is not None and i < self._mapped_count:
+            return OFFSET.unpack_from(self._index_map, i * OFFSET.size)[0]
+        with open(self.index_path, 'rb') as f:
+            f.seek(i * OFFSET.size)
+            return OFFSET.unpack(f.read(OFFSET.size))[0]
+
+    def append(self, game):
+        """
+        Appends a game given as a notation string, a list of tokens or a
+        QuoridorGame. Returns the new game's index.
+        """
+        if isinstance(game, QuoridorGame):
+            if game.board_size != self.board_size:
+                raise ValueError("Game board size doesn't match the archive")
+            game = game.move_history
+        return self.append_record(self.codec.encode_game(game))
+
+    def append_record(self, record):
+        self._data_file.write(record)
+        self._end += len(record)
+        self._index_file.write(OFFSET.pack(self._end))
+        self._count += 1
+        return self._count - 1
+
+    def record(self, i):
+        """
+        Returns the raw bytes of game i.
+        """
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("game index out of range")
+        if i >= self._mapped_count:
+            self._remap()
+        start = OFFSET.unpack_from(self._index_map, (i - 1) * OFFSET.size)[0] if i else 0
+        end = OFFSET.unpack_from(self._index_map, i * OFFSET.size)[0]
+        return self._data_map[HEADER.size + start:HEADER.size + end]
+
+    def moves(self, i):
+        return self.codec.decode_game(self.record(i))
+
+    def __getitem__(self, i):
+        return format_notation(self.moves(i))
+
+    def iter_records(self):
+        """
+        Sequential scan over every record. Offsets are read in one pass from
+        the mapped index, so this runs at the speed of the page cache.
+        """
+        if self._count == 0:
+            return
+        if self._mapped_count < self._count:
+            self._remap()
+        data = self._data_map
+        ends = self._index_map[:self._mapped_count * OFFSET.size]
+        start = HEADER.size
+        for (end,) in OFFSET.iter_unpack(ends):
+            end += HEADER.size
+            yield data[start:end]
+            start = end
+
+    def __iter__(self):
+        for record in self.iter_records():
+            yield format_notation(self.codec.decode_game(record))
+
+    def import_notation(self, lines):
+        """
+        Bulk import from an iterable of notation strings (one game per line,
+        e.g. an open text file). Blank lines are skipped. Returns the number
+        of games imported.
+        """
+        count = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            self.append(line)
+            count += 1
+        self._data_file.flush()
+        self._index_file.flush()
+        return count
+
+    def export_notation(self, out):
+        """
+        Writes every game as one notation line to a text file object.
+        Returns the number of games exported.
+        """
+        count = 0
+        for notation in self:
+            out.write(notation + "\n")
+            count += 1
+        return count
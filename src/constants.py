@@ -2,10 +2,9 @@
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 BOARD_SIZE = 9  # 9x9 grid
-CELL_SIZE = 50
+CELL_SIZE = 50   # Largest cell; bigger boards shrink it (QuoridorUI.layout)
 MARGIN = 10     # Space between cells for walls
-BOARD_OFFSET_X = (SCREEN_WIDTH - (BOARD_SIZE * (CELL_SIZE + MARGIN))) // 2
-BOARD_OFFSET_Y = (SCREEN_HEIGHT - (BOARD_SIZE * (CELL_SIZE + MARGIN))) // 2
+BOARD_PADDING = 30  # Least space above and below the board
 
 # Colors
 WHITE = (255, 255, 255)
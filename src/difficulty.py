@@ -0,0 +1,79 @@
+import random
+
+# Difficulty profiles
+# -------------------
+# A fixed search depth makes both strength and think time swing with the
+# position: depth 3 is instant on an open board and slow once walls leave
+# few good replies. A profile instead deepens one ply at a time
+# (QuoridorAI.analyze_steps) until its node budget runs out and plays the
+# best move of the last depth it finished. Nodes are counted the same way on
+# every machine, so a profile picks the same move everywhere; the time cap
+# is a safety net for slow machines and is set well above what the node
+# budget takes on a typical one.
+#
+# The engine's own transposition table carries over from one move to the
+# next, and a warm table reaches deeper on the same budget. So the move
+# depends on the position and on what this engine searched earlier in the
+# game: replaying a game gives the same moves, while a fresh engine dropped
+# into the middle of it may not. Nothing from outside the game is used:
+# under a profile the engine skips the on-disk snapshot, the shared cache,
+# the endgame tablebase (which would play every covered endgame perfectly)
+# and the proof search (which would run outside the budget), and main.py
+# doesn't share its tables with the hint engine. Cached path lengths are
+# still read from the snapshot, because they are exact and can't change a
+# score or a node count.
+#
+# Weaker profiles add noise: each of the best `candidates` moves gets a
+# random bonus of up to `noise` (in path-length steps, the evaluation's unit)
+# and the highest total is played. The bonus is drawn from a generator
+# seeded with the profile's seed and the position key, so the same position
+# always gets the same move.
+
+class Difficulty:
+    """
+    A named playing strength. nodes: node budget beyond depth 1 (depth 1
+    always completes); time_ms: time cap; noise, candidates: see above.
+    """
+
+    def __init__(self, name, max_depth, nodes, time_ms, noise=0, candidates=1, seed=0):
+        self.name = name
+        self.max_depth = max_depth
+        self.nodes = nodes
+        self.time_ms = time_ms
+        self.noise = noise
+        self.candidates = candidates
+        self.seed = seed
+
+    def with_seed(self, seed):
+        return Difficulty(self.name, self.max_depth, self.nodes, self.time_ms,
+                          self.noise, self.candidates, seed)
+
+    def choose(self, scored, key):
+        """
+        Picks from scored, a best-first list of (score, move_data, move_type),
+        for the position with Zobrist key key.
+        """
+        if not self.noise or len(scored) == 1:
+            return scored[0]
+        rng = random.Random(self.seed * 1000003 + key)
+        return max(scored, key=lambda m: m[0] + rng.uniform(0, self.noise))
+
+    def __repr__(self):
+        return f"Difficulty({self.name!r})"
+
+PROFILES = {profile.name: profile for profile in (
+    Difficulty('beginner', max_depth=1, nodes=0, time_ms=250, noise=3, candidates=4),
+    Difficulty('easy', max_depth=3, nodes=150, time_ms=500, noise=1.5, candidates=3),
+    Difficulty('medium', max_depth=4, nodes=500, time_ms=1000),
+    Difficulty('hard', max_depth=5, nodes=1500, time_ms=2500),
+    Difficulty('expert', max_depth=8, nodes=5000, time_ms=8000),
+)}
+
+def get_profile(name, seed=0):
+    """
+    The profile called name, with the given seed. Raises ValueError for an
+    unknown name.
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown difficulty {name!r} (choose from {', '.join(PROFILES)})")
+    return PROFILES[name].with_seed(seed)
@@ -0,0 +1,269 @@
+import copy
+import random
+import time
+from multiprocessing import Pool
+
+from . import reference
+from .ai import QuoridorAI
+from .constants import BOARD_SIZE
+from .heatmap import wall_heatmap
+from .models import QuoridorGame, format_notation
+from .pathfinding import PathDAG, bfs, bfs_distances, goal_axis
+from .position import to_position_string
+from .state import MAX_BOARD_SIZE, CompactState
+from .symmetry import canonical_key, position_key
+
+# Differential rules fuzzing
+# --------------------------
+# Random legal games are played and every position is checked against the
+# reference rules (reference.py):
+#
+#   pawn_moves  get_valid_pawn_moves of every player (move tables, masks)
+#   neighbors   get_valid_moves of every cell (WallSet blocked masks)
+#   distance    A*, BFS distances, PathDAG and QuoridorAI.distance (cached
+#               by mirrored wall keys) for every player
+#   walls       is_valid_wall_placement of sampled slots, or of every slot
+#               plus the heatmap's legality when wall_samples is 0
+#   keys        position_key, its mirror and canonical_key
+#   state       CompactState byte round trip
+#
+# Most of the time goes into the reference wall checks (a BFS per player per
+# slot), so only wall_samples random slots are checked per position.
+#
+# For long runs (fuzz_rules.py --fast) only the table paths are checked on
+# every ply: pawn moves, and the neighbor lists of the cells around the
+# pawns, which is where jumps read the masks. The heavy checks (whole-board
+# neighbors, distances, walls, keys, state) run on a heavy_rate sample of
+# positions and on every final one. Sampling has its own random stream, so
+# a game is played the same in either mode.
+#
+# A failure is shrunk before it's reported. Dropping moves from the game
+# rarely leaves a legal game (pawn moves only make sense from where the pawn
+# stood), so the failing position is simplified instead: walls removed and
+# pawns walked home for as long as the same check still fails with every
+# slot checked. It's reported as a position string (position.py) that
+# headless.py --position and the game's loader accept, along with the game
+# it was found in.
+
+CHECKS = ('pawn_moves', 'neighbors', 'distance', 'walls', 'keys', 'state')
+
+class Mismatch:
+    """
+    A fast path disagreeing with the reference rules in game's position.
+    moves is the game that led there, as notation tokens.
+    """
+
+    def __init__(self, check, detail, game, moves):
+        self.check = check
+        self.detail = detail
+        self.game = game
+        self.moves = list(moves)
+
+    def position(self):
+        return to_position_string(self.game)
+
+    def notation(self):
+        return format_notation(self.moves, self.game.num_players)
+
+    def __str__(self):
+        return f"{self.check}: {self.detail}\n  position: {self.position()}\n  found after: {self.notation() or '(start)'}"
+
+def _squares(game, cells):
+    return sorted(game.coords_to_notation(*cell) for cell in cells)
+
+def check_position(game, ai, rng=None, wall_samples=0, heavy=True):
+    """
+    Compares the fast paths with the reference rules in game's position.
+    Returns (check, detail) for the first disagreement, or None. ai is a
+    QuoridorAI whose distance cache is kept between calls. rng picks the
+    wall_samples slots to check (0 = all). heavy=False checks only pawn
+    moves and the neighbors of the cells around the pawns.
+    """
+    n = game.board_size
+    walls = set(game.walls)
+
+    for idx in range(game.num_players):
+        fast = game.get_valid_pawn_moves(idx)
+        ref = reference.pawn_moves(game, idx)
+        if sorted(fast) != sorted(ref):
+            return 'pawn_moves', f"player {idx + 1}: {_squares(game, fast)}, reference {_squares(game, ref)}"
+
+    if heavy:
+        graph = reference.adjacency(walls, n)
+    else:
+        cells = {(p.r + dr, p.c + dc) for p in game.players
+                 for dr, dc in ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1))}
+        graph = {(r, c): reference.neighbors(walls, n, r, c) for r, c in cells if 0 <= r < n and 0 <= c < n}
+    for (r, c), ref in graph.items():
+        fast = list(game.get_valid_moves(r, c))
+        if sorted(fast) != sorted(ref):
+            return 'neighbors', f"{game.coords_to_notation(r, c)}: {_squares(game, fast)}, reference {_squares(game, ref)}"
+    if not heavy:
+        return None
+
+    for idx, p in enumerate(game.players):
+        start, goals = (p.r, p.c), game.goals(idx)
+        ref = reference.distance(graph, start, goals)
+        fast = {
+            'a_star': bfs(game, start, goals),
+            'bfs_distances': bfs_distances(game, list(goals)).get(start, float('inf')),
+            'PathDAG': PathDAG(game, start, goals).length,
+            'QuoridorAI.distance': ai.distance(game, idx),
+        }
+        for name, dist in fast.items():
+            if dist != ref:
+                return 'distance', f"player {idx + 1} {name}: {dist}, reference {ref}"
+
+    slots = [(r, c, o) for r in range(n - 1) for c in range(n - 1) for o in ('H', 'V')]
+    if wall_samples:
+        slots = rng.sample(slots, min(wall_samples, len(slots)))
+    heatmap = None if wall_samples else wall_heatmap(game)
+    for wall in slots:
+        ref = reference.wall_legal(game, *wall, graph)
+        if game.is_valid_wall_placement(*wall) != ref:
+            return 'walls', f"{game.coords_to_notation(*wall)}: is_valid_wall_placement {not ref}, reference {ref}"
+        if heatmap is not None and (heatmap[wall] is not None) != ref:
+            return 'walls', f"{game.coords_to_notation(*wall)}: wall_heatmap {not ref}, reference {ref}"
+    if set(game.walls) != walls:
+        return 'walls', "wall validation changed the walls"
+
+    key, mirror_key = reference.zobrist_key(game), reference.zobrist_key(game, mirrored=True)
+    if position_key(game) != key:
+        return 'keys', f"position_key {position_key(game):#x}, reference {key:#x}"
+    if position_key(game, mirrored=True) != mirror_key:
+        return 'keys', f"mirrored position_key {position_key(game, mirrored=True):#x}, reference {mirror_key:#x}"
+    if canonical_key(game)[0] != min(key, mirror_key):
+        return 'keys', f"canonical_key {canonical_key(game)[0]:#x}, reference {min(key, mirror_key):#x}"
+
+    if n <= MAX_BOARD_SIZE:
+        restored = CompactState.from_bytes(CompactState.from_game(game).to_bytes()).to_game()
+        if position_key(restored) != key or set(restored.walls) != walls:
+            return 'state', "CompactState round trip changed the position"
+    return None
+
+def shrink(mismatch):
+    """
+    Simplifies mismatch's position while it still fails the same check:
+    walls are removed one at a time, then pawns step back towards their
+    start squares. Returns a new Mismatch, or mismatch itself if it doesn't
+    reproduce with a fresh engine (a stale-cache bug, say).
+    """
+    def fails(game):
+        found = check_position(game, QuoridorAI(game, 0, depth=1))
+        return found if found is not None and found[0] == mismatch.check else None
+
+    game = copy.deepcopy(mismatch.game)
+    game.move_history = []
+    found = fails(game)
+    if found is None:
+        return mismatch
+
+    starts = [(p.r, p.c) for p in QuoridorGame(game.num_players, game.board_size).players]
+    changed = True
+    while changed:
+        changed = False
+        for wall in sorted(game.walls):
+            game.walls.remove(wall)
+            result = fails(game)
+            if result is not None:
+                found, changed = result, True
+            else:
+                game.walls.add(wall)
+        for p, (sr, sc) in zip(game.players, starts):
+            r, c = p.r, p.c
+            for step in ((r + (sr > r) - (sr < r), c), (r, c + (sc > c) - (sc < c))):
+                if step == (r, c) or any((q.r, q.c) == step for q in game.players):
+                    continue
+                p.move(*step)
+                result = fails(game)
+                if result is not None:
+                    found, changed = result, True
+                    break
+                p.move(r, c)
+    return Mismatch(mismatch.check, found[1], game, mismatch.moves)
+
+def play_game(game_index, ai=None, seed=0, num_players=2, board_size=BOARD_SIZE,
+              max_plies=200, wall_samples=8, wall_rate=0.3, heavy_rate=1.0):
+    """
+    Plays one random legal game, checking every position. Returns (positions
+    checked, Mismatch or None); the mismatch isn't shrunk yet. Pawn moves
+    head for the goal half the time so games also reach their endings.
+    heavy_rate: share of positions that get the heavy checks (the last
+    position always does).
+    """
+    rng = random.Random(seed * 1000003 + game_index)
+    sampler = random.Random(~(seed * 1000003 + game_index))
+    game = QuoridorGame(num_players, board_size)
+    if ai is None:
+        ai = QuoridorAI(game, 0, depth=1)
+    positions = 0
+
+    while True:
+        over = game.winner() is not None or len(game.move_history) >= max_plies
+        heavy = over or heavy_rate >= 1 or sampler.random() < heavy_rate
+        found = check_position(game, ai, sampler, wall_samples, heavy)
+        positions += 1
+        if found is not None:
+            return positions, Mismatch(*found, game, game.move_history)
+        if over:
+            return positions, None
+
+        player = game.current_player()
+        if player.walls_remaining > 0 and rng.random() < wall_rate:
+            n = board_size - 1
+            if any(game.place_wall(rng.randrange(n), rng.randrange(n), rng.choice('HV')) for _ in range(4)):
+                continue
+        moves = game.get_valid_pawn_moves()
+        if not moves:
+            return positions, None
+        if rng.random() < 0.5:
+            axis, target = goal_axis(game.goals(game.turn))
+            move = min(moves, key=lambda m: abs(m[axis] - target))
+        else:
+            move = rng.choice(moves)
+        game.move_pawn(*move)
+
+def fuzz_games(first, last, **play_args):
+    """
+    Plays games [first, last) with one engine (so its caches carry over).
+    Returns (games, positions, shrunk Mismatch or None); stops at the first
+    mismatch.
+    """
+    ai = QuoridorAI(QuoridorGame(play_args.get('num_players', 2), play_args.get('board_size', BOARD_SIZE)), 0, depth=1)
+    positions = 0
+    for index in range(first, last):
+        count, mismatch = play_game(index, ai, **play_args)
+        positions += count
+        if mismatch is not None:
+            return index - first + 1, positions, shrink(mismatch)
+    return last - first, positions, None
+
+def _fuzz_games(args):
+    first, last, play_args = args
+    return fuzz_games(first, last, **play_args)
+
+def fuzz(num_games, workers=None, batch=100, report_every=10.0, **play_args):
+    """
+    Fuzzes num_games games across a process pool (in this process if
+    workers is 1). Returns (games, positions, Mismatch or None), stopping at
+    the first mismatch. Games are seeded by index, so a run is reproducible.
+    """
+    tasks = [(first, min(first + batch, num_games), play_args) for first in range(0, num_games, batch)]
+    games = positions = 0
+    start = last_report = time.perf_counter()
+    pool = Pool(workers) if workers != 1 else None
+    try:
+        results = pool.imap_unordered(_fuzz_games, tasks) if pool else map(_fuzz_games, tasks)
+        for count, checked, mismatch in results:
+            games += count
+            positions += checked
+            if mismatch is not None:
+                return games, positions, mismatch
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                print(f"{games} games, {positions} positions, {games / (now - start) * 60:.0f} games/min")
+                last_report = now
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return games, positions, None
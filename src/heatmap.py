@@ -0,0 +1,51 @@
+from .pathfinding import analyze_paths
+from .symmetry import position_key
+from .tablebase import wall_fits
+
+# Wall impact heatmap
+# -------------------
+# What every wall slot would do to each player's shortest path. Checking the
+# slots one by one costs a path search per player per slot (and another
+# for the Golden Rule). Instead every player's shortest-path DAG is built
+# once (pathfinding.PathDAG): a wall that cuts no shortest path changes
+# nothing, so only the few slots across every shortest path get a search.
+# A wall that disconnects some player shows up as an infinite increase,
+# which is exactly the Golden Rule, so legality comes out of the same pass.
+
+def wall_heatmap(game):
+    """
+    Returns {(r, c, orientation): increases} for every wall slot, where
+    increases is a tuple of path-length increases in player order, or None
+    if the wall can't be placed (overlap, crossing or Golden Rule). Wall
+    counts aren't considered.
+    """
+    impacts = [dag.wall_impacts() for dag in analyze_paths(game)]
+    heatmap = {}
+    n = game.board_size - 1
+    for r in range(n):
+        for c in range(n):
+            for orientation in ('H', 'V'):
+                wall = (r, c, orientation)
+                if not wall_fits(game.walls, r, c, orientation, game.board_size):
+                    heatmap[wall] = None
+                    continue
+                increases = tuple(impact.get(wall, 0) for impact in impacts)
+                heatmap[wall] = None if float('inf') in increases else increases
+    return heatmap
+
+class WallHeatmap:
+    """
+    wall_heatmap of a game, recomputed only when the position changes, so
+    it can be asked for every frame.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.slots = {}
+
+    def update(self, game):
+        key = position_key(game)
+        if key != self.key:
+            self.slots = wall_heatmap(game)
+            self.key = key
+        return self.slots
@@ -0,0 +1,55 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
+# Parallel wall enumeration
+# -------------------------
+# is_valid_wall_placement works on a private copy of the wall masks and
+# leaves the game untouched, so many threads can validate slots of one game
+# at once. On a free-threaded CPython (3.13t and later, GIL disabled) that
+# spreads the Golden Rule searches over the cores. With a GIL the threads
+# would only take turns, so slots are checked on the calling thread instead,
+# unless threads are asked for explicitly.
+
+MIN_SLOTS_PER_THREAD = 8   # Smaller batches cost more to hand out than to check
+
+def free_threaded():
+    """
+    Whether Python threads run in parallel here (GIL disabled).
+    """
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+def wall_slots(board_size):
+    n = board_size - 1
+    return [(r, c, o) for r in range(n) for c in range(n) for o in ('H', 'V')]
+
+@lru_cache(maxsize=None)
+def _executor(workers):
+    # One pool per size, kept for the life of the process
+    return ThreadPoolExecutor(workers, thread_name_prefix="legal-walls")
+
+def _check(game, slots):
+    return [wall for wall in slots if game.is_valid_wall_placement(*wall)]
+
+def legal_walls(game, slots=None, workers=None, threads=None):
+    """
+    The walls among slots (default: every slot) that can be placed in game,
+    in slot order. Wall counts aren't considered. threads: True to use a
+    pool of workers threads (default: one per core), False for the calling
+    thread only, None to use threads only on a free-threaded build. Don't
+    change the game until it returns.
+    """
+    slots = wall_slots(game.board_size) if slots is None else list(slots)
+    workers = workers or os.cpu_count() or 1
+    if threads is None:
+        threads = free_threaded()
+    workers = min(workers, len(slots) // MIN_SLOTS_PER_THREAD)
+    if not threads or workers <= 1:
+        return _check(game, slots)
+
+    # A few chunks per thread, since slots near the pawns cost more
+    size = max(MIN_SLOTS_PER_THREAD, -(-len(slots) // (4 * workers)))
+    chunks = [slots[i:i + size] for i in range(0, len(slots), size)]
+    return [wall for part in _executor(workers).map(partial(_check, game), chunks) for wall in part]
@@ -1,11 +1,210 @@
 import pygame
+from functools import lru_cache
 from .constants import *
-from .pathfinding import is_path_exists
+from .pathfinding import goal_axis
+
+def walls_per_player(board_size, num_players=2):
+    """
+    Wall supply scaled with the board: the standard 10 (2 players) / 5 (4
+    players) on 9x9, one more per extra rank.
+    """
+    base = WALLS_PER_PLAYER_2 if num_players == 2 else WALLS_PER_PLAYER_4
+    return max(1, base * (board_size + 1) // (BOARD_SIZE + 1))
+
+@lru_cache(maxsize=None)
+def row_goals(goal_row, board_size):
+    # Shared, immutable goal list so hot paths don't rebuild it per call
+    return tuple((goal_row, c) for c in range(board_size))
+
+@lru_cache(maxsize=None)
+def col_goals(goal_col, board_size):
+    return tuple((r, goal_col) for r in range(board_size))
+
+# Pawn move tables
+# ----------------
+# Cells are indexed r * n + c and directions are up, down, left, right
+# (bit 1 << d). For each board size, per (cell, direction): the neighbor, the
+# square behind it (straight jump) and the two side squares next to it
+# (diagonal jump), -1 off the board. WallSet keeps, per cell, a mask of the
+# directions walls block, so move generation is table lookups plus bit tests.
+
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+class MoveTables:
+    def __init__(self, n):
+        self.board_size = n
+        cells = n * n
+        self.coords = [divmod(i, n) for i in range(cells)]  # Shared (r, c) tuples
+        self.step = [[-1] * 4 for _ in range(cells)]
+        self.jump = [[-1] * 4 for _ in range(cells)]
+        self.sides = [[()] * 4 for _ in range(cells)]  # ((square, direction from the neighbor), ...)
+
+        def cell(r, c):
+            return r * n + c if 0 <= r < n and 0 <= c < n else -1
+
+        for i in range(cells):
+            r, c = self.coords[i]
+            for d, (dr, dc) in enumerate(DIRECTIONS):
+                nb = cell(r + dr, c + dc)
+                if nb < 0:
+                    continue
+                self.step[i][d] = nb
+                self.jump[i][d] = cell(r + 2 * dr, c + 2 * dc)
+                sides = []
+                for sr, sc in ((dc, dr), (-dc, -dr)):
+                    side = cell(r + dr + sr, c + dc + sc)
+                    if side >= 0:
+                        sides.append((side, DIRECTIONS.index((sr, sc))))
+                self.sides[i][d] = tuple(sides)
+
+        # Wall-only neighbors of every cell for each of the 16 blocked masks
+        self.neighbors = [
+            [tuple(self.coords[self.step[i][d]] for d in range(4)
+                   if self.step[i][d] >= 0 and not mask >> d & 1)
+             for mask in range(16)]
+            for i in range(cells)
+        ]
+
+@lru_cache(maxsize=None)
+def move_tables(board_size):
+    return MoveTables(board_size)
+
+def wall_bits(n, r, c, orientation):
+    """
+    The (cell, direction bit) pairs a wall at (r, c) blocks. A wall lies
+    along the 2x2 block with top-left cell (r, c).
+    """
+    i = r * n + c
+    if orientation == 'H':
+        # Cuts (r, c)-(r+1, c) and (r, c+1)-(r+1, c+1)
+        return ((i, 2), (i + n, 1), (i + 1, 2), (i + 1 + n, 1))
+    # Cuts (r, c)-(r, c+1) and (r+1, c)-(r+1, c+1)
+    return ((i, 8), (i + 1, 4), (i + n, 8), (i + n + 1, 4))
+
+def wall_mask(walls, board_size):
+    """
+    Packs a wall layout into an int: bit (r * (n - 1) + c) * 2 + is_vertical
+    per wall. Position strings and tablebase files both use this layout.
+    """
+    n = board_size
+    mask = 0
+    for r, c, o in walls:
+        mask |= 1 << ((r * (n - 1) + c) * 2 + (o == 'V'))
+    return mask
+
+def reaches_goal(n, blocked, start, goals):
+    """
+    Whether start can walk to a goal cell given blocked, a list of per-cell
+    direction masks laid out like WallSet.blocked. Depth-first, trying the
+    step towards the goal first, since only existence matters. Reads nothing
+    but its arguments, so concurrent calls are safe.
+    """
+    tables = move_tables(n)
+    step, coords = tables.step, tables.coords
+    axis, target = goal_axis(goals)
+    # Directions pushed last are popped first: away, sideways, towards
+    toward = 2 * axis + (target != 0)
+    side = 2 - 2 * axis
+    order = (toward ^ 1, side, side + 1, toward)
+    i = start[0] * n + start[1]
+    seen = bytearray(n * n)
+    seen[i] = 1
+    stack = [i]
+    while stack:
+        i = stack.pop()
+        if coords[i][axis] == target:
+            return True
+        mask = blocked[i]
+        for d in order:
+            nb = step[i][d]
+            if nb >= 0 and not mask >> d & 1 and not seen[nb]:
+                seen[nb] = 1
+                stack.append(nb)
+    return False
+
+class WallSet(set):
+    """
+    Set of (r, c, orientation) walls that also keeps blocked[cell], the mask
+    of directions walls block from each cell. Only add/remove/discard/update
+    /clear keep the masks in sync; other in-place set operators aren't
+    supported. Walls that overlap (trusted replays don't check) each block
+    the edges they cover, and removing one leaves the other's edges blocked.
+    """
+
+    def __init__(self, board_size=BOARD_SIZE, walls=()):
+        super().__init__()
+        self.board_size = board_size
+        self.blocked = [0] * (board_size * board_size)
+        self.update(walls)
+
+    def __reduce__(self):
+        return (WallSet, (self.board_size, list(self)))
+
+    def add(self, wall):
+        if wall not in self:
+            super().add(wall)
+            blocked = self.blocked
+            for cell, bit in wall_bits(self.board_size, *wall):
+                blocked[cell] |= bit
+
+    def remove(self, wall):
+        super().remove(wall)
+        blocked = self.blocked
+        n = self.board_size
+        for cell, bit in wall_bits(n, *wall):
+            blocked[cell] &= ~bit
+        # Put back the edges shared with a wall one slot along the same axis
+        r, c, o = wall
+        for other in (((r, c - 1, o), (r, c + 1, o)) if o == 'H' else ((r - 1, c, o), (r + 1, c, o))):
+            if other in self:
+                for cell, bit in wall_bits(n, *other):
+                    blocked[cell] |= bit
+
+    def discard(self, wall):
+        if wall in self:
+            self.remove(wall)
+
+    def update(self, *iterables):
+        for walls in iterables:
+            for wall in walls:
+                self.add(wall)
+
+    def clear(self):
+        super().clear()
+        self.blocked = [0] * (self.board_size * self.board_size)
+
+def split_notation(notation_str):
+    """
+    Splits a game string ("1. e2 e8 2. e3h") into its move tokens.
+    """
+    # Remove numbers and dots
+    clean = notation_str.replace('.', ' ')
+    return [t for t in clean.split() if not t.isdigit()]
+
+def format_notation(moves, num_players=2):
+    # Format: 1. e2 e8 2. e3 ... (one numbered group per round of num_players moves)
+    out = []
+    for i in range(0, len(moves), num_players):
+        move_num = (i // num_players) + 1
+        out.append(f"{move_num}. " + " ".join(moves[i:i + num_players]))
+    return " ".join(out).strip()
+
+class ReplayError(ValueError):
+    """
+    A move that could not be replayed. ply is the 0-based index of the move
+    within the game.
+    """
+    def __init__(self, ply, token, reason):
+        super().__init__(f"{reason}: '{token}' at ply {ply}")
+        self.ply = ply
+        self.token = token
+        self.reason = reason
 
 class Player:
-    def __init__(self, start_pos, goal_row, color, walls):
+    def __init__(self, start_pos, goal_row, color, walls, goal_col=None):
         self.r, self.c = start_pos  # (row, col)
-        self.goal_row = goal_row    # The row index they need to reach (0 or 8)
+        self.goal_row = goal_row    # The row index they need to reach (0 or board_size - 1)
+        self.goal_col = goal_col    # Side players (4-player game) race to a column instead; goal_row is None
         self.color = color
         self.walls_remaining = walls
 
@@ -14,45 +213,84 @@ class Player:
         self.c = c
 
     def has_won(self):
+        if self.goal_row is None:
+            return self.c == self.goal_col
         return self.r == self.goal_row
 
 class QuoridorGame:
-    def __init__(self, num_players=2):
+    def __init__(self, num_players=2, board_size=BOARD_SIZE):
         self.num_players = num_players
+        self.board_size = board_size
         self.turn = 0  # 0 or 1 (for 2 players)
         
-        # Initialize players
+        # Initialize players (9x9 shown; everything scales with board_size)
         # Player 1: Starts at (8, 4), Goal row 0 (Top)
         # Player 2: Starts at (0, 4), Goal row 8 (Bottom)
+        # 4 players add:
+        # Player 3: Starts at (4, 0), Goal column 8 (Right)
+        # Player 4: Starts at (4, 8), Goal column 0 (Left)
+        last, mid = board_size - 1, board_size // 2
+        walls = walls_per_player(board_size, num_players)
         self.players = [
-            Player((8, 4), 0, RED, WALLS_PER_PLAYER_2),
-            Player((0, 4), 8, BLUE, WALLS_PER_PLAYER_2)
+            Player((last, mid), 0, RED, walls),
+            Player((0, mid), last, BLUE, walls)
         ]
+        if num_players == 4:
+            self.players += [
+                Player((mid, 0), None, GREEN, walls, goal_col=last),
+                Player((mid, last), None, GOLD, walls, goal_col=0)
+            ]
         
         # Walls: Set of (r, c, orientation). 
-        # r, c are 0..7 representing the top-left coordinate of the 2x2 block
+        # r, c are 0..board_size-2 representing the top-left coordinate of the 2x2 block
         # orientation: 'H' or 'V'
-        self.walls = set()
+        self.walls = WallSet(board_size)
         
         # History for notation
         self.move_history = [] 
 
+    @property
+    def walls(self):
+        return self._walls
+
+    @walls.setter
+    def walls(self, walls):
+        # Plain sets are converted so the blocked masks always exist
+        if not isinstance(walls, WallSet) or walls.board_size != self.board_size:
+            walls = WallSet(self.board_size, walls)
+        self._walls = walls
+
     def current_player(self):
         return self.players[self.turn]
 
     def switch_turn(self):
         self.turn = (self.turn + 1) % self.num_players
 
+    def goals(self, player_idx):
+        p = self.players[player_idx]
+        if p.goal_row is None:
+            return col_goals(p.goal_col, self.board_size)
+        return row_goals(p.goal_row, self.board_size)
+
+    def winner(self):
+        """
+        Index of the player who has reached their goal, or None.
+        """
+        for i, p in enumerate(self.players):
+            if p.has_won():
+                return i
+        return None
+
     def coords_to_notation(self, r, c, orientation=None):
         # Columns: a-i (0-8)
         # Rows: 1-9 (8-0). Note: board row 8 is '1', row 0 is '9' usually? 
         # Standard Quoridor:
         # Rows are 1-9 from bottom (row 8) to top (row 0).
         # So row_idx 8 -> '1', row_idx 0 -> '9'.
-        # Formula: rank = 9 - r
+        # Formula: rank = 9 - r (board_size - r in general)
         
         col_char = chr(ord('a') + c)
-        rank = 9 - r
+        rank = self.board_size - r
         
         base = f"{col_char}{rank}"
         
@@ -84,7 +322,7 @@ class QuoridorGame:
         except:
             return None
             
-        r = 9 - rank
+        r = self.board_size - rank
         
         if orientation:
             return (r, c, orientation)
@@ -93,11 +331,14 @@ class QuoridorGame:
     def is_valid_wall_placement(self, r, c, orientation):
         """
         Validates wall placement:
-        1. Bounds check (0 <= r, c <= 7)
+        1. Bounds check (0 <= r, c <= board_size - 2)
         2. Collision with existing walls (Intersection and Overlap)
         3. Golden Rule: Both players must have a path to their goal.
+        The game isn't modified, so any number of threads may validate walls
+        on one game at once (see legal_walls.py), as long as nobody moves.
         """
-        if not (0 <= r < 8 and 0 <= c < 8):
+        n = self.board_size - 1
+        if not (0 <= r < n and 0 <= c < n):
             return False
 
         # Check collisions
@@ -111,20 +352,16 @@ class QuoridorGame:
             if (r - 1, c, 'V') in self.walls or (r + 1, c, 'V') in self.walls:
                 return False
 
-        # Golden Rule Check
-        # Temporarily add wall
-        self.walls.add((r, c, orientation))
-        
-        valid = True
-        for p in self.players:
-            # goal_nodes should be all cells in p.goal_row
-            goals = [(p.goal_row, col) for col in range(9)]
-            if not is_path_exists(self, (p.r, p.c), goals):
-                valid = False
-                break
-        
-        self.walls.remove((r, c, orientation))
-        return valid
+        # Golden Rule Check, on a private copy of the blocked masks with
+        # the wall added (the game's own walls are left alone)
+        n = self.board_size
+        blocked = list(self.walls.blocked)
+        for cell, bit in wall_bits(n, r, c, orientation):
+            blocked[cell] |= bit
+        for i, p in enumerate(self.players):
+            if not reaches_goal(n, blocked, (p.r, p.c), self.goals(i)):
+                return False
+        return True
 
     def place_wall(self, r, c, orientation):
         if self.current_player().walls_remaining > 0 and self.is_valid_wall_placement(r, c, orientation):
@@ -169,48 +406,44 @@ class QuoridorGame:
             player_idx = self.turn
         
         player = self.players[player_idx]
-        opponent = self.players[1 - player_idx]
+        n = self.board_size
+        tables = move_tables(n)
+        blocked = self.walls.blocked
+        coords = tables.coords
+        i = player.r * n + player.c
+        mask = blocked[i]
         
-        r, c = player.r, player.c
-        moves = []
+        if check_walls_only:
+            return list(tables.neighbors[i][mask])
         
-        # Directions: Up, Down, Left, Right
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        # Any other pawn can be jumped (2 or 4 players)
+        occupied = 0
+        for j, p in enumerate(self.players):
+            if j != player_idx:
+                occupied |= 1 << (p.r * n + p.c)
         
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
+        moves = []
+        step = tables.step[i]
+        for d in range(4):
+            nb = step[d]
+            if nb < 0 or mask >> d & 1:
+                continue
+            if not occupied >> nb & 1:
+                moves.append(coords[nb])
+                continue
             
-            if 0 <= nr < 9 and 0 <= nc < 9:
-                if not self.is_move_blocked(r, c, nr, nc):
-                    if check_walls_only:
-                        moves.append((nr, nc))
-                    else:
-                        # Check if occupied by opponent
-                        if (nr, nc) == (opponent.r, opponent.c):
-                            # Try to jump
-                            jump_r, jump_c = nr + dr, nc + dc
-                            
-                            # Straight Jump
-                            if 0 <= jump_r < 9 and 0 <= jump_c < 9 and not self.is_move_blocked(nr, nc, jump_r, jump_c):
-                                moves.append((jump_r, jump_c))
-                            else:
-                                # Diagonal Jump (if blocked or edge)
-                                # Try both diagonals from the opponent's position
-                                # Relative to opponent (nr, nc), we try 90 degree turns
-                                # dr, dc is the direction TO the opponent
-                                # Diagonals are (nr + dc, nc + dr) and (nr - dc, nc - dr)
-                                
-                                diag1 = (nr + dc, nc + dr)
-                                diag2 = (nr - dc, nc - dr)
-                                
-                                for dr_d, dc_d in [(dc, dr), (-dc, -dr)]:
-                                    diag_r, diag_c = nr + dr_d, nc + dc_d
-                                    if 0 <= diag_r < 9 and 0 <= diag_c < 9:
-                                        if not self.is_move_blocked(nr, nc, diag_r, diag_c):
-                                            moves.append((diag_r, diag_c))
-                                            
-                        else:
-                            moves.append((nr, nc))
+            # Straight jump (a pawn behind counts like a wall)
+            jump = tables.jump[i][d]
+            if jump >= 0 and not blocked[nb] >> d & 1 and not occupied >> jump & 1:
+                moves.append(coords[jump])
+                continue
+            
+            # Diagonal jump (if blocked or edge), around the jumped pawn
+            for side, sd in tables.sides[i][d]:
+                if not blocked[nb] >> sd & 1 and not occupied >> side & 1:
+                    # Two jumped pawns can offer the same diagonal
+                    if coords[side] not in moves:
+                        moves.append(coords[side])
                             
         return moves
 
@@ -221,18 +454,10 @@ class QuoridorGame:
         But BFS calls board.get_valid_moves(x, y, ...).
         We'll adapt this. The BFS in pathfinding.py expects (x, y) which matches our (r, c) if consistent.
         """
-        # Create a dummy player at (r,c) to reuse logic?
-        # Actually logic inside get_valid_pawn_moves assumes checks relative to self.players[player_idx]
-        # We need a generic "get neighbors" for BFS.
-        
-        moves = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < 9 and 0 <= nc < 9:
-                 if not self.is_move_blocked(r, c, nr, nc):
-                     moves.append((nr, nc))
-        return moves
+        # Wall-only neighbors come straight from the tables (shared tuple)
+        n = self.board_size
+        i = r * n + c
+        return move_tables(n).neighbors[i][self.walls.blocked[i]]
 
     def move_pawn(self, r, c):
         if (r, c) in self.get_valid_pawn_moves():
@@ -246,48 +471,57 @@ class QuoridorGame:
         return False
         
     def get_game_notation(self):
-        # Format: 1. e2 e8 2. e3 ...
-        out = []
-        for i in range(0, len(self.move_history), 2):
-            move_num = (i // 2) + 1
-            p1_move = self.move_history[i]
-            p2_move = self.move_history[i+1] if i+1 < len(self.move_history) else ""
-            out.append(f"{move_num}. {p1_move} {p2_move}")
-        return " ".join(out).strip()
-        
-    def load_from_notation(self, notation_str):
-        # Reset game
-        self.__init__(self.num_players)
-        
-        # Parse tokens
-        # Remove numbers and dots
-        clean = notation_str.replace('.', ' ')
-        tokens = clean.split()
+        return format_notation(self.move_history, self.num_players)
         
-        moves = []
-        for t in tokens:
-            if t.isdigit(): continue # Skip standalone numbers
-            moves.append(t)
-            
-        # Replay
+    def replay(self, moves, trusted=False):
+        """
+        Plays a list of notation tokens from the current position.
+        Raises ReplayError (with the failing ply and token) on the first bad move.
+        trusted: Skip adjacency and Golden Rule checks, for games that were
+                 already validated (archives, self-play output).
+        """
         for m in moves:
             coords = self.notation_to_coords(m)
             if not coords:
-                print(f"Invalid move token: {m}")
-                continue # or break/error
-            
-            if len(coords) == 3:
-                r, c, o = coords
-                # Force placement without validation? 
-                # Ideally validation should pass if it's a valid game.
-                # Use internal methods but ensure turn switching matches.
-                # If we use place_wall, it checks validity and switches turn.
-                if not self.place_wall(r, c, o):
-                    print(f"Failed to replay wall: {m}")
-                    return False
+                raise ReplayError(len(self.move_history), m, "invalid move token")
+
+            if trusted:
+                self.apply_move_unchecked(m, coords)
+            elif len(coords) == 3:
+                if not self.place_wall(*coords):
+                    raise ReplayError(len(self.move_history), m, "illegal wall")
             else:
-                r, c = coords
-                if not self.move_pawn(r, c):
-                     print(f"Failed to replay move: {m}")
-                     return False
+                if not self.move_pawn(*coords):
+                    raise ReplayError(len(self.move_history), m, "illegal move")
+
+    def apply_move_unchecked(self, token, coords):
+        """
+        Applies a move without any legality search. Only bounds and wall
+        counts are checked, since they are free.
+        """
+        player = self.current_player()
+        n = self.board_size
+        if len(coords) == 3:
+            r, c, o = coords
+            if not (0 <= r < n - 1 and 0 <= c < n - 1) or player.walls_remaining <= 0:
+                raise ReplayError(len(self.move_history), token, "illegal wall")
+            self.walls.add(coords)
+            player.walls_remaining -= 1
+        else:
+            r, c = coords
+            if not (0 <= r < n and 0 <= c < n):
+                raise ReplayError(len(self.move_history), token, "illegal move")
+            player.move(r, c)
+        self.move_history.append(token.lower())
+        self.switch_turn()
+
+    def load_from_notation(self, notation_str, trusted=False):
+        # Reset game
+        self.__init__(self.num_players, self.board_size)
+        
+        try:
+            self.replay(split_notation(notation_str), trusted=trusted)
+        except ReplayError as e:
+            print(f"Failed to replay game: {e}")
+            return False
         return True
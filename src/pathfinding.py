@@ -1,14 +1,36 @@
 from collections import deque
 import heapq
 
+# Optional SearchStats sink (see set_stats). Counting is done in locals and
+# flushed once per call, so a disabled sink costs one check per A* call.
+_stats = None
+
+def set_stats(stats):
+    """
+    Routes A* call/expansion counts to a SearchStats object (None disables).
+    Returns the previous sink so callers can restore it.
+    """
+    global _stats
+    previous = _stats
+    _stats = stats
+    return previous
+
+def goal_axis(goals):
+    """
+    Goals in Quoridor are a whole row (or a whole column for the side players
+    of a 4-player game). Returns (axis, value): axis 0 for a row, 1 for a column.
+    """
+    if len(goals) > 1 and goals[0][0] != goals[1][0]:
+        return 1, goals[0][1]
+    return 0, goals[0][0]
+
 def heuristic(a, goals):
     # Manhattan distance to the closest goal
     # goals is a list of (r, c). For Quoridor, it's usually a whole row.
     # Closest goal in the row is just abs(r - goal_row)
-    # Assumes set of goals share a row
     if not goals: return 0
-    goal_row = goals[0][0] # All goals in Quoridor are on the same row (0 or 8)
-    return abs(a[0] - goal_row)
+    axis, target = goal_axis(goals)
+    return abs(a[axis] - target)
 
 def a_star(board, start, goals, return_path=False):
     """
@@ -17,19 +39,24 @@ def a_star(board, start, goals, return_path=False):
     """
     # Priority Queue: (f_score, g_score, current_node)
     
-    start_h = heuristic(start, goals)
+    axis, target = goal_axis(goals)
+    start_h = abs(start[axis] - target)
     open_set = []
     heapq.heappush(open_set, (start_h, 0, start))
     
     g_score = {start: 0}
     came_from = {} # For path reconstruction
     
-    goal_rows = {g[0] for g in goals}
+    expanded = 0
     
     while open_set:
         f, g, current = heapq.heappop(open_set)
+        expanded += 1
         
-        if current[0] in goal_rows:
+        if current[axis] == target:
+            if _stats is not None:
+                _stats.astar_calls += 1
+                _stats.astar_expanded += expanded
             if return_path:
                 path = []
                 curr = current
@@ -51,9 +78,12 @@ def a_star(board, start, goals, return_path=False):
             if tentative_g < g_score.get(neighbor, float('inf')):
                 g_score[neighbor] = tentative_g
                 came_from[neighbor] = current
-                h = heuristic(neighbor, goals)
+                h = abs(neighbor[axis] - target)
                 heapq.heappush(open_set, (tentative_g + h, tentative_g, neighbor))
                 
+    if _stats is not None:
+        _stats.astar_calls += 1
+        _stats.astar_expanded += expanded
     if return_path:
         return float('inf'), []
     return float('inf')
@@ -62,9 +92,164 @@ def a_star(board, start, goals, return_path=False):
 def bfs(board, start, goals):
     return a_star(board, start, goals)
 
-def is_path_exists(board, start, goals):
-    return a_star(board, start, goals) != float('inf')
-
 def get_shortest_path(board, start, goals):
     _, path = a_star(board, start, goals, return_path=True)
     return path
+
+# Shortest-path DAG analysis
+# --------------------------
+# With d_s = BFS distance from the start and d_g = BFS distance to the goal
+# row, the edge u -> v lies on some shortest path iff d_s[u] + 1 + d_g[v] == D.
+# Counting paths from both ends gives, for every DAG edge, how many shortest
+# paths use it; an edge used by all of them is critical. A wall can only
+# lengthen the path if the paths through the edges it cuts cover every
+# shortest path, which rules out most walls without any search.
+
+def bfs_distances(board, sources, blocked=None):
+    """
+    Multi-source BFS over the wall graph (pawns ignored). Returns {cell: dist}.
+    blocked: optional set of edges (u, v) with u < v to treat as walled off.
+    """
+    dist = {s: 0 for s in sources}
+    queue = deque(sources)
+    while queue:
+        cell = queue.popleft()
+        d = dist[cell] + 1
+        for nxt in board.get_valid_moves(*cell, check_walls_only=True):
+            if nxt in dist:
+                continue
+            if blocked and ((cell, nxt) if cell < nxt else (nxt, cell)) in blocked:
+                continue
+            dist[nxt] = d
+            queue.append(nxt)
+    return dist
+
+class PathDAG:
+    """
+    Shortest-path DAG of one pawn to its goal.
+    length:     shortest path length D (inf if unreachable)
+    num_paths:  number of distinct shortest paths
+    edge_paths: {(u, v): shortest paths through the edge}, u -> v towards the goal
+    critical:   edges every shortest path uses
+    """
+
+    def __init__(self, board, start, goals):
+        self.board = board
+        self.start = start
+        self.goals = goals
+        self.from_start = bfs_distances(board, [start])
+        self.to_goal = bfs_distances(board, list(goals))
+        self.length = self.to_goal.get(start, float('inf'))
+        self.edge_paths = {}
+        self.num_paths = 0
+        self.critical = set()
+        if self.length == float('inf'):
+            return
+
+        D = self.length
+        ds, dg = self.from_start, self.to_goal
+        layers = [[] for _ in range(D + 1)]
+        for cell, d in ds.items():
+            if d <= D and d + dg.get(cell, D + 1) == D:
+                layers[d].append(cell)
+
+        # Paths from the start into each DAG cell, layer by layer
+        succ = {}
+        paths_in = {start: 1}
+        for d in range(D):
+            for u in layers[d]:
+                succ[u] = [v for v in board.get_valid_moves(*u, check_walls_only=True)
+                           if ds.get(v) == d + 1 and dg.get(v) == D - d - 1]
+                for v in succ[u]:
+                    paths_in[v] = paths_in.get(v, 0) + paths_in[u]
+
+        # Paths from each DAG cell out to the goal, backwards
+        paths_out = {cell: 1 for cell in layers[D]}
+        for d in range(D - 1, -1, -1):
+            for u in layers[d]:
+                paths_out[u] = sum(paths_out[v] for v in succ[u])
+
+        self.num_paths = paths_out[start]
+        for u, vs in succ.items():
+            for v in vs:
+                count = paths_in[u] * paths_out[v]
+                self.edge_paths[(u, v)] = count
+                if count == self.num_paths:
+                    self.critical.add((u, v))
+
+    def paths_through(self, edges):
+        """
+        Upper bound on the shortest paths using any of edges.
+        """
+        total = 0
+        for u, v in edges:
+            total += self.edge_paths.get((u, v), 0) + self.edge_paths.get((v, u), 0)
+        return total
+
+    def wall_increase(self, wall):
+        """
+        How much placing wall (r, c, orientation) lengthens this path
+        (inf if it disconnects the goal). Overlaps with existing walls aren't
+        checked here.
+        """
+        edges = wall_edges(*wall)
+        if self.length == float('inf') or self.paths_through(edges) < self.num_paths:
+            # Some shortest path avoids both cut edges
+            return 0
+        blocked = {(u, v) if u < v else (v, u) for u, v in edges}
+        dist = bfs_distances(self.board, list(self.goals), blocked)
+        return dist.get(self.start, float('inf')) - self.length
+
+    def candidate_walls(self):
+        """
+        Walls that cut at least one shortest path, in no particular order.
+        """
+        n = self.board.board_size
+        walls = set()
+        for u, v in self.edge_paths:
+            for wall in edge_walls(u, v):
+                r, c, _ = wall
+                if 0 <= r < n - 1 and 0 <= c < n - 1:
+                    walls.add(wall)
+        return walls
+
+    def wall_impacts(self):
+        """
+        {wall: path increase} for every wall that lengthens the path.
+        """
+        impacts = {}
+        for wall in self.candidate_walls():
+            increase = self.wall_increase(wall)
+            if increase > 0:
+                impacts[wall] = increase
+        return impacts
+
+def wall_edges(r, c, orientation):
+    """
+    The two adjacent-cell edges a wall anchored at (r, c) cuts.
+    """
+    if orientation == 'H':
+        return (((r, c), (r + 1, c)), ((r, c + 1), (r + 1, c + 1)))
+    return (((r, c), (r, c + 1)), ((r + 1, c), (r + 1, c + 1)))
+
+def edge_walls(u, v):
+    """
+    The (up to two) wall anchors that cut the edge between adjacent cells.
+    """
+    (r1, c1), (r2, c2) = u, v
+    if c1 == c2:
+        # Vertical move: Horizontal wall at (min(r1,r2), c1) or (min(r1,r2), c1-1)
+        row = min(r1, r2)
+        return ((row, c1, 'H'), (row, c1 - 1, 'H'))
+    # Horizontal move: Vertical wall at (r1, min(c1,c2)) or (r1-1, min(c1,c2))
+    col = min(c1, c2)
+    return ((r1, col, 'V'), (r1 - 1, col, 'V'))
+
+def shortest_path_dag(board, start, goals):
+    return PathDAG(board, start, goals)
+
+def analyze_paths(game):
+    """
+    PathDAG for every player in game, in player order.
+    """
+    return [PathDAG(game, (p.r, p.c), game.goals(i)) for i, p in enumerate(game.players)]
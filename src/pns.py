@@ -0,0 +1,233 @@
+import copy
+
+from .legal_walls import legal_walls
+from .pathfinding import bfs, goal_axis
+from .symmetry import canonical_key
+
+# Proof-number search
+# -------------------
+# Alpha-beta to a fixed depth can't see a forced win that takes a long,
+# narrow sequence of walls and pawn moves. Proof-number search (Allis) grows
+# the game tree best-first, always expanding the leaf that most cheaply
+# proves or disproves "the attacker wins", and stops with an exact answer
+# or when the node budget runs out.
+#
+# OR nodes have the attacker to move: proof number = min over the children,
+# disproof number = sum. AND nodes (defender to move) the other way round.
+# A new leaf is settled at once when the game is over or the side to move
+# can step onto its goal; otherwise it starts at (attacker's path length,
+# defender's path length), so lines where the attacker is ahead are tried
+# first. Every legal move is generated, walls included, so a proof is a
+# real forced win. A side's walls sit behind one virtual child whose
+# numbers start WALL_FACTOR times the node's own and which is expanded only
+# when chosen, so races are searched as races until walls look worth it.
+#
+# Pawn moves transpose a lot, so settled positions are remembered by
+# canonical key (a proof is a finite tree, so the result doesn't depend on
+# how the position was reached) and new leaves look them up. The table is
+# kept between solves, so the next move's proof starts from this one's.
+#
+# Memory: max_nodes bounds the tree and the table. Only expanded nodes keep
+# a copy of their position (leaves are evaluated by making and unmaking the
+# move on the parent's), and settled subtrees are dropped. 2-player games
+# only.
+
+INF = 1 << 30            # Infinite proof / disproof number
+WIN, LOSS, UNKNOWN = 1, -1, 0
+WALL_FACTOR = 32
+MAX_DEFENDER_WALLS = 2   # Beyond this every AND node has ~100 walls to refute
+
+def worth_proving(game, attacker):
+    """
+    Whether a proof attempt has a realistic chance within a small budget:
+    2 players and a defender with few walls left.
+    """
+    return game.num_players == 2 and game.players[1 - attacker].walls_remaining <= MAX_DEFENDER_WALLS
+
+class PNNode:
+    __slots__ = ('parent', 'move', 'move_type', 'or_node', 'game', 'children', 'pn', 'dn')
+
+    def __init__(self, parent, move, move_type, or_node):
+        self.parent = parent
+        self.move = move
+        self.move_type = move_type
+        self.or_node = or_node
+        self.game = None       # Position, once expanded
+        self.children = None
+        self.pn = self.dn = 1
+
+class ProofSearch:
+    """
+    Proves or disproves a win for attacker from positions where attacker is
+    to move, within max_nodes tree nodes. Use solve(), or start() and step()
+    to spread the work out (see QuoridorAI.search_steps).
+    """
+
+    def __init__(self, attacker, max_nodes=10000):
+        self.attacker = attacker
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.root = None
+        self.solved = {}    # canonical key -> WIN / LOSS for the attacker
+
+    def solve(self, game):
+        """
+        Returns (WIN, move_data, move_type) with a winning move, (LOSS, None,
+        None) if every move loses, or (UNKNOWN, None, None) if the budget ran out.
+        """
+        self.start(game)
+        while self.step():
+            pass
+        return self.result()
+
+    def start(self, game):
+        root = self.root = PNNode(None, None, None, True)
+        root.game = copy.deepcopy(game)
+        self.nodes = 1
+        self.evaluate(root, root.game)
+        if game.winner() is None:
+            # Always expanded, so result() has a move to name
+            self.expand(root)
+            self.update(root)
+
+    def step(self):
+        """
+        Expands one node. Returns False once the root is settled or the
+        budget is used up.
+        """
+        root = self.root
+        if root.pn == 0 or root.dn == 0 or self.nodes >= self.max_nodes:
+            return False
+
+        # Most-proving node
+        node = root
+        while node.children:
+            if node.or_node:
+                node = min(node.children, key=lambda child: child.pn)
+            else:
+                node = min(node.children, key=lambda child: child.dn)
+        if node.game is None:
+            node.game = copy.deepcopy(node.parent.game)
+            if node.move_type == 'MOVE':
+                node.game.move_pawn(*node.move)
+            else:
+                node.game.place_wall(*node.move)
+
+        self.expand(node)
+        self.update(node)
+        return root.pn != 0 and root.dn != 0 and self.nodes < self.max_nodes
+
+    def result(self):
+        root = self.root
+        if root.pn == 0:
+            for child in root.children:
+                if child.pn == 0 and child.move_type == 'WALLS':
+                    child = next(wall for wall in child.children if wall.pn == 0)
+                if child.pn == 0:
+                    return WIN, child.move, child.move_type
+        if root.dn == 0:
+            return LOSS, None, None
+        return UNKNOWN, None, None
+
+    def evaluate(self, node, game):
+        """
+        Initial proof and disproof numbers of a new node in position game.
+        """
+        winner = game.winner()
+        if winner is not None:
+            node.pn, node.dn = (0, INF) if winner == self.attacker else (INF, 0)
+            return
+
+        known = self.solved.get(canonical_key(game)[0])
+        if known is not None:
+            node.pn, node.dn = (0, INF) if known == WIN else (INF, 0)
+            return
+
+        mover = game.turn
+        axis, target = goal_axis(game.goals(mover))
+        for move in game.get_valid_pawn_moves(mover):
+            if move[axis] == target:
+                node.pn, node.dn = (0, INF) if mover == self.attacker else (INF, 0)
+                return
+
+        attacker = game.players[self.attacker]
+        defender = game.players[1 - self.attacker]
+        node.pn = bfs(game, (attacker.r, attacker.c), game.goals(self.attacker))
+        node.dn = bfs(game, (defender.r, defender.c), game.goals(1 - self.attacker))
+
+    def expand(self, node):
+        # Children are evaluated by making and unmaking their move in place.
+        # The 'WALLS' child has the same position and side to move as node.
+        game = node.game
+        mover = game.turn
+        player = game.players[mover]
+        children = []
+
+        if node.move_type == 'WALLS':
+            or_child = not node.or_node
+            for wall in legal_walls(game):
+                game.walls.add(wall)
+                player.walls_remaining -= 1
+                game.turn = 1 - mover
+                child = PNNode(node, wall, 'WALL', or_child)
+                self.evaluate(child, game)
+                game.walls.remove(wall)
+                player.walls_remaining += 1
+                game.turn = mover
+                children.append(child)
+        else:
+            or_child = not node.or_node
+            for move in game.get_valid_pawn_moves(mover):
+                r, c = player.r, player.c
+                player.move(*move)
+                game.turn = 1 - mover
+                child = PNNode(node, move, 'MOVE', or_child)
+                self.evaluate(child, game)
+                player.move(r, c)
+                game.turn = mover
+                children.append(child)
+
+            if player.walls_remaining > 0:
+                walls = PNNode(node, None, 'WALLS', node.or_node)
+                walls.game = game
+                walls.pn, walls.dn = node.pn, node.dn
+                if node.or_node:
+                    walls.pn *= WALL_FACTOR
+                else:
+                    walls.dn *= WALL_FACTOR
+                children.append(walls)
+
+        node.children = children
+        self.nodes += len(children)
+
+    def update(self, node):
+        # Back the new numbers up until they stop changing
+        while node is not None:
+            children = node.children
+            if not children and node.move_type == 'WALLS':
+                # Every wall is illegal: the side just has its pawn moves
+                node.parent.children.remove(node)
+                node = node.parent
+                continue
+            if not children:
+                # No legal move at all (walled-in pawn): never counted as a win
+                pn, dn = INF, 0
+            elif node.or_node:
+                pn = min(child.pn for child in children)
+                dn = min(INF, sum(child.dn for child in children))
+            else:
+                pn = min(INF, sum(child.pn for child in children))
+                dn = min(child.dn for child in children)
+            if (pn, dn) == (node.pn, node.dn):
+                return
+            node.pn, node.dn = pn, dn
+            if pn == 0 or dn == 0:
+                if node.move_type != 'WALLS':
+                    if len(self.solved) >= self.max_nodes:
+                        self.solved.clear()
+                    self.solved[canonical_key(node.game)[0]] = WIN if pn == 0 else LOSS
+                if node.parent is not None and node.parent is not self.root:
+                    # The subtree is no longer needed
+                    node.children = None
+                    node.game = None
+            node = node.parent
@@ -0,0 +1,95 @@
+from .models import QuoridorGame, split_notation, wall_mask
+
+# Position snapshots
+# ------------------
+# A FEN-like one-line string that rebuilds a QuoridorGame directly, without
+# replaying moves (and their Golden Rule searches):
+#
+#   q9/e1,e9/<walls>/10,10/0[/e2,e8,e3h]
+#
+#   q9        board size (q9p4 for a 4-player game)
+#   e1,e9     pawn squares, one per player in player order
+#   <walls>   hex bitmap of wall slots: bit ((r * (n - 1) + c) * 2 + is_vertical)
+#   10,10     walls remaining per player
+#   0         index of the player to move
+#   e2,...    optional move history, so the game notation can still be copied
+
+def to_position_string(game, include_history=False):
+    header = f"q{game.board_size}" + (f"p{game.num_players}" if game.num_players != 2 else "")
+    pawns = ",".join(game.coords_to_notation(p.r, p.c) for p in game.players)
+    mask = wall_mask(game.walls, game.board_size)
+    walls_left = ",".join(str(p.walls_remaining) for p in game.players)
+    fields = [header, pawns, format(mask, 'x'), walls_left, str(game.turn)]
+    if include_history and game.move_history:
+        fields.append(",".join(game.move_history))
+    return "/".join(fields)
+
+def is_position_string(text):
+    text = text.strip()
+    return text[:1].lower() == 'q' and '/' in text
+
+def from_position_string(text):
+    """
+    Builds a QuoridorGame from a position string. Raises ValueError if the
+    string is malformed. Only cheap structural checks are made (bounds, counts,
+    overlapping walls); the position is otherwise trusted.
+    """
+    fields = text.strip().split('/')
+    if len(fields) not in (5, 6):
+        raise ValueError("Position string needs 5 or 6 '/'-separated fields")
+    header, pawns, walls, walls_left, turn = fields[:5]
+
+    try:
+        size_str, _, players_str = header[1:].lower().partition('p')
+        board_size = int(size_str)
+        num_players = int(players_str) if players_str else 2
+        mask = int(walls, 16)
+        walls_left = [int(w) for w in walls_left.split(',')]
+        turn = int(turn)
+    except ValueError:
+        raise ValueError(f"Malformed position string: {text}") from None
+    if num_players not in (2, 4) or not 3 <= board_size <= 26:
+        raise ValueError(f"Unsupported board: {header}")
+
+    game = QuoridorGame(num_players, board_size)
+    pawns = pawns.split(',')
+    if len(pawns) != num_players or len(walls_left) != num_players or not 0 <= turn < num_players:
+        raise ValueError("Position string doesn't match the number of players")
+
+    n = board_size
+    squares = set()
+    for p, token, left in zip(game.players, pawns, walls_left):
+        coords = game.notation_to_coords(token)
+        if not coords or len(coords) != 2 or not (0 <= coords[0] < n and 0 <= coords[1] < n):
+            raise ValueError(f"Invalid pawn square: {token}")
+        if coords in squares:
+            raise ValueError(f"Two pawns on {token}")
+        if not 0 <= left <= p.walls_remaining:
+            raise ValueError(f"Wall count {left} outside 0-{p.walls_remaining}")
+        squares.add(coords)
+        p.move(*coords)
+        p.walls_remaining = left
+
+    if mask >> (2 * (n - 1) * (n - 1)):
+        raise ValueError("Wall bitmap has bits outside the board")
+    walls = set()
+    bit = 0
+    while mask:
+        if mask & 1:
+            slot, vertical = divmod(bit, 2)
+            r, c = divmod(slot, n - 1)
+            walls.add((r, c, 'V' if vertical else 'H'))
+        mask >>= 1
+        bit += 1
+    for r, c, o in walls:
+        # Same-slot crossings and overlaps along the wall's own axis
+        if (r, c, 'V' if o == 'H' else 'H') in walls:
+            raise ValueError("Crossing walls")
+        if (o == 'H' and (r, c + 1, 'H') in walls) or (o == 'V' and (r + 1, c, 'V') in walls):
+            raise ValueError("Overlapping walls")
+    game.walls.update(walls)
+
+    game.turn = turn
+    if len(fields) == 6 and fields[5]:
+        game.move_history = split_notation(fields[5].replace(',', ' '))
+    return game
@@ -0,0 +1,142 @@
+from collections import deque
+
+from .symmetry import MIRROR_PLAYERS, zobrist_tables
+
+# Reference rules
+# ---------------
+# The rules written the slow, obvious way, to check the fast paths against
+# (see fuzz.py). Walls are a plain set of (r, c, orientation) and every
+# question is answered from it directly: no move tables, blocked masks,
+# A*, path DAGs or caches. Keep it that way; a shortcut here would hide the
+# bugs it's meant to find.
+
+def move_blocked(walls, r1, c1, r2, c2):
+    """
+    Whether a wall in walls cuts the step between adjacent cells.
+    """
+    if r1 == r2:
+        col = min(c1, c2)
+        return (r1, col, 'V') in walls or (r1 - 1, col, 'V') in walls
+    row = min(r1, r2)
+    return (row, c1, 'H') in walls or (row, c1 - 1, 'H') in walls
+
+def neighbors(walls, n, r, c):
+    """
+    Cells one step from (r, c) that no wall cuts off (pawns ignored).
+    """
+    cells = []
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        nr, nc = r + dr, c + dc
+        if 0 <= nr < n and 0 <= nc < n and not move_blocked(walls, r, c, nr, nc):
+            cells.append((nr, nc))
+    return cells
+
+def adjacency(walls, n):
+    """
+    {cell: neighbors} for the whole board, so searches in one position
+    don't re-derive every step from the walls.
+    """
+    return {(r, c): neighbors(walls, n, r, c) for r in range(n) for c in range(n)}
+
+def pawn_moves(game, idx):
+    """
+    Legal moves of player idx: steps, straight jumps over a pawn, and
+    diagonal jumps when the straight jump is walled, off the board or onto
+    another pawn.
+    """
+    n = game.board_size
+    walls = set(game.walls)
+    me = game.players[idx]
+    occupied = {(p.r, p.c) for i, p in enumerate(game.players) if i != idx}
+    moves = []
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        nr, nc = me.r + dr, me.c + dc
+        if not (0 <= nr < n and 0 <= nc < n) or move_blocked(walls, me.r, me.c, nr, nc):
+            continue
+        if (nr, nc) not in occupied:
+            moves.append((nr, nc))
+            continue
+        jr, jc = nr + dr, nc + dc
+        if 0 <= jr < n and 0 <= jc < n and not move_blocked(walls, nr, nc, jr, jc) and (jr, jc) not in occupied:
+            moves.append((jr, jc))
+            continue
+        for sr, sc in ((dc, dr), (-dc, -dr)):
+            d = (nr + sr, nc + sc)
+            if (0 <= d[0] < n and 0 <= d[1] < n and not move_blocked(walls, nr, nc, *d)
+                    and d not in occupied and d not in moves):
+                moves.append(d)
+    return moves
+
+def distance(graph, start, goals, cut=()):
+    """
+    Breadth-first shortest path length from start to any goal cell over
+    graph (from adjacency), or inf. cut: steps (a, b) to treat as walled,
+    listed in both directions.
+    """
+    goals = set(goals)
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        cell = queue.popleft()
+        if cell in goals:
+            return dist[cell]
+        for nxt in graph[cell]:
+            if nxt not in dist and (cell, nxt) not in cut:
+                dist[nxt] = dist[cell] + 1
+                queue.append(nxt)
+    return float('inf')
+
+def wall_legal(game, r, c, orientation, graph=None):
+    """
+    Whether a wall fits at (r, c): on the board, not overlapping or crossing
+    another wall, and leaving every player a path (the Golden Rule). Wall
+    counts aren't considered. graph: adjacency of the current walls, if
+    already built.
+    """
+    n = game.board_size
+    walls = set(game.walls)
+    if not (0 <= r < n - 1 and 0 <= c < n - 1):
+        return False
+    if (r, c, 'H') in walls or (r, c, 'V') in walls:
+        return False
+    if orientation == 'H' and ((r, c - 1, 'H') in walls or (r, c + 1, 'H') in walls):
+        return False
+    if orientation == 'V' and ((r - 1, c, 'V') in walls or (r + 1, c, 'V') in walls):
+        return False
+
+    # The wall runs along the 2x2 block at (r, c), cutting its two steps
+    # across the wall
+    if orientation == 'H':
+        steps = (((r, c), (r + 1, c)), ((r, c + 1), (r + 1, c + 1)))
+    else:
+        steps = (((r, c), (r, c + 1)), ((r + 1, c), (r + 1, c + 1)))
+    cut = set(steps) | {(b, a) for a, b in steps}
+    if graph is None:
+        graph = adjacency(walls, n)
+    return all(distance(graph, (p.r, p.c), game.goals(i), cut) != float('inf')
+               for i, p in enumerate(game.players))
+
+def zobrist_key(game, mirrored=False):
+    """
+    Zobrist key of the position, summed term by term. mirrored: the key of
+    the board reflected left to right, built by reflecting every piece first.
+    """
+    n = game.board_size
+    z = zobrist_tables(n)
+    players = list(range(game.num_players))
+    pawns = [(p.r, p.c) for p in game.players]
+    walls = list(game.walls)
+    turn = game.turn
+    if mirrored:
+        # Side players swap roles, so their pawns and wall counts swap slots
+        players = list(MIRROR_PLAYERS[game.num_players])
+        pawns = [(r, n - 1 - c) for r, c in pawns]
+        walls = [(r, n - 2 - c, o) for r, c, o in walls]
+        turn = players[turn]
+    key = 0
+    for r, c, o in walls:
+        key ^= z.wall[o][r * (n - 1) + c]
+    for i, (r, c) in enumerate(pawns):
+        key ^= z.pawn[players[i]][r * n + c]
+        key ^= z.walls_left[players[i]][game.players[i].walls_remaining]
+    return key ^ z.turn[turn]
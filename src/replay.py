@@ -0,0 +1,89 @@
+from .constants import BOARD_SIZE
+from .models import QuoridorGame, ReplayError, split_notation
+
+# Streaming loader for multi-game notation files.
+#
+# File layout: one game per line is the common case, but long games may be
+# wrapped over several lines. A line starting with "1." opens a new game and
+# a blank line closes the current one; any other line continues it.
+
+class GameRecord:
+    """
+    One game read from a notation file. line is the 1-based line it started on.
+    """
+    __slots__ = ('index', 'line', 'moves')
+
+    def __init__(self, index, line, moves):
+        self.index = index
+        self.line = line
+        self.moves = moves
+
+    def __repr__(self):
+        return f"GameRecord(index={self.index}, line={self.line}, moves={len(self.moves)})"
+
+class GameLoadError:
+    """
+    Structured report of a game that failed to replay.
+    """
+    __slots__ = ('index', 'line', 'ply', 'token', 'reason')
+
+    def __init__(self, record, error):
+        self.index = record.index
+        self.line = record.line
+        self.ply = error.ply
+        self.token = error.token
+        self.reason = error.reason
+
+    def __str__(self):
+        return f"game {self.index} (line {self.line}): {self.reason}: '{self.token}' at ply {self.ply}"
+
+    def __repr__(self):
+        return f"GameLoadError({self})"
+
+def iter_game_records(lines):
+    """
+    Lazily splits an iterable of lines (e.g. an open file) into GameRecords.
+    Only the game being assembled is kept in memory.
+    """
+    index = 0
+    start = None
+    moves = []
+    for line_no, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('1.'):
+            if moves:
+                yield GameRecord(index, start, moves)
+                index += 1
+                moves = []
+            if not stripped:
+                continue
+        if not moves:
+            start = line_no
+        moves.extend(split_notation(stripped))
+    if moves:
+        yield GameRecord(index, start, moves)
+
+def iter_games(lines, trusted=False, num_players=2, board_size=BOARD_SIZE):
+    """
+    Lazily replays every game in a notation file.
+    Yields (record, game, error): game is the final QuoridorGame, or None with
+    error set to a GameLoadError when a move could not be replayed.
+
+    trusted: Skip the legality search (see QuoridorGame.replay). Use only for
+             archives that were validated when they were written.
+    """
+    for record in iter_game_records(lines):
+        game = QuoridorGame(num_players, board_size)
+        try:
+            game.replay(record.moves, trusted=trusted)
+        except ReplayError as e:
+            yield record, None, GameLoadError(record, e)
+            continue
+        yield record, game, None
+
+def load_games_file(path, trusted=False, num_players=2, board_size=BOARD_SIZE):
+    """
+    Convenience wrapper: generator of (record, game, error) for a file path.
+    """
+    with open(path) as f:
+        yield from iter_games(f, trusted=trusted, num_players=num_players, board_size=board_size)
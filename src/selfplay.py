@@ -0,0 +1,186 @@
+import inspect
+import json
+import os
+import random
+import shutil
+from multiprocessing import Pool
+
+import numpy as np
+
+from .ai import QuoridorAI
+from .archive import get_codec
+from .constants import BOARD_SIZE
+from .models import QuoridorGame
+
+# Self-play training data
+# -----------------------
+# Games are played AI vs AI and every position is written out with the
+# engine's search score and best move, plus the final result. Output is a
+# directory of shards; shard k holds games [k * games_per_shard, (k + 1) *
+# games_per_shard) as one .npy file per column, so each column can be
+# memory-mapped (np.load(..., mmap_mode='r')) without reading the rest:
+#
+#   pawns       int8   (rows, players, 2)    pawn (r, c) per player
+#   walls       uint8  (rows, 2, n-1, n-1)   wall planes: [0] horizontal, [1] vertical
+#   walls_left  int8   (rows, players)
+#   turn        int8   (rows,)               player to move
+#   score       int16  (rows,)               search score for the player to move
+#   best_move   int16  (rows,)               MoveCodec code of the engine's move (see archive.py)
+#   result      int8   (rows,)               +1 the player to move went on to win, -1 lost, 0 unfinished
+#   game        int32  (rows,)               game index
+#   ply         int16  (rows,)
+#
+# Each shard is written to a temporary directory and renamed into place, so
+# a shard directory is either complete or absent: an interrupted run resumes
+# by skipping the shards that exist. Games are seeded by their index, so a
+# shard comes out the same whichever worker plays it. meta.json records every
+# play_game setting, and a shard played with other settings (depth, seed...)
+# is played again rather than mixed into the run.
+
+COLUMNS = ('pawns', 'walls', 'walls_left', 'turn', 'score', 'best_move', 'result', 'game', 'ply')
+SCORE_LIMIT = 32767
+
+def shard_name(index):
+    return f"shard-{index:05d}"
+
+def play_game(game_index, depth=2, random_plies=4, max_plies=200, seed=0,
+              num_players=2, board_size=BOARD_SIZE):
+    """
+    Plays one self-play game. The first random_plies moves are picked at
+    random among the engine's candidates so games differ. Returns a dict of
+    column lists (one entry per position).
+    """
+    rng = random.Random(seed * 1000003 + game_index)
+    game = QuoridorGame(num_players, board_size)
+    ais = [QuoridorAI(game, i, depth=depth) for i in range(num_players)]
+    codec = get_codec(board_size)
+    n = board_size
+    rows = {name: [] for name in COLUMNS}
+
+    while game.winner() is None and len(game.move_history) < max_plies:
+        mover = game.turn
+        ai = ais[mover]
+        ai.game = game
+        score, move_data, move_type = ai.minimax(game, depth, float('-inf'), float('inf'), True)
+        if move_data is None:
+            break
+
+        planes = np.zeros((2, n - 1, n - 1), dtype=np.uint8)
+        for r, c, o in game.walls:
+            planes[int(o == 'V'), r, c] = 1
+        rows['pawns'].append([(p.r, p.c) for p in game.players])
+        rows['walls'].append(planes)
+        rows['walls_left'].append([p.walls_remaining for p in game.players])
+        rows['turn'].append(mover)
+        rows['score'].append(max(-SCORE_LIMIT, min(SCORE_LIMIT, score)))
+        rows['best_move'].append(codec.encode_move(move_data))
+        rows['ply'].append(len(game.move_history))
+
+        if len(game.move_history) < random_plies:
+            move_data, move_type = rng.choice(ai.get_all_possible_moves(game, mover))
+        if move_type == 'MOVE':
+            game.move_pawn(*move_data)
+        else:
+            game.place_wall(*move_data)
+
+    winner = game.winner()
+    for mover in rows['turn']:
+        rows['result'].append(0 if winner is None else (1 if winner == mover else -1))
+    rows['game'] = [game_index] * len(rows['turn'])
+    return rows
+
+def write_shard(out_dir, shard_index, games, **play_args):
+    """
+    Plays the given game indices and writes them as one shard. Returns the
+    number of positions written.
+    """
+    final = os.path.join(out_dir, shard_name(shard_index))
+    tmp = final + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = {name: [] for name in COLUMNS}
+    for game_index in games:
+        rows = play_game(game_index, **play_args)
+        for name in COLUMNS:
+            columns[name].extend(rows[name])
+
+    settings = game_settings(play_args)
+    board_size = settings['board_size']
+    num_players = settings['num_players']
+    dtypes = {'pawns': np.int8, 'walls': np.uint8, 'walls_left': np.int8, 'turn': np.int8,
+              'score': np.int16, 'best_move': np.int16, 'result': np.int8,
+              'game': np.int32, 'ply': np.int16}
+    shapes = {'pawns': (num_players, 2), 'walls': (2, board_size - 1, board_size - 1),
+              'walls_left': (num_players,)}
+    count = len(columns['turn'])
+    for name in COLUMNS:
+        array = np.array(columns[name], dtype=dtypes[name]).reshape((count,) + shapes.get(name, ()))
+        np.save(os.path.join(tmp, name + ".npy"), array)
+    with open(os.path.join(tmp, "meta.json"), 'w') as f:
+        json.dump({"games": [games[0], games[-1] + 1], "positions": count,
+                   "board_size": board_size, "num_players": num_players, "play_args": settings}, f)
+    os.rename(tmp, final)
+    return count
+
+def _write_shard(args):
+    out_dir, shard_index, games, play_args = args
+    return shard_index, write_shard(out_dir, shard_index, games, **play_args)
+
+def generate(out_dir, num_games, games_per_shard=64, workers=None, **play_args):
+    """
+    Generates num_games self-play games into out_dir across a process pool,
+    skipping shards that are already complete. play_args go to play_game.
+    Returns the number of positions written in this run.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    settings = game_settings(play_args)
+    tasks = []
+    for shard_index, start in enumerate(range(0, num_games, games_per_shard)):
+        games = list(range(start, min(start + games_per_shard, num_games)))
+        meta = shard_meta(out_dir, shard_index)
+        if meta is not None and meta.get("games") == [games[0], games[-1] + 1] and meta.get("play_args") == settings:
+            continue
+        # Missing, cut short by an earlier run with fewer games, or played
+        # with other settings
+        shutil.rmtree(os.path.join(out_dir, shard_name(shard_index)), ignore_errors=True)
+        tasks.append((out_dir, shard_index, games, play_args))
+
+    total = 0
+    with Pool(workers) as pool:
+        for shard_index, count in pool.imap_unordered(_write_shard, tasks):
+            print(f"{shard_name(shard_index)}: {count} positions")
+            total += count
+    return total
+
+def game_settings(play_args):
+    """
+    play_args with play_game's defaults filled in, as recorded in meta.json.
+    """
+    bound = inspect.signature(play_game).bind(None, **play_args)
+    bound.apply_defaults()
+    settings = dict(bound.arguments)
+    del settings['game_index']
+    return settings
+
+def shard_meta(out_dir, shard_index):
+    """
+    meta.json of a complete shard (game range, settings...), or None if it
+    doesn't exist.
+    """
+    try:
+        with open(os.path.join(out_dir, shard_name(shard_index), "meta.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_shards(out_dir, mmap_mode='r'):
+    """
+    Yields one {column: array} dict per complete shard, in shard order, with
+    the arrays memory-mapped by default.
+    """
+    for name in sorted(os.listdir(out_dir)):
+        path = os.path.join(out_dir, name)
+        if not name.startswith("shard-") or name.endswith(".tmp") or not os.path.isdir(path):
+            continue
+        yield {col: np.load(os.path.join(path, col + ".npy"), mmap_mode=mmap_mode) for col in COLUMNS}
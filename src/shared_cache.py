@@ -0,0 +1,152 @@
+import struct
+from multiprocessing import shared_memory
+
+from .archive import get_codec
+
+# Shared-memory result cache
+# --------------------------
+# A fixed-size hash table in one multiprocessing.shared_memory block that all
+# worker processes on the machine attach to, so distance and search results
+# found by one worker are reused by the others and the cache memory doesn't
+# grow with the worker count.
+#
+# Each slot is two uint64 words, (key ^ data, data), written without locks.
+# A reader recomputes the key from both words, so a slot torn by a concurrent
+# writer (or holding another position) just reads as a miss. Values must be
+# non-zero (an empty slot is all zeros) and slots are always overwritten on
+# store. The slot count is a power of two and the slot index is the low bits
+# of the key (keys are Zobrist hashes).
+#
+# Layout: 32-byte header (magic, version, slot count), then the slots.
+
+MAGIC = b'QSHC'
+VERSION = 1
+HEADER = struct.Struct('<4sII16x')  # magic, version, log2(slots)
+MASK64 = (1 << 64) - 1
+
+# Mixed into keys so distance and search entries (and searches run for
+# different players) never share a key
+DIST_SALT = 0x6A09E667F3BCC908
+TT_SALT = (0xBB67AE8584CAA73B, 0x3C6EF372FE94F82B, 0xA54FF53A5F1D36F1, 0x510E527FADE682D1)
+MIX = 0x9E3779B97F4A7C15
+
+class SharedCache:
+    """
+    Lockless shared-memory hash table of 64-bit keys to 64-bit values.
+    Create it once with SharedCache.create() and pass .name to the workers,
+    which call SharedCache.attach(name). Hit counts are per process.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        magic, version, bits = HEADER.unpack_from(shm.buf)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"{shm.name} is not a shared cache")
+        self.slots = 1 << bits
+        self.mask = self.slots - 1
+        self.words = shm.buf[HEADER.size:HEADER.size + 16 * self.slots].cast('Q')
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def create(cls, size_mb=64, name=None):
+        """
+        New zeroed table using at most size_mb megabytes (rounded down to a
+        power-of-two slot count).
+        """
+        bits = max(4, (size_mb * 1024 * 1024 // 16).bit_length() - 1)
+        size = HEADER.size + (16 << bits)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, bits)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def get(self, key):
+        """
+        Stored value for key, or None.
+        """
+        i = (key & self.mask) << 1
+        check, data = self.words[i], self.words[i + 1]
+        if data and check ^ data == key:
+            self.hits += 1
+            return data
+        self.misses += 1
+        return None
+
+    def put(self, key, data):
+        i = (key & self.mask) << 1
+        self.words[i] = key ^ data
+        self.words[i + 1] = data
+        self.stores += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def counters(self):
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Entry encodings used by QuoridorAI
+
+def dist_key(wall_key, r, c, axis, target, board_size):
+    cell = ((r * board_size + c) * 2 + axis) * board_size + target + 1
+    return (wall_key ^ DIST_SALT ^ (cell * MIX)) & MASK64
+
+def encode_dist(dist):
+    # +1 so a path of length 0 isn't stored as 0; 0xFFFFFFFF = unreachable
+    return 0xFFFFFFFF if dist == float('inf') else dist + 1
+
+def decode_dist(data):
+    return float('inf') if data == 0xFFFFFFFF else data - 1
+
+def tt_key(position_key, player_idx):
+    return position_key ^ TT_SALT[player_idx]
+
+def encode_tt(entry, board_size):
+    """
+    Packs (depth, score, flag, move, move_type) into 64 bits:
+    score (32, offset) | depth (8) | flag (2) | move code + 1 (18, 0 = none).
+    Returns None for entries that don't fit (infinite scores).
+    """
+    depth, score, flag, move, _ = entry
+    if score in (float('inf'), float('-inf')) or not -(1 << 31) <= score < (1 << 31):
+        return None
+    code = 0 if move is None else get_codec(board_size).encode_move(move) + 1
+    return ((int(score) + (1 << 31)) << 32) | (min(depth, 255) << 24) | (flag << 18) | code
+
+def decode_tt(data, board_size):
+    score = (data >> 32) - (1 << 31)
+    depth = (data >> 24) & 0xFF
+    flag = (data >> 18) & 0x3
+    code = data & 0x3FFFF
+    if code == 0:
+        return depth, score, flag, None, None
+    codec = get_codec(board_size)
+    move = codec.decode_move(code - 1)
+    return depth, score, flag, move, 'WALL' if len(move) == 3 else 'MOVE'
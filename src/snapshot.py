@@ -0,0 +1,137 @@
+import mmap
+import os
+import struct
+import zlib
+
+import numpy as np
+
+# Engine cache snapshots
+# ----------------------
+# QuoridorAI's transposition table and distance cache, saved on exit so the
+# next run starts warm. Entries use the 64-bit key and value encodings of
+# shared_cache.py. The file is memory-mapped read-only and searched in place
+# (keys are sorted), so nothing is read or parsed up front. The checksum
+# pass reads the whole file, so it only runs when asked for (verify=True).
+#
+# Layout: 32-byte header (magic, version, board size, entry count, CRC-32 of
+# the entries, engine fingerprint), then count uint64 keys in ascending
+# order, then count uint64 values.
+#
+# The fingerprint identifies the engine build that wrote the entries
+# (ai.snapshot_fingerprint): search results from a different
+# evaluation or key scheme would be wrong rather than merely useless, so a
+# mismatch, like a bad checksum, makes the snapshot be ignored.
+
+MAGIC = b'QSNP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQII8x')  # magic, version, board size, count, crc32, fingerprint
+
+def write_snapshot(path, keys, values, board_size, fingerprint):
+    """
+    Writes (key, value) pairs, given as two sequences of uint64, to path.
+    Later duplicates of a key are dropped. Returns the number of entries.
+    """
+    keys = np.asarray(keys, dtype='<u8')
+    values = np.asarray(values, dtype='<u8')
+    keys, first = np.unique(keys, return_index=True)
+    values = values[first]
+    payload = keys.tobytes() + values.tobytes()
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, board_size, len(keys), zlib.crc32(payload), fingerprint))
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(keys)
+
+class Snapshot:
+    """
+    Read-only, memory-mapped snapshot. Raises ValueError if the file is
+    truncated, fails the checksum (verify=True only) or was written for
+    another board or engine build.
+    """
+
+    def __init__(self, path, board_size, fingerprint, verify=False):
+        self._file = open(path, 'rb')
+        self._map = None
+        try:
+            header = self._file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, size, count, crc, stamp = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a snapshot file")
+            if size != board_size or stamp != fingerprint:
+                raise ValueError(f"{path} was written for another board or engine version")
+            if os.fstat(self._file.fileno()).st_size != HEADER.size + 16 * count:
+                raise ValueError(f"{path} is truncated")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if verify:
+                with memoryview(self._map) as view:
+                    intact = zlib.crc32(view[HEADER.size:]) == crc
+                if not intact:
+                    raise ValueError(f"{path} is corrupted")
+        except (ValueError, OSError):
+            self.close()
+            raise
+        self.board_size = board_size
+        self.keys = np.frombuffer(self._map, dtype='<u8', count=count, offset=HEADER.size)
+        self.values = np.frombuffer(self._map, dtype='<u8', count=count, offset=HEADER.size + 8 * count)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get(self, key):
+        """
+        Stored value for key, or None.
+        """
+        i = int(self.keys.searchsorted(np.uint64(key)))
+        if i < len(self.keys) and int(self.keys[i]) == key:
+            self.hits += 1
+            return int(self.values[i])
+        self.misses += 1
+        return None
+
+    def release(self):
+        """
+        Reads the entries into memory and closes the file, so get() keeps
+        working while the file is replaced (which fails on Windows while
+        it's mapped).
+        """
+        if self._map is not None:
+            self.keys = self.keys.copy()
+            self.values = self.values.copy()
+            self._close_file()
+
+    def close(self):
+        self.keys = self.values = None
+        self._close_file()
+
+    def _close_file(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def load_snapshot(path, board_size, fingerprint, verify=False):
+    """
+    Snapshot at path, or None if there's none or it can't be used (the
+    reason is printed).
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return Snapshot(path, board_size, fingerprint, verify)
+    except (ValueError, OSError) as e:
+        print(f"Ignoring engine cache: {e}")
+        return None
@@ -0,0 +1,147 @@
+import struct
+
+from .models import QuoridorGame, WallSet, walls_per_player
+
+# Compact positions
+# -----------------
+# A QuoridorGame pickles its Player objects (colors included), a set of wall
+# tuples and the whole move history: several hundred bytes for what is, as a
+# position, a few pawn squares and two wall bitmaps. CompactState holds only
+# the position and packs it into a fixed 48-byte record, so process pools and
+# servers can pass positions around cheaply (it pickles as that record):
+#
+#   0   board size      uint8
+#   1   num players     uint8
+#   2   turn            uint8
+#   3   version         uint8
+#   4   pawn squares    4 x uint16   r * n + c per player, 0xFFFF if unused
+#   12  walls left      4 x uint8
+#   16  horizontal      128-bit bitmap, bit r * (n - 1) + c
+#   32  vertical        128-bit bitmap
+#
+# Both bitmaps hold 128 slots, enough for boards up to 12x12. The move
+# history isn't kept.
+
+VERSION = 1
+HEADER = struct.Struct('<BBBB4H4B')
+MASK_BYTES = 16
+SIZE = HEADER.size + 2 * MASK_BYTES
+MAX_BOARD_SIZE = 12
+NO_PAWN = 0xFFFF
+
+class CompactState:
+    """
+    Position-only snapshot of a game: pawns, walls, walls left and turn.
+    """
+
+    __slots__ = ('board_size', 'num_players', 'turn', 'pawns', 'walls_left', 'h_mask', 'v_mask')
+
+    def __init__(self, board_size, num_players, turn, pawns, walls_left, h_mask=0, v_mask=0):
+        self.board_size = board_size
+        self.num_players = num_players
+        self.turn = turn
+        self.pawns = tuple(pawns)            # Cell index r * n + c per player
+        self.walls_left = tuple(walls_left)
+        self.h_mask = h_mask
+        self.v_mask = v_mask
+
+    @classmethod
+    def from_game(cls, game):
+        n = game.board_size
+        if n > MAX_BOARD_SIZE:
+            raise ValueError(f"CompactState holds boards up to {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE}")
+        h_mask = v_mask = 0
+        for r, c, o in game.walls:
+            bit = 1 << (r * (n - 1) + c)
+            if o == 'H':
+                h_mask |= bit
+            else:
+                v_mask |= bit
+        return cls(n, game.num_players, game.turn,
+                   [p.r * n + p.c for p in game.players],
+                   [p.walls_remaining for p in game.players], h_mask, v_mask)
+
+    def walls(self):
+        """
+        Yields the walls as (r, c, orientation).
+        """
+        n = self.board_size - 1
+        for orientation, mask in (('H', self.h_mask), ('V', self.v_mask)):
+            slot = 0
+            while mask:
+                if mask & 1:
+                    yield (*divmod(slot, n), orientation)
+                mask >>= 1
+                slot += 1
+
+    def to_game(self):
+        n = self.board_size
+        game = QuoridorGame(self.num_players, n)
+        for p, square, left in zip(game.players, self.pawns, self.walls_left):
+            p.move(*divmod(square, n))
+            p.walls_remaining = left
+        game.walls = WallSet(n, self.walls())
+        game.turn = self.turn
+        return game
+
+    def to_bytes(self):
+        pad = 4 - self.num_players
+        head = HEADER.pack(self.board_size, self.num_players, self.turn, VERSION,
+                           *self.pawns, *(NO_PAWN,) * pad, *self.walls_left, *(0,) * pad)
+        return head + self.h_mask.to_bytes(MASK_BYTES, 'little') + self.v_mask.to_bytes(MASK_BYTES, 'little')
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Inverse of to_bytes. Raises ValueError if data isn't a valid record.
+        """
+        if len(data) != SIZE:
+            raise ValueError(f"CompactState record must be {SIZE} bytes, got {len(data)}")
+        fields = HEADER.unpack_from(data)
+        n, num_players, turn, version = fields[:4]
+        if version != VERSION:
+            raise ValueError(f"Unsupported CompactState version {version}")
+        if num_players not in (2, 4) or not 3 <= n <= MAX_BOARD_SIZE or turn >= num_players:
+            raise ValueError("Corrupt CompactState record")
+        pawns = fields[4:4 + num_players]
+        if any(square >= n * n for square in pawns):
+            raise ValueError("Pawn square outside the board")
+        if len(set(pawns)) != num_players:
+            raise ValueError("Two pawns on one square")
+        walls_left = fields[8:8 + num_players]
+        if max(walls_left) > walls_per_player(n, num_players):
+            raise ValueError("Wall count above the starting supply")
+        h_mask = int.from_bytes(data[HEADER.size:HEADER.size + MASK_BYTES], 'little')
+        v_mask = int.from_bytes(data[HEADER.size + MASK_BYTES:], 'little')
+        if (h_mask | v_mask) >> ((n - 1) * (n - 1)):
+            raise ValueError("Wall bitmap has bits outside the board")
+        # Same checks as position strings: crossings at one anchor, and
+        # overlaps one slot along the wall's axis (not across a row end)
+        if h_mask & v_mask:
+            raise ValueError("Crossing walls")
+        last_column = sum(1 << (r * (n - 1) + n - 2) for r in range(n - 1))
+        if h_mask & (h_mask >> 1) & ~last_column or v_mask & (v_mask >> (n - 1)):
+            raise ValueError("Overlapping walls")
+        return cls(n, num_players, turn, pawns, walls_left, h_mask, v_mask)
+
+    def __reduce__(self):
+        return (_from_bytes, (self.to_bytes(),))
+
+    def _fields(self):
+        return (self.board_size, self.num_players, self.turn, self.pawns,
+                self.walls_left, self.h_mask, self.v_mask)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactState):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __hash__(self):
+        return hash(self._fields())
+
+    def __repr__(self):
+        return f"CompactState({self.to_bytes().hex()})"
+
+def _from_bytes(data):
+    # Short pickle reference for __reduce__
+    return CompactState.from_bytes(data)
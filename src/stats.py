@@ -0,0 +1,65 @@
+import json
+import time
+
+class SearchStats:
+    """
+    Counters for one QuoridorAI search. Collection is opt-in: when an AI has
+    no stats object every hook is a single `is None` check.
+    """
+
+    def __init__(self):
+        self.nodes = 0              # minimax calls
+        self.leaf_evals = 0         # calls to evaluate()
+        self.astar_calls = 0
+        self.astar_expanded = 0     # nodes popped from the A* open set
+        self.cutoffs = {}           # move index -> beta cutoffs at that index
+        self.cache_hits = {}        # cache name -> hits
+        self.cache_misses = {}      # cache name -> misses
+        self.depth_times = {}       # depth -> seconds spent on that iteration
+        self.pv = []                # principal variation, notation tokens
+        self.score = None
+        self.best_move = None
+        self.elapsed = 0.0
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self._start
+
+    def cutoff(self, move_index):
+        self.cutoffs[move_index] = self.cutoffs.get(move_index, 0) + 1
+
+    def cache(self, name, hit):
+        counts = self.cache_hits if hit else self.cache_misses
+        counts[name] = counts.get(name, 0) + 1
+
+    def hit_rates(self):
+        rates = {}
+        for name in set(self.cache_hits) | set(self.cache_misses):
+            hits = self.cache_hits.get(name, 0)
+            total = hits + self.cache_misses.get(name, 0)
+            rates[name] = hits / total if total else 0.0
+        return rates
+
+    def to_dict(self):
+        return {
+            "best_move": self.best_move,
+            "score": self.score,
+            "pv": self.pv,
+            "elapsed": round(self.elapsed, 6),
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "astar_calls": self.astar_calls,
+            "astar_expanded": self.astar_expanded,
+            "cutoffs": {str(k): v for k, v in sorted(self.cutoffs.items())},
+            "cache_hit_rates": self.hit_rates(),
+            "depth_times": {str(k): round(v, 6) for k, v in sorted(self.depth_times.items())},
+        }
+
+    def write_jsonl(self, path, **extra):
+        record = self.to_dict()
+        record.update(extra)
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,122 @@
+import random
+from functools import lru_cache
+
+from .models import walls_per_player
+
+# Left-right mirror symmetry
+# --------------------------
+# Reflecting the board maps column c to n - 1 - c. A wall anchored at (r, c)
+# covers columns c and c + 1, so it maps to (r, n - 2 - c) with the same
+# orientation. Rows, goals of the top/bottom players and wall counts are
+# unchanged; in a 4-player game the left and right players swap roles.
+#
+# Every position-keyed cache (transposition table, distance cache, books,
+# tablebases) stores entries under the canonical form: the smaller of the
+# position's Zobrist key and its mirror's key. Results that mention squares
+# or walls are stored in canonical orientation and mapped back on lookup.
+
+ZOBRIST_SEED = 0x51C0  # Fixed so keys agree across processes and restarts
+MAX_WALLS = 32         # Least wall-count entries per player in the key tables
+
+MIRROR_PLAYERS = {2: (0, 1), 4: (0, 1, 3, 2)}
+
+def mirror_square(r, c, n):
+    return (r, n - 1 - c)
+
+def mirror_wall(r, c, orientation, n):
+    return (r, n - 2 - c, orientation)
+
+def mirror_move(move, n):
+    """
+    Mirrors a move given as (r, c) or (r, c, orientation).
+    """
+    if len(move) == 3:
+        return mirror_wall(*move, n)
+    return mirror_square(*move, n)
+
+def orient_move(move, mirrored, n):
+    """
+    Maps a move between a position and its canonical form (the mapping is its
+    own inverse).
+    """
+    if move is None or not mirrored:
+        return move
+    return mirror_move(move, n)
+
+def player_is_symmetric(player_idx, num_players):
+    """
+    Whether a player keeps its index under mirroring. Scores seen from a
+    player that swaps roles (left/right in 4-player games) can't be shared
+    between a position and its mirror.
+    """
+    return MIRROR_PLAYERS[num_players][player_idx] == player_idx
+
+class ZobristTables:
+    """
+    64-bit random keys for one board size. Wall counts go up to max_walls,
+    the 2-player supply on large boards (at least MAX_WALLS, which keeps the
+    keys of boards up to 31x31 what they always were).
+    """
+
+    def __init__(self, board_size):
+        rng = random.Random(ZOBRIST_SEED * 1000 + board_size)
+        cells = board_size * board_size
+        slots = (board_size - 1) * (board_size - 1)
+        self.board_size = board_size
+        self.max_walls = max(MAX_WALLS, walls_per_player(board_size))
+        self.pawn = [[rng.getrandbits(64) for _ in range(cells)] for _ in range(4)]
+        self.wall = {o: [rng.getrandbits(64) for _ in range(slots)] for o in ('H', 'V')}
+        self.walls_left = [[rng.getrandbits(64) for _ in range(self.max_walls + 1)] for _ in range(4)]
+        self.turn = [rng.getrandbits(64) for _ in range(4)]
+
+    def wall_key(self, walls, mirrored=False):
+        n = self.board_size
+        key = 0
+        for r, c, o in walls:
+            if mirrored:
+                c = n - 2 - c
+            key ^= self.wall[o][r * (n - 1) + c]
+        return key
+
+@lru_cache(maxsize=None)
+def zobrist_tables(board_size):
+    return ZobristTables(board_size)
+
+def position_key(game, mirrored=False):
+    """
+    Zobrist key of the position (pawns, walls, walls remaining, side to move),
+    or of its mirror image.
+    """
+    n = game.board_size
+    z = zobrist_tables(n)
+    perm = MIRROR_PLAYERS[game.num_players] if mirrored else range(game.num_players)
+    key = z.wall_key(game.walls, mirrored)
+    for i, p in enumerate(game.players):
+        slot = perm[i]
+        c = n - 1 - p.c if mirrored else p.c
+        key ^= z.pawn[slot][p.r * n + c]
+        key ^= z.walls_left[slot][p.walls_remaining]
+    return key ^ z.turn[perm[game.turn]]
+
+def canonical_key(game):
+    """
+    Returns (key, mirrored): the canonical key of the position and whether the
+    canonical form is the mirror image.
+    """
+    key = position_key(game)
+    mirror_key = position_key(game, mirrored=True)
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
+
+def canonical_wall_key(game):
+    """
+    Canonical key of the wall layout alone, for caches that only depend on the
+    walls (path distances). Returns (key, mirrored).
+    """
+    z = zobrist_tables(game.board_size)
+    key = z.wall_key(game.walls)
+    mirror_key = z.wall_key(game.walls, mirrored=True)
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
@@ -0,0 +1,337 @@
+import heapq
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from .archive import get_codec
+from .models import QuoridorGame, wall_mask
+from .pathfinding import bfs_distances
+
+# Endgame tablebase
+# -----------------
+# Exact win/loss/distance for every 2-player position on one wall layout with
+# at most max_walls walls left per side: both pawn squares, the side to move
+# and both wall counts. Found by retrograde analysis, not search.
+#
+# Layers: positions sharing the wall layout and wall counts form a layer.
+# Pawn moves stay inside the layer; placing a wall leaves it for a layer of
+# the new layout with one wall less, which is solved first (recursively and
+# memoized). Inside a layer, results are settled in order of plies to the end
+# from a heap seeded with the finished games and the wall exits, so the
+# first result a position gets is its fastest win; a position is lost once
+# every pawn move has been settled as a win for the opponent and no wall exit
+# saves it. Positions never settled (both sides can avoid losing forever) are
+# draws.
+#
+# Values are from the side to move's point of view: WIN - d = wins in d plies,
+# -(WIN - d) = loses in d plies, 0 = draw. Each position also stores the move
+# code (archive.MoveCodec) that achieves its value, -1 for draws.
+#
+# Cost: the pawn-only layer of a layout is ~13k positions on 9x9 and takes a
+# fraction of a second, but each extra wall per side multiplies the layouts
+# to solve by the number of legal walls, so max_walls 1 is already a long
+# offline job.
+#
+# File: 32-byte header (magic, version, board size, max walls, wall mask
+# length), the layout's wall mask (bit layout as in position.py), then int16
+# values and int16 moves indexed by position_index().
+
+MAGIC = b'QTBL'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBxI20x')  # magic, version, board size, max walls, mask bytes
+WIN = 10000
+NO_MOVE = -1
+SEARCH_WIN = 500  # Search score of a tablebase win, above any path-length eval
+
+def tablebase_score(value):
+    """
+    Tablebase value -> QuoridorAI score for the side to move, preferring
+    faster wins and slower losses.
+    """
+    if value > 0:
+        return SEARCH_WIN - (WIN - value)
+    if value < 0:
+        return -SEARCH_WIN + (WIN + value)
+    return 0
+
+def parent_value(child):
+    """
+    Value of a move for the mover, given the value of the resulting position
+    for the side to move there.
+    """
+    if child > 0:
+        return -child + 1
+    if child < 0:
+        return -child - 1
+    return 0
+
+def position_index(board_size, max_walls, turn, walls_left, pawns):
+    cells = board_size * board_size
+    w = max_walls + 1
+    layer = (turn * w + walls_left[0]) * w + walls_left[1]
+    (r0, c0), (r1, c1) = pawns
+    return (layer * cells + r0 * board_size + c0) * cells + r1 * board_size + c1
+
+def wall_fits(walls, r, c, orientation, board_size):
+    """
+    Geometric part of is_valid_wall_placement (bounds, overlaps, crossings).
+    """
+    n = board_size - 1
+    if not (0 <= r < n and 0 <= c < n):
+        return False
+    if (r, c, 'H') in walls or (r, c, 'V') in walls:
+        return False
+    if orientation == 'H':
+        return (r, c - 1, 'H') not in walls and (r, c + 1, 'H') not in walls
+    return (r - 1, c, 'V') not in walls and (r + 1, c, 'V') not in walls
+
+class TablebaseSolver:
+    """
+    Retrograde solver for one board size. Solved layers are kept in memory
+    so layouts reached through different wall orders are solved once.
+    """
+
+    def __init__(self, board_size=9):
+        self.board_size = board_size
+        self.cells = board_size * board_size
+        self.codec = get_codec(board_size)
+        self.game = QuoridorGame(2, board_size)
+        self.goal_rows = [p.goal_row for p in self.game.players]
+        self.layers = {}   # (layout, walls left 0, walls left 1) -> (values, moves)
+        self.layouts = {}  # layout -> pawn move graph and legal walls
+
+    def layout_info(self, layout):
+        """
+        Pawn-move successors of every (turn, p0, p1) and the walls that fit,
+        with the squares each player can still reach its goal from after them.
+        """
+        info = self.layouts.get(layout)
+        if info is not None:
+            return info
+
+        n, C = self.board_size, self.cells
+        game = self.game
+        game.walls = set(layout)
+        succ = [None] * (2 * C * C)
+        for turn in range(2):
+            game.turn = turn
+            for a in range(C):
+                for b in range(C):
+                    if a == b:
+                        continue
+                    s = (turn * C + a) * C + b
+                    game.players[0].move(*divmod(a, n))
+                    game.players[1].move(*divmod(b, n))
+                    if game.winner() is not None:
+                        continue
+                    mover_moves = game.get_valid_pawn_moves(turn)
+                    codes = [r * n + c for r, c in mover_moves]
+                    if turn == 0:
+                        succ[s] = [((1 * C + code) * C + b, code) for code in codes]
+                    else:
+                        succ[s] = [((0 * C + a) * C + code, code) for code in codes]
+
+        walls = []
+        for r in range(n - 1):
+            for c in range(n - 1):
+                for o in ('H', 'V'):
+                    if not wall_fits(layout, r, c, o, n):
+                        continue
+                    game.walls = set(layout) | {(r, c, o)}
+                    reach = []
+                    for i in range(2):
+                        goals = [(self.goal_rows[i], col) for col in range(n)]
+                        dist = bfs_distances(game, goals)
+                        mask = np.zeros(C, dtype=bool)
+                        for (rr, cc) in dist:
+                            mask[rr * n + cc] = True
+                        reach.append(mask)
+                    walls.append(((r, c, o), reach[0][:, None] & reach[1][None, :]))
+        game.walls = set()
+
+        info = (succ, walls)
+        self.layouts[layout] = info
+        return info
+
+    def solve_layer(self, layout, walls_left):
+        """
+        Returns (values, moves), int16 arrays of shape (2, cells, cells)
+        indexed [turn, p0 square, p1 square].
+        """
+        key = (layout, walls_left[0], walls_left[1])
+        if key in self.layers:
+            return self.layers[key]
+
+        n, C = self.board_size, self.cells
+        succ, walls = self.layout_info(layout)
+        size = 2 * C * C
+
+        # Wall exits: best value per position over the walls the mover can place
+        exit_value = [np.full((C, C), -WIN - 1, dtype=np.int32) for _ in range(2)]
+        exit_move = [np.full((C, C), NO_MOVE, dtype=np.int32) for _ in range(2)]
+        for turn in range(2):
+            if walls_left[turn] == 0:
+                continue
+            left = list(walls_left)
+            left[turn] -= 1
+            for wall, legal in walls:
+                child_values, _ = self.solve_layer(layout | {wall}, tuple(left))
+                child = child_values[1 - turn].astype(np.int32)
+                value = np.where(child > 0, -child + 1, np.where(child < 0, -child - 1, 0))
+                better = legal & (value > exit_value[turn])
+                exit_value[turn][better] = value[better]
+                exit_move[turn][better] = self.codec.encode_move(wall)
+        exit_value = np.stack(exit_value).reshape(size)
+        exit_move = np.stack(exit_move).reshape(size)
+
+        values = np.zeros(size, dtype=np.int16)
+        moves = np.full(size, NO_MOVE, dtype=np.int16)
+        final = np.zeros(size, dtype=bool)
+        remaining = [0] * size
+        loss_d = [0] * size       # Longest loss found so far
+        loss_move = [NO_MOVE] * size
+        preds = [[] for _ in range(size)]
+        heap = []
+
+        for s in range(size):
+            turn, rest = divmod(s, C * C)
+            a, b = divmod(rest, C)
+            if a == b:
+                final[s] = True
+                continue
+            if succ[s] is None:
+                # Game over: whoever reached the goal just moved
+                heap.append((0, s, False, NO_MOVE))
+                continue
+            remaining[s] = len(succ[s])
+            for child, code in succ[s]:
+                preds[child].append((s, code))
+            ev = int(exit_value[s])
+            if ev > 0:
+                heap.append((WIN - ev, s, True, int(exit_move[s])))
+            elif ev < -WIN:
+                ev = None
+            elif ev < 0:
+                loss_d[s] = WIN + ev
+                loss_move[s] = int(exit_move[s])
+            if remaining[s] == 0 and ev is not None and ev < 0:
+                heap.append((loss_d[s], s, False, loss_move[s]))
+        heapq.heapify(heap)
+
+        while heap:
+            d, s, win, code = heapq.heappop(heap)
+            if final[s]:
+                continue
+            final[s] = True
+            values[s] = WIN - d if win else -(WIN - d)
+            moves[s] = code
+            for p, move_code in preds[s]:
+                if final[p]:
+                    continue
+                if not win:
+                    # Moving here leaves the opponent lost
+                    heapq.heappush(heap, (d + 1, p, True, move_code))
+                    continue
+                remaining[p] -= 1
+                if d + 1 > loss_d[p]:
+                    loss_d[p] = d + 1
+                    loss_move[p] = move_code
+                ev = int(exit_value[p])
+                if remaining[p] == 0 and ev < 0:
+                    heapq.heappush(heap, (loss_d[p], p, False, loss_move[p]))
+
+        result = (values.reshape(2, C, C), moves.reshape(2, C, C))
+        self.layers[key] = result
+        return result
+
+    def solve(self, walls, max_walls):
+        """
+        Solves every layer of a layout up to max_walls per side. Returns
+        (values, moves) as flat arrays in position_index() order.
+        """
+        layout = frozenset(walls)
+        values, moves = [], []
+        for turn in range(2):
+            for w0 in range(max_walls + 1):
+                for w1 in range(max_walls + 1):
+                    v, m = self.solve_layer(layout, (w0, w1))
+                    values.append(v[turn].reshape(-1))
+                    moves.append(m[turn].reshape(-1))
+        return np.concatenate(values), np.concatenate(moves)
+
+def build_tablebase(path, walls, max_walls=0, board_size=9, solver=None):
+    """
+    Solves a layout and writes it to path. Returns the number of positions.
+    """
+    solver = solver or TablebaseSolver(board_size)
+    values, moves = solver.solve(walls, max_walls)
+    mask = wall_mask(walls, board_size)
+    mask_bytes = mask.to_bytes((2 * (board_size - 1) ** 2 + 7) // 8, 'little')
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, board_size, max_walls, len(mask_bytes)))
+        f.write(mask_bytes)
+        f.write(bytes(-f.tell() % 8))
+        f.write(values.astype('<i2').tobytes())
+        f.write(moves.astype('<i2').tobytes())
+    os.replace(tmp, path)
+    return len(values)
+
+class Tablebase:
+    """
+    Read-only, memory-mapped tablebase file.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        magic, version, board_size, max_walls, mask_len = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._file.close()
+            raise ValueError(f"{path} is not a tablebase file")
+        self.mask = int.from_bytes(self._file.read(mask_len), 'little')
+        self.board_size = board_size
+        self.max_walls = max_walls
+        self.codec = get_codec(board_size)
+        offset = HEADER.size + mask_len
+        offset += -offset % 8
+        count = 2 * (max_walls + 1) ** 2 * (board_size * board_size) ** 2
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.values = np.frombuffer(self._map, dtype='<i2', count=count, offset=offset)
+        self.moves = np.frombuffer(self._map, dtype='<i2', count=count, offset=offset + 2 * count)
+
+    def close(self):
+        if self._map is None:
+            return
+        self.values = self.moves = None
+        self._map.close()
+        self._file.close()
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def covers(self, game):
+        return (game.num_players == 2 and game.board_size == self.board_size
+                and all(p.walls_remaining <= self.max_walls for p in game.players)
+                and wall_mask(game.walls, game.board_size) == self.mask)
+
+    def probe(self, game):
+        """
+        Returns (value, move_data, move_type) for the side to move, or None if
+        the position isn't in the table. move_data is None for draws.
+        """
+        if not self.covers(game):
+            return None
+        p0, p1 = game.players
+        i = position_index(self.board_size, self.max_walls, game.turn,
+                           (p0.walls_remaining, p1.walls_remaining), ((p0.r, p0.c), (p1.r, p1.c)))
+        value, code = int(self.values[i]), int(self.moves[i])
+        if code == NO_MOVE:
+            return value, None, None
+        move = self.codec.decode_move(code)
+        return value, move, 'WALL' if len(move) == 3 else 'MOVE'
@@ -1,41 +1,97 @@
+import pygame
 import sys
 import platform
 
 from .constants import *
+from .heatmap import WallHeatmap
 from .models import QuoridorGame
+from .position import to_position_string, from_position_string, is_position_string
 
 class QuoridorUI:
-    def __init__(self, screen):
+    MENU_OPTIONS = ["PLAY", "COPY GAME", "COPY POSITION", "LOAD GAME"]
+    PLAYER_NAMES = ["RED", "BLUE", "GREEN", "GOLD"]  # Matches the pawn colors in models.py
+
+    def __init__(self, screen, num_players=2, board_size=BOARD_SIZE):
         self.screen = screen
-        self.game = QuoridorGame()
         self.font = pygame.font.SysFont(None, 36)
         self.large_font = pygame.font.SysFont(None, 72)
+        self.small_font = pygame.font.SysFont(None, 24)
         
         # UI State
         self.state = 'MENU' # 'MENU' or 'GAME'
         self.selected_action = 'MOVE' # 'MOVE' or 'WALL'
         self.wall_orientation = 'H'   # 'H' or 'V'
+        self.ai_thinking = False      # Board input is ignored while the AI searches
+        
+        # Hint mode: the engine's best moves for the human, filled in by the
+        # main loop as a background analysis deepens
+        self.hint_mode = False
+        self.hints = []               # [(score, move_data, move_type)], best first
+        self.hint_depth = 0
         
-        # Load Assets
+        # Wall heatmap mode: every wall slot colored by how it changes the
+        # path lengths, for the player to move. Both the heatmap and its
+        # overlay surface are rebuilt only when the position changes.
+        self.heatmap_mode = False
+        self.heatmap = WallHeatmap()
+        self.heatmap_surface = None
+        self.heatmap_key = None
+        
+        # Load Assets (scaled to the board's cells by layout)
         self.load_assets()
+        self.game = QuoridorGame(num_players, board_size)
+
+    @property
+    def game(self):
+        return self._game
+
+    @game.setter
+    def game(self, game):
+        # A loaded position can have another board size
+        self._game = game
+        self.layout()
+
+    def layout(self):
+        # The largest cells (up to CELL_SIZE + MARGIN apart) that fit the
+        # board on screen, centered; a 9x9 board gets exactly those
+        n = self.game.board_size
+        pitch = min(CELL_SIZE + MARGIN, (SCREEN_HEIGHT - 2 * BOARD_PADDING) // n)
+        self.margin = max(pitch * MARGIN // (CELL_SIZE + MARGIN), 5)
+        self.cell_size = pitch - self.margin
+        self.offset_x = (SCREEN_WIDTH - n * pitch) // 2
+        self.offset_y = (SCREEN_HEIGHT - n * pitch) // 2
+
+        size = self.cell_size
+        if self.wood_img is not None:
+            self.tile_texture = pygame.transform.scale(self.wood_img, (size, size))
+        else:
+            # Fallback to procedural
+            self.tile_texture = self.create_wood_texture(size, size)
+        if self.pawn_src is not None:
+            self.pawn_img = pygame.transform.smoothscale(self.pawn_src, (int(size*0.8), int(size*0.8)))
+        else:
+            self.pawn_img = None
+        self.heatmap_surface = None
+
+    def cell_pos(self, r, c):
+        # Top-left corner of a cell on screen
+        pitch = self.cell_size + self.margin
+        return self.offset_x + c * pitch, self.offset_y + r * pitch
 
     def load_assets(self):
         # Wood Texture
         try:
-            wood_img = pygame.image.load("assets/wood_texture.jpg").convert()
-            self.tile_texture = pygame.transform.scale(wood_img, (CELL_SIZE, CELL_SIZE))
+            self.wood_img = pygame.image.load("assets/wood_texture.jpg").convert()
         except Exception as e:
             print(f"Failed to load wood texture: {e}")
-            # Fallback to procedural
-            self.tile_texture = self.create_wood_texture(CELL_SIZE, CELL_SIZE)
+            self.wood_img = None
             
         # Pawn
         try:
-            self.pawn_img = pygame.image.load("assets/pawn.png").convert_alpha()
-            self.pawn_img = pygame.transform.smoothscale(self.pawn_img, (int(CELL_SIZE*0.8), int(CELL_SIZE*0.8)))
+            self.pawn_src = pygame.image.load("assets/pawn.png").convert_alpha()
         except Exception as e:
             print(f"Failed to load pawn image: {e}")
-            self.pawn_img = None
+            self.pawn_src = None
 
     def create_wood_texture(self, width, height):
         # Create a surface fallback
@@ -58,7 +114,7 @@ class QuoridorUI:
         
         # Buttons
         # Simple text buttons for now
-        opts = ["PLAY", "COPY GAME", "LOAD GAME"]
+        opts = self.MENU_OPTIONS
         
         mouse_pos = pygame.mouse.get_pos()
         
@@ -82,7 +138,7 @@ class QuoridorUI:
     def handle_menu_click(self, pos):
         # Check button clicks
         # Hardcoded rects for simplicity, matching draw_menu
-        opts = ["PLAY", "COPY GAME", "LOAD GAME"]
+        opts = self.MENU_OPTIONS
         start_y = 250
         
         for i, opt in enumerate(opts):
@@ -94,11 +150,18 @@ class QuoridorUI:
                     # For now, let's just enter game. If user wants new game, they can restart app or we add "RESET"
                 elif i == 1: # COPY
                     self.copy_game_to_clipboard()
-                elif i == 2: # LOAD
+                elif i == 2: # COPY POSITION
+                    self.copy_game_to_clipboard(position=True)
+                elif i == 3: # LOAD
                     self.load_game_from_clipboard()
 
-    def copy_game_to_clipboard(self):
-        notation = self.game.get_game_notation()
+    def copy_game_to_clipboard(self, position=False):
+        # position: copy a snapshot string (loads instantly, see position.py)
+        # instead of the move list
+        if position:
+            notation = to_position_string(self.game, include_history=True)
+        else:
+            notation = self.game.get_game_notation()
         try:
             if sys.platform == "emscripten":
                 # Web: Use browser prompt to let user copy
@@ -135,7 +198,10 @@ class QuoridorUI:
             
             if content:
                 print(f"Loading: {content}")
-                success = self.game.load_from_notation(content)
+                if is_position_string(content):
+                    success = self.load_position(content)
+                else:
+                    success = self.game.load_from_notation(content)
                 if success:
                     print("Game Loaded Successfully!")
                     self.state = 'GAME'
@@ -146,11 +212,23 @@ class QuoridorUI:
         except Exception as e:
             print(f"Clipboard Read Error: {e}")
 
+    def load_position(self, text):
+        try:
+            self.game = from_position_string(text)
+        except ValueError as e:
+            print(f"Invalid position: {e}")
+            return False
+        return True
+
     def draw_game(self):
         self.screen.fill(BG_COLOR)
         self.draw_board()
+        if self.heatmap_mode:
+            self.draw_heatmap()
         self.draw_walls()
         self.draw_players()
+        if self.hint_mode:
+            self.draw_hints()
         self.draw_hud()
         
         # Draw previews based on mouse position
@@ -158,7 +236,7 @@ class QuoridorUI:
         if self.is_mouse_on_board(mx, my):
             r, c, exact = self.get_board_coords(mx, my)
             # Only draw preview if valid coords
-            if 0 <= r < 9 and 0 <= c < 9:
+            if 0 <= r < self.game.board_size and 0 <= c < self.game.board_size:
                 if self.selected_action == 'MOVE':
                     # Only highlight if it's your turn? Or always?
                     # Always showing valid moves is nice.
@@ -168,18 +246,17 @@ class QuoridorUI:
                 
     def draw_board(self):
         # Draw the grid squares
-        for r in range(9):
-            for c in range(9):
-                x = BOARD_OFFSET_X + c * (CELL_SIZE + MARGIN)
-                y = BOARD_OFFSET_Y + r * (CELL_SIZE + MARGIN)
+        for r in range(self.game.board_size):
+            for c in range(self.game.board_size):
+                x, y = self.cell_pos(r, c)
                 
                 # Blit cached texture
                 self.screen.blit(self.tile_texture, (x, y))
                 
     def draw_players(self):
         for p in self.game.players:
-            cx = BOARD_OFFSET_X + p.c * (CELL_SIZE + MARGIN) + CELL_SIZE // 2
-            cy = BOARD_OFFSET_Y + p.r * (CELL_SIZE + MARGIN) + CELL_SIZE // 2
+            x, y = self.cell_pos(p.r, p.c)
+            cx, cy = x + self.cell_size // 2, y + self.cell_size // 2
             
             if self.pawn_img:
                 # Tint the pawn
@@ -191,44 +268,39 @@ class QuoridorUI:
                 self.screen.blit(tinted, rect)
             else:
                 # Fallback circle
-                pygame.draw.circle(self.screen, p.color, (cx, cy), CELL_SIZE // 3)
+                pygame.draw.circle(self.screen, p.color, (cx, cy), self.cell_size // 3)
             
             # Draw highlight for current player
             if p == self.game.current_player():
-                 pygame.draw.circle(self.screen, WHITE, (cx, cy), CELL_SIZE // 2, 2)
+                 pygame.draw.circle(self.screen, WHITE, (cx, cy), self.cell_size // 2, 2)
                  
     def draw_walls(self):
         for (r, c, orient) in self.game.walls:
             self.draw_single_wall(r, c, orient, color=GOLD)
             
     def draw_single_wall(self, r, c, orient, color):
-        x = BOARD_OFFSET_X + c * (CELL_SIZE + MARGIN)
-        y = BOARD_OFFSET_Y + r * (CELL_SIZE + MARGIN)
+        x, y = self.cell_pos(r, c)
         
         if orient == 'H':
             wx = x
-            wy = y + CELL_SIZE
-            w_width = 2 * CELL_SIZE + MARGIN
-            w_height = MARGIN
+            wy = y + self.cell_size
+            w_width = 2 * self.cell_size + self.margin
+            w_height = self.margin
             pygame.draw.rect(self.screen, color, (wx, wy, w_width, w_height))
             
         else: # 'V'
-            wx = x + CELL_SIZE
+            wx = x + self.cell_size
             wy = y
-            w_width = MARGIN
-            w_height = 2 * CELL_SIZE + MARGIN
+            w_width = self.margin
+            w_height = 2 * self.cell_size + self.margin
             pygame.draw.rect(self.screen, color, (wx, wy, w_width, w_height))
 
     def draw_move_preview(self, r, c):
         # Highlight cell if it's a valid move
         valid_moves = self.game.get_valid_pawn_moves()
         if (r, c) in valid_moves:
-             rect = pygame.Rect(
-                    BOARD_OFFSET_X + c * (CELL_SIZE + MARGIN),
-                    BOARD_OFFSET_Y + r * (CELL_SIZE + MARGIN),
-                    CELL_SIZE, CELL_SIZE
-                )
-             s = pygame.Surface((CELL_SIZE, CELL_SIZE))
+             rect = pygame.Rect(*self.cell_pos(r, c), self.cell_size, self.cell_size)
+             s = pygame.Surface((self.cell_size, self.cell_size))
              s.set_alpha(128)
              s.fill(GREEN)
              self.screen.blit(s, (rect.x, rect.y))
@@ -238,71 +310,131 @@ class QuoridorUI:
 
     def draw_wall_preview(self, r, c):
         # Draw semi-transparent wall
-        # Only if valid coords for wall (0-7)
-        if not (0 <= r < 8 and 0 <= c < 8): return
+        # Only if valid coords for wall (0-7 on 9x9)
+        n = self.game.board_size - 1
+        if not (0 <= r < n and 0 <= c < n): return
 
         if self.game.is_valid_wall_placement(r, c, self.wall_orientation):
             color = (255, 215, 0, 128) # Gold transparent
             
-            x = BOARD_OFFSET_X + c * (CELL_SIZE + MARGIN)
-            y = BOARD_OFFSET_Y + r * (CELL_SIZE + MARGIN)
+            x, y = self.cell_pos(r, c)
             
             if self.wall_orientation == 'H':
-                w_width = 2 * CELL_SIZE + MARGIN
-                w_height = MARGIN
-                wx, wy = x, y + CELL_SIZE
+                w_width = 2 * self.cell_size + self.margin
+                w_height = self.margin
+                wx, wy = x, y + self.cell_size
             else:
-                w_width = MARGIN
-                w_height = 2 * CELL_SIZE + MARGIN
-                wx, wy = x + CELL_SIZE, y
+                w_width = self.margin
+                w_height = 2 * self.cell_size + self.margin
+                wx, wy = x + self.cell_size, y
                 
             s = pygame.Surface((w_width, w_height), pygame.SRCALPHA)
             s.fill(color)
             self.screen.blit(s, (wx, wy))
             
+    def draw_heatmap(self):
+        slots = self.heatmap.update(self.game)
+        mover = self.game.turn
+        if self.heatmap_surface is None or self.heatmap_key != self.heatmap.key:
+            self.heatmap_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            for (r, c, orient), increases in slots.items():
+                if increases is None:
+                    color = BLACK + (150,)
+                else:
+                    # Opponents' loss minus our own: green helps the mover, red hurts
+                    gain = sum(increases) - 2 * increases[mover]
+                    alpha = min(60 + 50 * abs(gain), 230)
+                    if gain > 0:
+                        color = GREEN + (alpha,)
+                    elif gain < 0:
+                        color = RED + (alpha,)
+                    else:
+                        color = LIGHT_GRAY + (50,)
+                x, y = self.cell_pos(r, c)
+                # Thinner than a wall, so the H and V slot at an anchor both show
+                if orient == 'H':
+                    rect = (x + self.margin, y + self.cell_size + 2, 2 * self.cell_size - self.margin, self.margin - 4)
+                else:
+                    rect = (x + self.cell_size + 2, y + self.margin, self.margin - 4, 2 * self.cell_size - self.margin)
+                self.heatmap_surface.fill(color, rect)
+            self.heatmap_key = self.heatmap.key
+        self.screen.blit(self.heatmap_surface, (0, 0))
+
+    def draw_hints(self):
+        # Best move in gold, the rest fading out; score drawn on each
+        colors = [GOLD, LIGHT_GRAY, GRAY]
+        for rank, (score, move, move_type) in enumerate(self.hints):
+            color = colors[min(rank, len(colors) - 1)]
+            x, y = self.cell_pos(move[0], move[1])
+            if move_type == 'MOVE':
+                rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
+                pygame.draw.rect(self.screen, color, rect, 3)
+                center = rect.center
+            else:
+                s = pygame.Surface((2 * self.cell_size + self.margin, self.margin), pygame.SRCALPHA)
+                s.fill(color + (160,))
+                if move[2] == 'V':
+                    s = pygame.transform.rotate(s, 90)
+                    pos = (x + self.cell_size, y)
+                else:
+                    pos = (x, y + self.cell_size)
+                self.screen.blit(s, pos)
+                center = (x + self.cell_size + self.margin // 2, y + self.cell_size + self.margin // 2)
+            label = self.small_font.render(f"{score:+g}", True, color, BLACK)
+            self.screen.blit(label, label.get_rect(center=center))
+
     def draw_hud(self):
         # Text for info
-        turn_text = f"Turn: {'RED' if self.game.turn == 0 else 'BLUE'}"
-        p1_walls = self.game.players[0].walls_remaining
-        p2_walls = self.game.players[1].walls_remaining
+        turn_text = f"Turn: {self.PLAYER_NAMES[self.game.turn]}"
         
         txt_surf = self.font.render(turn_text, True, WHITE)
         self.screen.blit(txt_surf, (10, 10))
         
-        info_txt = f"RED Walls: {p1_walls} | BLUE Walls: {p2_walls}"
+        info_txt = " | ".join(f"{name} Walls: {p.walls_remaining}"
+                              for name, p in zip(self.PLAYER_NAMES, self.game.players))
         info_surf = self.font.render(info_txt, True, WHITE)
         self.screen.blit(info_surf, (10, 50))
         
-        usage_txt = "Click: Move/Place | R: Rotate Wall | ESC: Menu"
+        usage_txt = "Click: Move/Place | R: Rotate | H: Hints | I: Wall Map | ESC: Menu"
         usage_surf = self.font.render(usage_txt, True, LIGHT_GRAY)
         self.screen.blit(usage_surf, (10, SCREEN_HEIGHT - 40))
         
         mode_txt = f"Mode: {self.selected_action}"
         mode_surf = self.font.render(mode_txt, True, GOLD)
         self.screen.blit(mode_surf, (SCREEN_WIDTH - 150, 10))
+        
+        if self.hint_mode:
+            hint_txt = f"Hints: depth {self.hint_depth}" if self.hint_depth else "Hints: ..."
+            hint_surf = self.font.render(hint_txt, True, GOLD)
+            self.screen.blit(hint_surf, (SCREEN_WIDTH - 190, 50))
 
     def get_board_coords(self, mx, my):
-        rx = mx - BOARD_OFFSET_X
-        ry = my - BOARD_OFFSET_Y
+        rx = mx - self.offset_x
+        ry = my - self.offset_y
         if rx < 0 or ry < 0: return -1, -1, False
-        c = int(rx / (CELL_SIZE + MARGIN))
-        r = int(ry / (CELL_SIZE + MARGIN))
+        c = int(rx / (self.cell_size + self.margin))
+        r = int(ry / (self.cell_size + self.margin))
         return r, c, True
 
     def is_mouse_on_board(self, mx, my):
-        return (BOARD_OFFSET_X <= mx < BOARD_OFFSET_X + 9*(CELL_SIZE+MARGIN) and
-                BOARD_OFFSET_Y <= my < BOARD_OFFSET_Y + 9*(CELL_SIZE+MARGIN))
+        n = self.game.board_size
+        pitch = self.cell_size + self.margin
+        return (self.offset_x <= mx < self.offset_x + n*pitch and
+                self.offset_y <= my < self.offset_y + n*pitch)
 
     def handle_click(self, pos):
+        if self.ai_thinking:
+            return
         r, c, _ = self.get_board_coords(*pos)
+        n = self.game.board_size
         
         # Decide action based on mode
         if self.selected_action == 'MOVE':
-            if 0 <= r < 9 and 0 <= c < 9:
+            if 0 <= r < n and 0 <= c < n:
                 if self.game.move_pawn(r, c):
                     self.check_win()
         elif self.selected_action == 'WALL':
-             if 0 <= r < 8 and 0 <= c < 8:
+             if 0 <= r < n - 1 and 0 <= c < n - 1:
                  if self.game.place_wall(r, c, self.wall_orientation):
                      pass
     
@@ -321,7 +453,7 @@ class QuoridorUI:
              # Let's verify win by resetting? Or just stop?
              # Back to menu is safer
              self.state = 'MENU'
-             self.game = QuoridorGame()
+             self.game = QuoridorGame(self.game.num_players, self.game.board_size)
 
     def handle_input(self, event):
         if self.state == 'MENU':
@@ -349,11 +481,17 @@ class QuoridorUI:
                  # Let's keep explicit mode toggle to be safe for now, as UI shows "Mode: WALL".
                  self.selected_action = 'WALL' if self.selected_action == 'MOVE' else 'MOVE'
                  
+            elif event.key == pygame.K_h:
+                self.hint_mode = not self.hint_mode
+                
+            elif event.key == pygame.K_i:
+                self.heatmap_mode = not self.heatmap_mode
+                
             elif event.key == pygame.K_ESCAPE:
                 self.state = 'MENU'
 
             # WASD for P1?
-            if self.game.turn == 0:
+            if self.game.turn == 0 and not self.ai_thinking:
                  self.handle_wasd(event.key)
 
     def handle_wasd(self, key):
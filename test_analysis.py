@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src import analysis
+from src.analysis import analyze_file, analyze_game, completed_games
+from src.models import ReplayError
+
+class TestAnalysis(unittest.TestCase):
+    def test_blunder_flags(self):
+        # P1 steps back to c1 instead of walling P2
+        report = analyze_game(["c2", "c4", "c1", "c3"], depth=2, board_size=5)
+        self.assertEqual([m["blunder"] for m in report], [False, False, True, False])
+        self.assertEqual(report[2]["loss"], report[2]["best_eval"] - report[2]["eval"])
+        self.assertNotEqual(report[2]["best"], "c1")
+        self.assertEqual([m["player"] for m in report], [0, 1, 0, 1])
+
+    def test_illegal_move_is_not_searched(self):
+        with mock.patch.object(analysis, 'search_position', wraps=analysis.search_position) as search:
+            with self.assertRaises(ReplayError) as ctx:
+                analyze_game(["c2", "c1h", "c5"], depth=1, board_size=5)
+        self.assertEqual((ctx.exception.ply, ctx.exception.token), (1, "c1h"))
+        self.assertEqual(search.call_count, 1)
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            games = os.path.join(tmp, "games.txt")
+            out = os.path.join(tmp, "out.jsonl")
+            with open(games, "w") as f:
+                f.write("1. c2 c4\n1. c2 c2\n1. b1 c4\n")
+
+            # Killed mid-way through the first record: nothing counts as done
+            with open(out, "w") as f:
+                f.write('{"game": 0, "li')
+            self.assertEqual(completed_games(out), set())
+            self.assertEqual(analyze_file(games, out, depth=1, workers=1, board_size=5), 3)
+
+            with open(out) as f:
+                results = {r["game"]: r for r in map(json.loads, f)}
+            self.assertEqual(sorted(results), [0, 1, 2])
+            self.assertEqual(results[1]["error"], {"ply": 1, "token": "c2", "reason": "illegal move"})
+            self.assertEqual(len(results[2]["moves"]), 2)
+
+            # Everything is done, so nothing is redone or duplicated
+            self.assertEqual(analyze_file(games, out, depth=1, workers=1, board_size=5), 0)
+            with open(out) as f:
+                self.assertEqual(len(f.readlines()), 3)
+
+            # Only the game missing from the output is analyzed again
+            with open(out, "w") as f:
+                f.writelines(json.dumps(results[i]) + "\n" for i in (0, 2))
+            self.assertEqual(analyze_file(games, out, depth=1, workers=1, board_size=5), 1)
+            self.assertEqual(completed_games(out), {0, 1, 2})
+
+if __name__ == '__main__':
+    unittest.main()
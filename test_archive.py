@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+from src.archive import GameArchive, encode_move, decode_move, encode_game, decode_game
+from src.models import QuoridorGame
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "games.qarc")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_move_codes(self):
+        # Every pawn square and wall slot fits in one byte and round-trips
+        seen = set()
+        for r in range(9):
+            for c in range(9):
+                code = encode_move((r, c))
+                self.assertEqual(decode_move(code), (r, c))
+                seen.add(code)
+        for r in range(8):
+            for c in range(8):
+                for o in ('H', 'V'):
+                    code = encode_move((r, c, o))
+                    self.assertEqual(decode_move(code), (r, c, o))
+                    seen.add(code)
+        self.assertEqual(len(seen), 81 + 128)
+        self.assertLess(max(seen), 256)
+
+        self.assertEqual(encode_move("e2"), encode_move((7, 4)))
+        self.assertEqual(encode_move("e3h"), encode_move((6, 4, 'H')))
+        with self.assertRaises(ValueError):
+            encode_move("z9")
+
+    def test_game_round_trip(self):
+        record = encode_game("1. e2 e8 2. e3h")
+        self.assertEqual(len(record), 3)
+        self.assertEqual(decode_game(record), ["e2", "e8", "e3h"])
+
+    def test_append_and_random_access(self):
+        games = ["1. e2 e8 2. e3h", "1. d9v", "1. e2 e8 2. e3 e7 3. a2h"]
+        with GameArchive(self.path) as archive:
+            for g in games:
+                archive.append(g)
+            self.assertEqual(archive[1], "1. d9v")
+            # Appending after a read remaps transparently
+            game = QuoridorGame()
+            game.move_pawn(7, 4)
+            archive.append(game)
+            self.assertEqual(archive[3], "1. e2")
+            self.assertEqual(archive[-1], "1. e2")
+
+        # Reopen and scan
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), 4)
+            self.assertEqual(list(archive), games + ["1. e2"])
+            self.assertEqual(archive[2], games[2])
+
+    def test_import_export(self):
+        lines = ["1. e2 e8\n", "\n", "1. e2 e8 2. e3h\n"]
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.import_notation(lines), 2)
+            out_path = os.path.join(self.tmp.name, "out.txt")
+            with open(out_path, 'w') as out:
+                self.assertEqual(archive.export_notation(out), 2)
+        with open(out_path) as f:
+            self.assertEqual(f.read(), "1. e2 e8\n1. e2 e8 2. e3h\n")
+
+    def test_large_board_uses_two_byte_codes(self):
+        notation = "1. f2 f10 2. j2h a11v"
+        with GameArchive(self.path, board_size=11) as archive:
+            archive.append(notation)
+            self.assertEqual(len(archive.record(0)), 8)
+        # The board size comes from the header on reopen
+        with GameArchive(self.path) as archive:
+            self.assertEqual(archive.board_size, 11)
+            self.assertEqual(archive[0], notation)
+
+    def test_dangling_tail_is_ignored(self):
+        with GameArchive(self.path) as archive:
+            archive.append("1. e2 e8")
+        # Simulate a crash after the data write but before the index write
+        with open(self.path, 'ab') as f:
+            f.write(encode_game("1. e2"))
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), 1)
+            archive.append("1. d9v")
+            self.assertEqual(list(archive), ["1. e2 e8", "1. d9v"])
+
+    def test_torn_index_entry_is_dropped(self):
+        with GameArchive(self.path) as archive:
+            archive.append("1. e2 e8")
+            archive.append("1. d2 d8")
+        # Simulate a crash part-way through the next index write
+        with open(self.path + '.idx', 'ab') as f:
+            f.write(b'\x01\x02\x03')
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), 2)
+            archive.append("1. a9h")
+        with GameArchive(self.path) as archive:
+            self.assertEqual(list(archive), ["1. e2 e8", "1. d2 d8", "1. a9h"])
+
+    def test_index_ahead_of_data(self):
+        with GameArchive(self.path) as archive:
+            archive.append("1. e2 e8")
+            archive.append("1. d2 d8 2. d3h")
+        # The second game's offset reached the disk, part of its moves didn't
+        size = os.path.getsize(self.path)
+        with open(self.path, 'r+b') as f:
+            f.truncate(size - 1)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(list(archive), ["1. e2 e8"])
+            archive.append("1. a9h")
+        self.assertLess(os.path.getsize(self.path), size)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(list(archive), ["1. e2 e8", "1. a9h"])
+
+    def test_close_during_scan(self):
+        with GameArchive(self.path) as archive:
+            archive.append("1. e2 e8")
+            archive.append("1. d2 d8")
+            scan = iter(archive)
+            self.assertEqual(next(scan), "1. e2 e8")
+        # The scan holds its own maps and finishes after close
+        self.assertEqual(list(scan), ["1. d2 d8"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from src.ai import QuoridorAI, SearchBudget, snapshot_fingerprint
+from src.difficulty import PROFILES, Difficulty, get_profile
+from src.models import QuoridorGame
+from src.snapshot import load_snapshot
+from src.tablebase import Tablebase, build_tablebase
+
+GAME = "1. e2 e8 2. e3 e7 3. e4 d6h"
+
+def midgame():
+    game = QuoridorGame()
+    game.load_from_notation(GAME)
+    return game
+
+class TestDifficulty(unittest.TestCase):
+    def test_node_budget(self):
+        game = midgame()
+        profile = Difficulty('test', max_depth=6, nodes=200, time_ms=60000)
+        ai = QuoridorAI(game, game.turn, difficulty=profile, collect_stats=True)
+        move, move_type, stats = ai.search(game)
+        self.assertIsNotNone(move)
+        self.assertLessEqual(ai.last_budget.nodes, 201)
+        self.assertFalse(ai.last_budget.timed_out)
+        # The budget ran out before max_depth; the last finished depth was played
+        self.assertLess(ai.analysis_depth, 6)
+        # One timing per finished iteration
+        self.assertEqual(sorted(stats.depth_times), list(range(1, ai.analysis_depth + 1)))
+        self.assertLessEqual(sum(stats.depth_times.values()), stats.elapsed)
+        # The principal variation is the chosen move's line, and it's playable
+        self.assertEqual(stats.pv[0], game.coords_to_notation(*move))
+        self.assertTrue(1 < len(stats.pv) <= ai.analysis_depth)
+        game.replay(stats.pv)
+
+    def test_deterministic(self):
+        game = midgame()
+        profile = get_profile('easy', seed=7)
+        moves = {QuoridorAI(game, game.turn, difficulty=profile).get_best_move(game) for _ in range(3)}
+        self.assertEqual(len(moves), 1)
+        # A fresh engine and a cooperative, sliced search agree too
+        ai = QuoridorAI(game, game.turn, difficulty=profile)
+        steps = ai.search_steps(game, slice_nodes=5)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as e:
+                self.assertEqual(e.value[:2], moves.pop())
+                break
+
+    def test_outside_tables_ignored(self):
+        # A snapshot of a deeper search must not let the profile see further
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. d2h e7 3. f2h c7v")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "engine.snap")
+            deep = QuoridorAI(game, game.turn, depth=4)
+            deep.get_best_move(game)
+            deep.save_snapshot(path)
+            results = []
+            for snapshot in (None, load_snapshot(path, 9, snapshot_fingerprint())):
+                ai = QuoridorAI(game, game.turn, difficulty=Difficulty('hard', 5, 1500, 60000), snapshot=snapshot,
+                                proof_nodes=5000)
+                move = ai.get_best_move(game)
+                results.append((move, ai.analysis_depth, ai.last_budget.nodes))
+                if snapshot is not None:
+                    snapshot.close()
+        self.assertEqual(results[0], results[1])
+
+    def test_tablebase_ignored(self):
+        # Out of walls, so every position searched is in the tablebase
+        game = QuoridorGame(board_size=5)
+        game.load_from_notation("1. c2 c4")
+        for p in game.players:
+            p.walls_remaining = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "open.qtb")
+            build_tablebase(path, set(), max_walls=0, board_size=5)
+            with Tablebase(path) as tb:
+                self.assertIsNotNone(tb.probe(game))
+                results = []
+                for tablebase in (None, tb):
+                    ai = QuoridorAI(game, game.turn, difficulty=Difficulty('test', 4, 300, 60000), tablebase=tablebase)
+                    move = ai.get_best_move(game)
+                    results.append((move, ai.analysis_depth, ai.last_budget.nodes))
+        self.assertEqual(results[0], results[1])
+
+    def test_noise_stays_among_candidates(self):
+        game = midgame()
+        best = QuoridorAI(game, game.turn, difficulty=Difficulty('plain', 2, 150, 60000, candidates=3))
+        best.get_best_move(game)
+        candidates = {(m, t) for _, m, t in best.analysis}
+        picks = set()
+        for seed in range(8):
+            profile = Difficulty('noisy', 2, 150, 60000, noise=10, candidates=3, seed=seed)
+            picks.add(QuoridorAI(game, game.turn, difficulty=profile).get_best_move(game))
+        self.assertLessEqual(picks, candidates)
+        self.assertGreater(len(picks), 1)
+
+    def test_time_cap(self):
+        budget = SearchBudget(time_ms=0)
+        self.assertTrue(budget.spend())
+        self.assertTrue(budget.timed_out)
+        # Depth 1 always completes, so there is still a move
+        game = midgame()
+        ai = QuoridorAI(game, game.turn, difficulty=Difficulty('rushed', 4, None, 0))
+        self.assertIsNotNone(ai.get_best_move(game)[0])
+        self.assertEqual(ai.analysis_depth, 1)
+
+    def test_profiles(self):
+        self.assertEqual(get_profile('hard', seed=3).seed, 3)
+        self.assertEqual(PROFILES['hard'].seed, 0)
+        with self.assertRaises(ValueError):
+            get_profile('impossible')
+
+if __name__ == '__main__':
+    unittest.main()
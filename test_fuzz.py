@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+from src import reference
+from src.fuzz import check_position, fuzz, play_game, shrink
+from src.ai import QuoridorAI
+from src.models import QuoridorGame
+from src.position import from_position_string
+from src.symmetry import position_key
+
+class TestFuzz(unittest.TestCase):
+    def test_fast_paths_agree(self):
+        for players in (2, 4):
+            games, positions, mismatch = fuzz(4, workers=1, num_players=players, board_size=5)
+            self.assertIsNone(mismatch)
+            self.assertEqual(games, 4)
+            self.assertGreater(positions, 4)
+
+    def test_fast_mode_plays_the_same_games(self):
+        for index in range(3):
+            full = play_game(index, board_size=5, num_players=4)
+            fast = play_game(index, board_size=5, num_players=4, heavy_rate=0)
+            self.assertEqual(fast, full)
+            self.assertIsNone(fast[1])
+
+    def test_reference_rules(self):
+        # Rows 1-2 are walled off except in column e
+        game = QuoridorGame(board_size=5)
+        game.replay(["a4h", "c4h"])
+        self.assertFalse(reference.wall_legal(game, 1, 1, 'H'))  # Overlaps both
+        self.assertTrue(reference.wall_legal(game, 2, 3, 'V'))
+        self.assertFalse(reference.wall_legal(game, 0, 3, 'V'))  # Shuts P2 in
+        self.assertEqual(reference.zobrist_key(game), position_key(game))
+        self.assertIsNone(check_position(game, QuoridorAI(game, 0, depth=1)))
+
+    def test_shrinks_injected_bug(self):
+        # Lose every jump: what's left is two pawns face to face
+        valid = QuoridorGame.get_valid_pawn_moves
+        def no_jumps(game, player_idx=None, check_walls_only=False):
+            p = game.players[game.turn if player_idx is None else player_idx]
+            moves = valid(game, player_idx, check_walls_only)
+            return [m for m in moves if abs(m[0] - p.r) + abs(m[1] - p.c) == 1]
+
+        with mock.patch.object(QuoridorGame, 'get_valid_pawn_moves', no_jumps):
+            mismatch = None
+            for index in range(20):
+                _, mismatch = play_game(index, board_size=5, heavy_rate=0)
+                if mismatch is not None:
+                    break
+            self.assertIsNotNone(mismatch)
+            small = shrink(mismatch)
+        self.assertEqual(small.check, 'pawn_moves')
+        self.assertEqual(small.game.walls, set())
+        (r1, c1), (r2, c2) = [(p.r, p.c) for p in small.game.players]
+        self.assertEqual(abs(r1 - r2) + abs(c1 - c2), 1)
+        self.assertEqual(small.moves, mismatch.moves)
+        # The reported position string rebuilds the failing position
+        game = from_position_string(small.position())
+        self.assertEqual(position_key(game), position_key(small.game))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from src.heatmap import WallHeatmap, wall_heatmap
+from src.models import QuoridorGame
+from src.pathfinding import bfs
+
+def slot_by_slot(game):
+    # One legality check and one path search per player per slot
+    base = [bfs(game, (p.r, p.c), game.goals(i)) for i, p in enumerate(game.players)]
+    heatmap = {}
+    n = game.board_size - 1
+    for r in range(n):
+        for c in range(n):
+            for orientation in ('H', 'V'):
+                wall = (r, c, orientation)
+                if not game.is_valid_wall_placement(*wall):
+                    heatmap[wall] = None
+                    continue
+                game.walls.add(wall)
+                heatmap[wall] = tuple(bfs(game, (p.r, p.c), game.goals(i)) - base[i]
+                                      for i, p in enumerate(game.players))
+                game.walls.remove(wall)
+    return heatmap
+
+class TestWallHeatmap(unittest.TestCase):
+    def test_matches_slot_by_slot(self):
+        for notation in ["", "1. e2 e8 2. e3h c7v 3. f2 d6h",
+                         "1. e2 e8 2. d2h e7 3. f2h c1v 4. c3v f1v 5. b3h g3h"]:
+            game = QuoridorGame()
+            game.load_from_notation(notation)
+            self.assertEqual(wall_heatmap(game), slot_by_slot(game), notation)
+
+        game = QuoridorGame(num_players=4, board_size=7)
+        game.place_wall(2, 2, 'H')
+        self.assertEqual(wall_heatmap(game), slot_by_slot(game))
+
+    def test_cached_per_position(self):
+        game = QuoridorGame()
+        heatmap = WallHeatmap()
+        slots = heatmap.update(game)
+        self.assertIs(heatmap.update(game), slots)
+        game.place_wall(7, 4, 'H')
+        self.assertIsNot(heatmap.update(game), slots)
+        slots = heatmap.update(game)
+        self.assertIsNone(slots[(7, 4, 'H')])
+        self.assertIsNone(slots[(7, 4, 'V')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+from src import reference
+from src.ai import QuoridorAI
+from src.legal_walls import free_threaded, legal_walls, wall_slots
+from src.models import QuoridorGame
+from test_moves import random_game
+
+class TestLegalWalls(unittest.TestCase):
+    def test_validation_leaves_game_alone(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. d2h e7 3. f2h")
+        def touched(*args):
+            raise AssertionError("walls changed during validation")
+        game.walls.add = game.walls.remove = game.walls.discard = touched
+        blocked = list(game.walls.blocked)
+        legal = [wall for wall in wall_slots(9) if game.is_valid_wall_placement(*wall)]
+        self.assertEqual(game.walls.blocked, blocked)
+        self.assertEqual(legal, [wall for wall in wall_slots(9) if reference.wall_legal(game, *wall)])
+
+    def test_threads_match_serial(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            num_players = rng.choice((2, 4))
+            game = random_game(rng, num_players, rng.choice((5, 9)))
+            serial = legal_walls(game, threads=False)
+            self.assertEqual(legal_walls(game, workers=4, threads=True), serial)
+            self.assertEqual(legal_walls(game), serial)
+            slots = rng.sample(wall_slots(game.board_size), 20)
+            self.assertEqual(legal_walls(game, slots, workers=3, threads=True),
+                             [wall for wall in slots if wall in serial])
+
+    def test_engine_candidates(self):
+        # The root's batch matches the search nodes' lazy, one-by-one checks
+        rng = random.Random(8)
+        for _ in range(10):
+            game = random_game(rng, rng.choice((2, 4)), 9)
+            ai = QuoridorAI(game, game.turn, depth=1)
+            self.assertEqual(ai.get_all_possible_moves(game, game.turn),
+                             list(ai.generate_moves(game, game.turn)))
+
+    def test_golden_rule(self):
+        # P1 on a1, walled off from the b file: a3h would shut it in
+        game = QuoridorGame(board_size=5)
+        game.players[0].move(4, 0)
+        game.walls.add((3, 0, 'V'))
+        legal = legal_walls(game, workers=2, threads=True)
+        self.assertNotIn((2, 0, 'H'), legal)
+        self.assertIn((2, 1, 'H'), legal)
+        self.assertIsInstance(free_threaded(), bool)
+
+if __name__ == '__main__':
+    unittest.main()
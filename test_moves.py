@@ -0,0 +1,72 @@
+import copy
+import random
+import unittest
+from src.models import QuoridorGame, WallSet
+from src.reference import pawn_moves
+
+def random_game(rng, num_players, n):
+    game = QuoridorGame(num_players, n)
+    cells = rng.sample(range(n * n), num_players)
+    for p, cell in zip(game.players, cells):
+        p.move(*divmod(cell, n))
+    for _ in range(rng.randrange(n * 2)):
+        wall = (rng.randrange(n - 1), rng.randrange(n - 1), rng.choice('HV'))
+        if game.is_valid_wall_placement(*wall):
+            game.walls.add(wall)
+    return game
+
+class TestMoveTables(unittest.TestCase):
+    def test_matches_rules(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            num_players = rng.choice((2, 4))
+            game = random_game(rng, num_players, rng.choice((5, 9, 11)))
+            for idx in range(num_players):
+                self.assertEqual(game.get_valid_pawn_moves(idx), pawn_moves(game, idx))
+            r, c = divmod(rng.randrange(game.board_size ** 2), game.board_size)
+            neighbors = [m for m in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                         if 0 <= m[0] < game.board_size and 0 <= m[1] < game.board_size
+                         and not game.is_move_blocked(r, c, *m)]
+            self.assertEqual(list(game.get_valid_moves(r, c)), neighbors)
+
+    def test_wall_set_masks(self):
+        walls = WallSet(9)
+        walls.add((3, 3, 'H'))
+        walls.update([(5, 5, 'V')])
+        self.assertEqual(walls.blocked[3 * 9 + 3], 2)   # down from (3, 3)
+        self.assertEqual(walls.blocked[4 * 9 + 4], 1)   # up from (4, 4)
+        self.assertEqual(walls.blocked[6 * 9 + 6], 4)   # left from (6, 6)
+        clone = copy.deepcopy(walls)
+        walls.remove((3, 3, 'H'))
+        walls.discard((5, 5, 'V'))
+        self.assertEqual(sum(walls.blocked), 0)
+        self.assertEqual(clone, {(3, 3, 'H'), (5, 5, 'V')})
+        self.assertEqual(clone.blocked[3 * 9 + 3], 2)
+
+        # Plain sets assigned to a game are converted
+        game = QuoridorGame(board_size=5)
+        game.walls = {(0, 0, 'V')}
+        self.assertIsInstance(game.walls, WallSet)
+        self.assertEqual(game.get_valid_pawn_moves(1), [(1, 2), (0, 1), (0, 3)])
+
+    def test_overlapping_walls(self):
+        # Trusted replays don't check overlaps: d4h and e4h share the edge below e4
+        game = QuoridorGame()
+        game.replay(["d4h", "e4h"], trusted=True)
+        self.assertEqual(game.walls.blocked[5 * 9 + 4], 2)
+        self.assertNotIn((6, 4), list(game.get_valid_moves(5, 4)))
+
+        # Masks always equal those of the walls present, whatever the order
+        rng = random.Random(5)
+        walls = WallSet(5)
+        slots = [(r, c, o) for r in range(4) for c in range(4) for o in 'HV']
+        for _ in range(300):
+            wall = rng.choice(slots)
+            if wall in walls:
+                walls.remove(wall)
+            else:
+                walls.add(wall)
+            self.assertEqual(walls.blocked, WallSet(5, walls).blocked)
+
+if __name__ == '__main__':
+    unittest.main()
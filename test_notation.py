@@ -52,5 +52,23 @@ class TestNotation(unittest.TestCase):
         self.assertIn((6, 4, 'H'), game.walls)
         self.assertEqual(game.players[0].walls_remaining, 9)
 
+    def test_board_size(self):
+        game = QuoridorGame(board_size=11)
+        
+        # Pawns start mid-edge and walls scale with the board
+        self.assertEqual((game.players[0].r, game.players[0].c), (10, 5))
+        self.assertEqual(game.players[1].goal_row, 10)
+        self.assertEqual(game.players[0].walls_remaining, 12)
+        
+        # Ranks run 1-11, so row 0 is rank 11
+        self.assertEqual(game.coords_to_notation(0, 10, 'V'), "k11v")
+        self.assertEqual(game.notation_to_coords("k11v"), (0, 10, 'V'))
+        self.assertTrue(game.is_valid_wall_placement(9, 9, 'H'))
+        self.assertFalse(game.is_valid_wall_placement(10, 0, 'H'))
+        
+        game.load_from_notation("1. f2 f10 2. j2h")
+        self.assertEqual(game.board_size, 11)
+        self.assertIn((9, 9, 'H'), game.walls)
+
 if __name__ == '__main__':
     unittest.main()
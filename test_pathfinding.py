@@ -0,0 +1,41 @@
+import unittest
+from src.models import QuoridorGame
+from src.pathfinding import analyze_paths, bfs, shortest_path_dag
+
+class TestPathDAG(unittest.TestCase):
+    def test_open_board(self):
+        game = QuoridorGame()
+        dag = shortest_path_dag(game, (8, 4), game.goals(0))
+        self.assertEqual(dag.length, 8)
+        # Straight up the file is the only shortest path: every edge is critical
+        self.assertEqual(dag.num_paths, 1)
+        self.assertEqual(len(dag.critical), 8)
+        self.assertEqual(dag.wall_increase((7, 4, 'H')), 1)
+        self.assertEqual(dag.wall_increase((7, 4, 'V')), 0)
+
+    def test_path_counts(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h")
+        dag = shortest_path_dag(game, (1, 4), game.goals(1))
+        # e8 -> e1 around the e3h wall: several equally short detours
+        self.assertEqual(dag.length, bfs(game, (1, 4), game.goals(1)))
+        self.assertGreater(dag.num_paths, 1)
+        self.assertEqual(sum(c for (u, v), c in dag.edge_paths.items() if u == (1, 4)), dag.num_paths)
+
+    def test_wall_impacts_match_search(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v 3. f2")
+        for i, dag in enumerate(analyze_paths(game)):
+            p = game.players[i]
+            impacts = dag.wall_impacts()
+            self.assertTrue(impacts)
+            for wall in dag.candidate_walls():
+                if not game.is_valid_wall_placement(*wall):
+                    continue
+                game.walls.add(wall)
+                length = bfs(game, (p.r, p.c), game.goals(i))
+                game.walls.remove(wall)
+                self.assertEqual(impacts.get(wall, 0), length - dag.length, wall)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+from src.ai import QuoridorAI
+from src.position import from_position_string
+from src.pns import LOSS, UNKNOWN, WIN, ProofSearch
+from src.tablebase import SEARCH_WIN
+
+# Self-play endgames: P1 is out of walls, P2 has some left
+RACE_WIN = "q9/f8,i5/44440000011008080244180602001111/0,0/0"
+WALL_WIN = "q9/e4,f6/400000011008080244180602001111/3,0/0"
+
+class TestProofSearch(unittest.TestCase):
+    def test_win_and_loss(self):
+        game = from_position_string(RACE_WIN)
+        self.assertEqual(ProofSearch(0).solve(game), (WIN, (1, 6), 'MOVE'))
+        # Facing pawns, P2 jumps first
+        game = from_position_string("q9/e5,e4/0/0,0/0")
+        self.assertEqual(ProofSearch(0).solve(game), (LOSS, None, None))
+
+    def test_budget(self):
+        game = from_position_string(WALL_WIN)
+        prover = ProofSearch(0, max_nodes=100)
+        self.assertEqual(prover.solve(game), (UNKNOWN, None, None))
+        self.assertLess(prover.nodes, 300)
+
+    def test_proof_holds_against_any_defence(self):
+        # The prover's side wins whatever the defender (a plain search) plays
+        game = from_position_string(WALL_WIN)
+        ai = QuoridorAI(game, 0, depth=1, proof_nodes=5000, collect_stats=True)
+        move, move_type, stats = ai.search(game)
+        self.assertEqual(stats.score, SEARCH_WIN)
+        self.assertEqual(stats.pv, [game.coords_to_notation(*move)])
+
+        defender = QuoridorAI(game, 1, depth=2)
+        while game.winner() is None:
+            move, move_type = (ai if game.turn == 0 else defender).get_best_move(game)
+            self.assertTrue(game.move_pawn(*move) if move_type == 'MOVE' else game.place_wall(*move))
+        self.assertEqual(game.winner(), 0)
+
+    def test_unproven_falls_back_to_search(self):
+        # Few enough defender walls for a proof attempt, too many to finish it
+        game = from_position_string("q9/e4,e9/0/0,2/0")
+        ai = QuoridorAI(game, 0, depth=2, proof_nodes=500)
+        self.assertEqual(ai.get_best_move(game), QuoridorAI(game, 0, depth=2).get_best_move(game))
+        self.assertGreaterEqual(ai.prover.nodes, 500)
+        self.assertEqual(ai.prover.result(), (UNKNOWN, None, None))
+
+    def test_no_legal_wall(self):
+        # A side whose walls are all illegal still has its pawn moves
+        game = from_position_string("q5/c3,c5/0/0,1/0")
+        with mock.patch('src.pns.legal_walls', return_value=[]):
+            self.assertEqual(ProofSearch(0).solve(game), (WIN, (1, 2), 'MOVE'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from src.models import QuoridorGame
+from src.position import to_position_string, from_position_string, is_position_string
+
+class TestPosition(unittest.TestCase):
+    def test_round_trip(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v 3. f2")
+        text = to_position_string(game)
+        self.assertTrue(text.startswith("q9/f2,e8/"))
+        self.assertTrue(text.endswith("/9,9/1"))
+        self.assertTrue(is_position_string(text))
+        self.assertFalse(is_position_string(game.get_game_notation()))
+
+        loaded = from_position_string(text)
+        self.assertEqual(loaded.walls, game.walls)
+        self.assertEqual(loaded.turn, game.turn)
+        for a, b in zip(loaded.players, game.players):
+            self.assertEqual((a.r, a.c, a.walls_remaining), (b.r, b.c, b.walls_remaining))
+        self.assertEqual(loaded.move_history, [])
+
+        # Optional history keeps the game notation
+        loaded = from_position_string(to_position_string(game, include_history=True))
+        self.assertEqual(loaded.get_game_notation(), game.get_game_notation())
+
+        # Loaded positions play on normally
+        self.assertTrue(loaded.move_pawn(2, 4))
+
+    def test_variants(self):
+        game = QuoridorGame(num_players=4, board_size=11)
+        game.place_wall(9, 9, 'V')
+        text = to_position_string(game)
+        self.assertTrue(text.startswith("q11p4/"))
+        loaded = from_position_string(text)
+        self.assertEqual((loaded.num_players, loaded.board_size), (4, 11))
+        self.assertEqual(loaded.walls, {(9, 9, 'V')})
+
+    def test_invalid(self):
+        for text in ["q9/e1/0/10,10/0", "q9/e1,e1/0/10,10/0", "q9/e1,e9/3/10,10/0",
+                     "q9/e1,e9/0/10,10/2", "q9/e1,z9/0/10,10/0", "q9/e1,e9/zz/10,10/0",
+                     "q9/e1,e9/0/40,10/0", "q9/e1,e9/0/11,10/0", "q9/e1,e9/0/-1,10/0"]:
+            with self.assertRaises(ValueError, msg=text):
+                from_position_string(text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+import unittest
+from src.models import QuoridorGame, ReplayError
+from src.replay import iter_game_records, iter_games, load_games_file
+
+GAMES = """1. e2 e8 2. e3h
+
+1. e2 e8 2. e3 e7
+3. e4
+1. e2 e2
+1. d9v
+"""
+
+class TestReplay(unittest.TestCase):
+    def test_records_are_split_lazily(self):
+        records = list(iter_game_records(io.StringIO(GAMES)))
+        self.assertEqual([r.moves for r in records], [
+            ["e2", "e8", "e3h"],
+            ["e2", "e8", "e3", "e7", "e4"],  # wrapped over two lines
+            ["e2", "e2"],
+            ["d9v"],
+        ])
+        self.assertEqual([r.line for r in records], [1, 3, 5, 6])
+
+    def test_structured_errors(self):
+        results = list(iter_games(io.StringIO(GAMES)))
+        self.assertEqual(len(results), 4)
+
+        record, game, error = results[2]
+        self.assertIsNone(game)
+        self.assertEqual((error.index, error.line, error.ply, error.token), (2, 5, 1, "e2"))
+        self.assertEqual(error.reason, "illegal move")
+
+        _, game, error = results[1]
+        self.assertIsNone(error)
+        self.assertEqual((game.players[0].r, game.players[0].c), (5, 4))
+
+    def test_four_player_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "games.txt")
+            with open(path, "w") as f:
+                f.write("1. e2 e8 b5 h5 2. e3\n")
+            [(_, game, error)] = load_games_file(path, num_players=4)
+        self.assertIsNone(error)
+        self.assertEqual(game.num_players, 4)
+        self.assertEqual([(p.r, p.c) for p in game.players], [(6, 4), (1, 4), (4, 1), (4, 7)])
+
+    def test_trusted_replay_matches_checked_replay(self):
+        notation = "1. e2 e8 2. e3h c7v 3. f2 e7"
+        checked = QuoridorGame()
+        self.assertTrue(checked.load_from_notation(notation))
+        trusted = QuoridorGame()
+        self.assertTrue(trusted.load_from_notation(notation, trusted=True))
+
+        self.assertEqual(trusted.walls, checked.walls)
+        self.assertEqual(trusted.move_history, checked.move_history)
+        self.assertEqual(trusted.turn, checked.turn)
+        for a, b in zip(trusted.players, checked.players):
+            self.assertEqual((a.r, a.c, a.walls_remaining), (b.r, b.c, b.walls_remaining))
+
+    def test_replay_raises(self):
+        game = QuoridorGame()
+        with self.assertRaises(ReplayError) as ctx:
+            game.replay(["e2", "zz"])
+        self.assertEqual(ctx.exception.ply, 1)
+        self.assertFalse(game.load_from_notation("1. e2 e8 2. j1"))
+
+if __name__ == '__main__':
+    unittest.main()
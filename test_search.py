@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from src.ai import QuoridorAI, run_steps
+from src.models import QuoridorGame
+
+class TestSearchStats(unittest.TestCase):
+    def test_stats_disabled_by_default(self):
+        game = QuoridorGame()
+        ai = QuoridorAI(game, player_idx=0, depth=1)
+        move, move_type, stats = ai.search(game)
+        self.assertIsNotNone(move)
+        self.assertIsNone(stats)
+
+    def test_stats_collected(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "stats.jsonl")
+            ai = QuoridorAI(game, player_idx=0, depth=2, stats_path=path)
+            move, move_type, stats = ai.search(game)
+
+            self.assertGreater(stats.nodes, 1)
+            self.assertGreater(stats.leaf_evals, 0)
+            # Every distance cache miss is one A* search (wall validation doesn't use A*)
+            self.assertEqual(stats.astar_calls, stats.cache_misses["dist"])
+            self.assertEqual(stats.cache_hits["dist"] + stats.cache_misses["dist"], 2 * stats.leaf_evals)
+            self.assertGreater(stats.astar_expanded, stats.astar_calls)
+            self.assertEqual(len(stats.pv), 2)
+            self.assertEqual(stats.pv[0], game.coords_to_notation(*move))
+            self.assertIn(2, stats.depth_times)
+
+            with open(path) as f:
+                record = json.loads(f.readline())
+            self.assertEqual(record["nodes"], stats.nodes)
+            self.assertEqual(record["pv"], stats.pv)
+
+class TestMoveGeneration(unittest.TestCase):
+    def test_staged_order(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7")
+        ai = QuoridorAI(game, player_idx=0)
+        moves = ai.get_all_possible_moves(game, 0)
+        types = [t for _, t in moves]
+        # Pawn moves first, then walls; no duplicates
+        self.assertEqual(types, sorted(types))
+        self.assertEqual(len(set(m for m, _ in moves)), len(moves))
+        self.assertEqual(moves[0], ((5, 4), 'MOVE'))
+
+        # The hash move jumps the queue
+        tt_move = ((1, 4, 'H'), 'WALL')
+        staged = list(ai.generate_moves(game, 0, tt_move=tt_move))
+        self.assertEqual(staged[0], tt_move)
+        self.assertEqual(set(staged), set(moves) | {tt_move})
+        self.assertEqual(len(set(staged)), len(staged))
+
+    def test_walls_validated_lazily(self):
+        game = QuoridorGame()
+        ai = QuoridorAI(game, player_idx=0)
+        calls = []
+        original = game.is_valid_wall_placement
+        game.is_valid_wall_placement = lambda *w: calls.append(w) or original(*w)
+        gen = ai.generate_moves(game, 0)
+        next(gen)
+        self.assertEqual(calls, [])
+
+    def test_walls_lengthen_opponent_path(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v 3. f2")
+        ai = QuoridorAI(game, player_idx=1)
+        walls = [m for m, t in ai.get_all_possible_moves(game, 1) if t == 'WALL']
+        self.assertTrue(walls)
+        before = ai.distance(game, 0)
+        for wall in walls:
+            game.walls.add(wall)
+            self.assertGreater(ai.distance(game, 0), before, wall)
+            game.walls.remove(wall)
+
+class TestCooperativeSearch(unittest.TestCase):
+    def test_sliced_search_matches_blocking_search(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7")
+        expected = QuoridorAI(game, player_idx=0, depth=2).get_best_move(game)
+
+        ai = QuoridorAI(game, player_idx=0, depth=2)
+        steps = ai.search_steps(game, slice_nodes=5)
+        slices = 0
+        while True:
+            try:
+                next(steps)
+                slices += 1
+            except StopIteration as e:
+                result = e.value
+                break
+        self.assertGreater(slices, 1)
+        self.assertEqual(result[:2], expected)
+
+    def test_async_search(self):
+        game = QuoridorGame()
+        ai = QuoridorAI(game, player_idx=0, depth=2)
+        move = asyncio.run(ai.get_best_move_async(game, slice_ms=0))
+        self.assertEqual(move, QuoridorAI(game, player_idx=0, depth=2).get_best_move(game))
+
+class TestAnalysis(unittest.TestCase):
+    def test_multi_pv(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v")
+        hints = QuoridorAI(game, player_idx=0, depth=2)
+        steps = hints.analyze_steps(game, num_pv=3, slice_nodes=2)
+        depths = set()
+        while True:
+            try:
+                next(steps)
+            except StopIteration as e:
+                result = e.value
+                break
+            depths.add(hints.analysis_depth)
+        # Published progressively, one depth at a time
+        self.assertIn(1, depths)
+        self.assertEqual(hints.analysis_depth, 2)
+        self.assertEqual(len(result), 3)
+        self.assertEqual([s for s, _, _ in result], sorted((s for s, _, _ in result), reverse=True))
+
+        best = QuoridorAI(game, player_idx=0, depth=2)
+        score, move, move_type = best.minimax(game, 2, float('-inf'), float('inf'), True)
+        self.assertEqual(result[0][0], score)
+
+    def test_shared_tables(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7")
+        # One ply deeper than the AI, so the AI's root is already searched
+        hints = QuoridorAI(game, player_idx=0, depth=3)
+        ai = QuoridorAI(game, player_idx=1, depth=2, collect_stats=True)
+        hints.share_tables(ai)
+        run_steps(hints.analyze_steps(game, num_pv=2))
+
+        fresh = QuoridorAI(game, player_idx=1, depth=2, collect_stats=True)
+        game.move_pawn(*hints.analysis[0][1])
+        move, _, stats = ai.search(game)
+        fresh_move, _, fresh_stats = fresh.search(game)
+        self.assertEqual(move, fresh_move)
+        self.assertLess(stats.nodes, fresh_stats.nodes)
+
+class TestFourPlayer(unittest.TestCase):
+    def test_setup_and_goals(self):
+        game = QuoridorGame(num_players=4)
+        self.assertEqual(len(game.players), 4)
+        self.assertEqual((game.players[2].r, game.players[2].c), (4, 0))
+        self.assertEqual(game.players[2].walls_remaining, 5)
+        self.assertEqual(game.goals(3)[0], (0, 0))
+        self.assertEqual(game.goals(3)[-1], (8, 0))
+
+        game.players[2].move(3, 8)
+        self.assertTrue(game.players[2].has_won())
+        self.assertEqual(game.winner(), 2)
+
+    def test_jump_over_any_pawn(self):
+        game = QuoridorGame(num_players=4)
+        game.players[0].move(4, 4)
+        game.players[2].move(4, 3)  # Left of P1
+        game.players[3].move(3, 4)  # Above P1
+        game.players[1].move(2, 4)  # Behind P4: straight jump up is blocked
+        moves = set(game.get_valid_pawn_moves(0))
+        self.assertIn((4, 2), moves)            # Straight over P3
+        self.assertNotIn((2, 4), moves)         # Occupied landing square
+        self.assertIn((3, 5), moves)            # Diagonal around P4
+        self.assertNotIn((4, 3), moves)
+        self.assertEqual(len(game.get_valid_pawn_moves(0)), len(moves))
+
+    def test_notation_rounds(self):
+        game = QuoridorGame(num_players=4)
+        for r, c in [(7, 4), (1, 4), (4, 1), (4, 7)]:
+            self.assertTrue(game.move_pawn(r, c))
+        self.assertEqual(game.turn, 0)
+        self.assertEqual(game.get_game_notation(), "1. e2 e8 b5 h5")
+
+    def test_best_reply_search(self):
+        game = QuoridorGame(num_players=4)
+        game.players[0].move(1, 2)  # One step from goal
+        ai = QuoridorAI(game, player_idx=0, depth=2)
+        move, move_type = ai.get_best_move(game)
+        self.assertEqual((move, move_type), ((0, 2), 'MOVE'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import json
+import os
+import tempfile
+import unittest
+from src.selfplay import COLUMNS, generate, load_shards, play_game
+
+class TestSelfPlay(unittest.TestCase):
+    def test_game_rows(self):
+        rows = play_game(3, depth=1, board_size=5, seed=1)
+        again = play_game(3, depth=1, board_size=5, seed=1)
+        self.assertEqual(rows['best_move'], again['best_move'])
+        self.assertEqual(rows['score'], again['score'])
+        count = len(rows['turn'])
+        self.assertGreater(count, 0)
+        for name in COLUMNS:
+            self.assertEqual(len(rows[name]), count, name)
+        # Zero-sum results alternate between the two players
+        self.assertIn(rows['result'][0], (1, -1))
+        self.assertEqual(rows['result'][1], -rows['result'][0])
+
+    def test_shards_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            args = dict(games_per_shard=2, workers=1, depth=1, board_size=5)
+            generate(tmp, 3, **args)
+            self.assertEqual(sorted(os.listdir(tmp)), ["shard-00000", "shard-00001"])
+            # Nothing left to do for the same run; a longer run only redoes the short shard
+            self.assertEqual(generate(tmp, 3, **args), 0)
+            generate(tmp, 4, **args)
+
+            shards = list(load_shards(tmp))
+            self.assertEqual(len(shards), 2)
+            self.assertEqual(shards[0]['walls'].shape[1:], (2, 4, 4))
+            self.assertEqual(shards[0]['pawns'].shape[1:], (2, 2))
+            self.assertEqual(sorted(set(shards[1]['game'])), [2, 3])
+
+            # Spelling out a default is the same run; another seed redoes every shard
+            self.assertEqual(generate(tmp, 4, seed=0, **args), 0)
+            self.assertGreater(generate(tmp, 4, seed=5, **args), 0)
+            with open(os.path.join(tmp, "shard-00000", "meta.json")) as f:
+                settings = json.load(f)["play_args"]
+            self.assertEqual((settings["seed"], settings["depth"], settings["random_plies"]), (5, 1, 4))
+
+if __name__ == '__main__':
+    unittest.main()
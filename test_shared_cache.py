@@ -0,0 +1,65 @@
+import multiprocessing
+import unittest
+from src.ai import QuoridorAI
+from src.models import QuoridorGame
+from src.shared_cache import SharedCache, decode_tt, encode_tt
+
+def _worker_put(name, key, data):
+    with SharedCache.attach(name) as cache:
+        cache.put(key, data)
+
+class TestSharedCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SharedCache.create(1)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_get_put(self):
+        key = 0x1234_5678_9ABC_DEF0
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, 42)
+        self.assertEqual(self.cache.get(key), 42)
+        # Same slot, different key: replaced, and the old key misses
+        other = key ^ (1 << 63)
+        self.cache.put(other, 7)
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.get(other), 7)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertAlmostEqual(self.cache.hit_rate(), 0.5)
+
+    def test_torn_slot_is_a_miss(self):
+        key = 0xDEAD_BEEF
+        self.cache.put(key, 42)
+        # Half-finished write by another process: data word updated only
+        i = (key & self.cache.mask) << 1
+        self.cache.words[i + 1] = 43
+        self.assertIsNone(self.cache.get(key))
+
+    def test_shared_between_processes(self):
+        p = multiprocessing.Process(target=_worker_put, args=(self.cache.name, 99, 1234))
+        p.start()
+        p.join()
+        self.assertEqual(self.cache.get(99), 1234)
+
+    def test_tt_encoding(self):
+        for entry in [(3, -12, 2, (4, 5), 'MOVE'), (0, 7, 0, (7, 7, 'V'), 'WALL'), (1, 0, 1, None, None)]:
+            self.assertEqual(decode_tt(encode_tt(entry, 9), 9), entry)
+        self.assertIsNone(encode_tt((2, float('-inf'), 0, None, None), 9))
+
+    def test_search_reuses_other_results(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7")
+        plain = QuoridorAI(game, 0, depth=3).get_best_move(game)
+
+        first = QuoridorAI(game, 0, depth=3, shared_cache=self.cache)
+        self.assertEqual(first.get_best_move(game), plain)
+        misses = self.cache.misses
+
+        # A fresh engine (as in another worker) finds the root in the table
+        second = QuoridorAI(game, 0, depth=3, shared_cache=self.cache)
+        self.assertEqual(second.get_best_move(game), plain)
+        self.assertEqual(self.cache.misses, misses)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from src.ai import QuoridorAI, snapshot_fingerprint
+from src.models import QuoridorGame
+from src.snapshot import Snapshot, load_snapshot, write_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "engine.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_get(self):
+        keys = [5, 1 << 63, 3, 5]
+        self.assertEqual(write_snapshot(self.path, keys, [50, 7, 30, 51], 9, 1234), 3)
+        with Snapshot(self.path, 9, 1234) as snapshot:
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(snapshot.get(5), 50)  # First of the duplicates
+            self.assertEqual(snapshot.get(1 << 63), 7)
+            self.assertEqual(snapshot.get(3), 30)
+            self.assertIsNone(snapshot.get(4))
+            self.assertIsNone(snapshot.get((1 << 64) - 1))
+
+    def test_bad_snapshots_are_ignored(self):
+        self.assertIsNone(load_snapshot(self.path, 9, 1234))  # Missing
+        write_snapshot(self.path, [1, 2, 3], [10, 20, 30], 9, 1234)
+        self.assertIsNone(load_snapshot(self.path, 9, 4321))  # Other engine version
+        self.assertIsNone(load_snapshot(self.path, 7, 1234))  # Other board
+        load_snapshot(self.path, 9, 1234).close()
+
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\xff')
+        self.assertIsNone(load_snapshot(self.path, 9, 1234, verify=True))  # Corrupted
+        load_snapshot(self.path, 9, 1234).close()  # Not checked unless asked for
+        with open(self.path, 'r+b') as f:
+            f.truncate(40)
+        self.assertIsNone(load_snapshot(self.path, 9, 1234))  # Truncated
+
+    def test_engine_starts_warm(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3 e7 3. d3v")
+        cold = QuoridorAI(game, 0, depth=3, collect_stats=True)
+        move, _, cold_stats = cold.search(game)
+        written = cold.save_snapshot(self.path)
+        self.assertGreater(written, 0)
+
+        snapshot = load_snapshot(self.path, 9, snapshot_fingerprint())
+        warm = QuoridorAI(game, 0, depth=3, collect_stats=True, snapshot=snapshot)
+        warm_move, _, warm_stats = warm.search(game)
+        self.assertEqual(warm_move, move)
+        self.assertLess(warm_stats.nodes, cold_stats.nodes)
+
+        # Saving again over the loaded file keeps the entries that weren't
+        # needed this time, and the snapshot stays readable for other engines
+        # without holding the file
+        hints = QuoridorAI(game, 1, depth=2, snapshot=snapshot)
+        hints.share_tables(warm)
+        self.assertEqual(warm.save_snapshot(self.path), written)
+        self.assertIsNone(snapshot._map)
+        self.assertEqual(len(snapshot), written)
+        self.assertIsNotNone(hints.get_best_move(game)[0])
+        snapshot.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import pickle
+import unittest
+from src.models import QuoridorGame
+from src.position import to_position_string
+from src.state import CompactState, SIZE
+
+class TestCompactState(unittest.TestCase):
+    def test_round_trip(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v 3. f2 a2h 4. h8v")
+        state = CompactState.from_game(game)
+        data = state.to_bytes()
+        self.assertEqual(len(data), SIZE)
+        self.assertLess(SIZE, 64)
+
+        loaded = CompactState.from_bytes(data)
+        self.assertEqual(loaded, state)
+        self.assertEqual(hash(loaded), hash(state))
+        self.assertEqual(to_position_string(loaded.to_game()), to_position_string(game))
+        self.assertEqual(loaded.to_game().walls.blocked, game.walls.blocked)
+
+    def test_variants(self):
+        for game in (QuoridorGame(num_players=4), QuoridorGame(board_size=11), QuoridorGame(board_size=5)):
+            game.place_wall(0, 0, 'H')
+            game.place_wall(game.board_size - 2, game.board_size - 2, 'V')
+            state = CompactState.from_bytes(CompactState.from_game(game).to_bytes())
+            self.assertEqual(to_position_string(state.to_game()), to_position_string(game))
+        with self.assertRaises(ValueError):
+            CompactState.from_game(QuoridorGame(board_size=13))
+
+    def test_pickle_is_small(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. e3h c7v 3. f2")
+        state = CompactState.from_game(game)
+        packed = pickle.dumps(state)
+        self.assertEqual(pickle.loads(packed), state)
+        self.assertLess(len(packed), len(pickle.dumps(game)) // 3)
+
+    def test_corrupt_records(self):
+        data = CompactState.from_game(QuoridorGame()).to_bytes()
+        for bad in (data[:-1], bytes([9, 2, 5]) + data[3:], data[:3] + bytes([99]) + data[4:],
+                    data[:-1] + b'\xff'):
+            with self.assertRaises(ValueError):
+                CompactState.from_bytes(bad)
+
+    def test_impossible_positions(self):
+        def record(walls=(), pawns=(4, 76), walls_left=(10, 10)):
+            state = CompactState(9, 2, 0, pawns, walls_left)
+            game = state.to_game()
+            game.walls.update(walls)
+            return CompactState.from_game(game).to_bytes()
+
+        # Abutting walls, along a row and down a column, and across a row end
+        CompactState.from_bytes(record([(5, 3, 'H'), (5, 5, 'H'), (2, 2, 'V'), (4, 2, 'V'), (3, 7, 'H'), (4, 0, 'H')]))
+        for bad in (record(pawns=(40, 40)), record(walls_left=(11, 10)),
+                    record([(5, 3, 'H'), (5, 3, 'V')]), record([(5, 3, 'H'), (5, 4, 'H')]),
+                    record([(2, 2, 'V'), (3, 2, 'V')])):
+            with self.assertRaises(ValueError):
+                CompactState.from_bytes(bad)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from src.ai import QuoridorAI
+from src.models import QuoridorGame
+from src.symmetry import canonical_key, mirror_move, position_key
+
+def mirrored_game(game):
+    n = game.board_size
+    mirror = QuoridorGame(game.num_players, n)
+    perm = (0, 1, 3, 2) if game.num_players == 4 else (0, 1)
+    for i, p in enumerate(game.players):
+        q = mirror.players[perm[i]]
+        q.move(*mirror_move((p.r, p.c), n))
+        q.walls_remaining = p.walls_remaining
+    mirror.walls = {mirror_move(w, n) for w in game.walls}
+    mirror.turn = perm[game.turn]
+    return mirror
+
+class TestSymmetry(unittest.TestCase):
+    def test_mirror_move(self):
+        self.assertEqual(mirror_move((3, 0), 9), (3, 8))
+        self.assertEqual(mirror_move((3, 0, 'H'), 9), (3, 7, 'H'))
+        for move in [(2, 5), (0, 0, 'V'), (7, 3, 'H')]:
+            self.assertEqual(mirror_move(mirror_move(move, 9), 9), move)
+
+    def test_canonical_key(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. e2 e8 2. c3h f6v 3. d2")
+        mirror = mirrored_game(game)
+        self.assertNotEqual(position_key(game), position_key(mirror))
+        self.assertEqual(position_key(game, mirrored=True), position_key(mirror))
+
+        key, mirrored = canonical_key(game)
+        mirror_key, mirror_mirrored = canonical_key(mirror)
+        self.assertEqual(key, mirror_key)
+        self.assertNotEqual(mirrored, mirror_mirrored)
+
+    def test_large_board_wall_counts(self):
+        # 34 walls each on 33x33: more than the tables' default 32
+        game = QuoridorGame(board_size=33)
+        self.assertGreater(game.players[0].walls_remaining, 32)
+        start = position_key(game)
+        game.players[0].walls_remaining -= 1
+        self.assertNotEqual(position_key(game), start)
+        self.assertEqual(canonical_key(game)[0], min(position_key(game), position_key(game, mirrored=True)))
+
+    def test_four_player_mirror_swaps_side_players(self):
+        game = QuoridorGame(num_players=4)
+        game.move_pawn(7, 4)
+        game.move_pawn(1, 4)
+        game.move_pawn(3, 0)  # Left player, now player 4's turn
+        mirror = mirrored_game(game)
+        self.assertEqual(canonical_key(game)[0], canonical_key(mirror)[0])
+
+    def test_transposition_table_shared_with_mirror(self):
+        game = QuoridorGame()
+        game.load_from_notation("1. d2 e8 2. c3h")
+        ai = QuoridorAI(game, player_idx=1, depth=2)
+        move, move_type = ai.get_best_move(game)
+
+        # The mirrored position is answered from the table, mapped back
+        mirror = mirrored_game(game)
+        ai.tt_size = 0  # Any new store would wipe the table
+        score, mirror_move_data, mirror_type = ai.minimax(mirror, 2, float('-inf'), float('inf'), True)
+        self.assertEqual(mirror_type, move_type)
+        self.assertEqual(mirror_move_data, mirror_move(move, 9))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from src.ai import QuoridorAI
+from src.models import QuoridorGame
+from src.tablebase import (WIN, Tablebase, TablebaseSolver, build_tablebase, parent_value,
+                           position_index)
+
+class TestTablebase(unittest.TestCase):
+    def check_layer(self, solver, n, walls_left):
+        """
+        Every value must be the best of its moves' values (pawn moves and walls).
+        """
+        values, _ = solver.solve_layer(frozenset(), walls_left)
+        game = QuoridorGame(2, n)
+        C = n * n
+        for turn in range(2):
+            for a in range(C):
+                for b in range(C):
+                    if a == b:
+                        continue
+                    game.walls = set()
+                    game.turn = turn
+                    game.players[0].move(*divmod(a, n))
+                    game.players[1].move(*divmod(b, n))
+                    if game.winner() is not None:
+                        self.assertEqual(values[turn, a, b], -WIN)
+                        continue
+                    best = None
+                    for r, c in game.get_valid_pawn_moves(turn):
+                        pawns = [a, b]
+                        pawns[turn] = r * n + c
+                        v = parent_value(int(values[1 - turn, pawns[0], pawns[1]]))
+                        best = v if best is None else max(best, v)
+                    if walls_left[turn]:
+                        left = list(walls_left)
+                        left[turn] -= 1
+                        for wall in [(r, c, o) for r in range(n - 1) for c in range(n - 1) for o in 'HV']:
+                            if game.is_valid_wall_placement(*wall):
+                                child, _ = solver.solve_layer(frozenset([wall]), tuple(left))
+                                best = max(best, parent_value(int(child[1 - turn, a, b])))
+                    self.assertEqual(values[turn, a, b], best, (turn, a, b))
+
+    def test_values_consistent(self):
+        solver = TablebaseSolver(4)
+        solver.solve(set(), 1)
+        for walls_left in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+            self.check_layer(solver, 4, walls_left)
+
+    def test_file_probe_and_ai(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "open.qtb")
+            build_tablebase(path, set(), max_walls=0, board_size=9)
+            with Tablebase(path) as tb:
+                game = QuoridorGame()
+                self.assertIsNone(tb.probe(game))  # 10 walls each: not covered
+                game.load_from_notation("1. e2 e8 2. e3 e7 3. e4 e6 4. e5")
+                for p in game.players:
+                    p.walls_remaining = 0
+                value, move, move_type = tb.probe(game)
+                i = position_index(9, 0, game.turn, (0, 0), ((4, 4), (3, 4)))
+                self.assertEqual(value, tb.values[i])
+                self.assertGreater(value, 0)  # e6 jumps over e5 first
+
+                ai = QuoridorAI(game, player_idx=1, depth=2, tablebase=tb)
+                self.assertEqual(ai.get_best_move(game), (move, move_type))
+
+                game.walls.add((0, 0, 'H'))
+                self.assertIsNone(tb.probe(game))
+
+if __name__ == '__main__':
+    unittest.main()